@@ -5,6 +5,36 @@ Provides unified compute resource scheduling and abstraction for the entire Agen
 
 from .resource_manager import ResourceManager
 from .scheduler import JobScheduler
+from .job_queue import JobQueue
+from .fair_share import FairShareQueue, TenantQuota
+from .backfill import BackfillPlanner, BackfillMode
+from .dependencies import DependencyGraph, DependencyError
+from .reservations import ReservationCalendar, AdvanceReservation, ReservationError
+from .placement import NodeInventory, PlacementPolicy
+from .topology import HostTopology, read_host_topology
+from .preemption import PreemptionEngine
+from .sampler import ResourceSampler
+from .timeseries import TimeSeriesStore
+from .metering import UsageMeter
+from .autoscaler import Autoscaler, NodeProvider, SimulatedNodeProvider, ScalingPolicy
+from .scheduling_loop import SchedulingLoop, SchedulerOverloadedError
+from .executor import LocalExecutor
+from .node_registry import NodeRegistry, NodeHealth
+from .journal import SchedulerJournal
+from .instrumentation import SchedulerMetrics
+from .simulator import SchedulingSimulator, SimulationReport, TraceJob
 from .monitor import ResourceMonitor
 
-__all__ = ["ResourceManager", "JobScheduler", "ResourceMonitor"]
+__all__ = [
+    "ResourceManager", "JobScheduler", "JobQueue", "ResourceMonitor",
+    "FairShareQueue", "TenantQuota", "BackfillPlanner", "BackfillMode",
+    "DependencyGraph", "DependencyError",
+    "ReservationCalendar", "AdvanceReservation", "ReservationError",
+    "NodeInventory", "PlacementPolicy", "HostTopology", "read_host_topology",
+    "PreemptionEngine",
+    "ResourceSampler", "TimeSeriesStore", "UsageMeter",
+    "Autoscaler", "NodeProvider", "SimulatedNodeProvider", "ScalingPolicy",
+    "SchedulingLoop", "SchedulerOverloadedError", "LocalExecutor",
+    "NodeRegistry", "NodeHealth", "SchedulerMetrics",
+    "SchedulingSimulator", "SimulationReport", "TraceJob", "SchedulerJournal"
+]
@@ -0,0 +1,56 @@
+"""
+Scheduling simulator benchmark
+Replays a week of synthetic (or a recorded) trace through the scheduler and
+compares placement policies and preemption settings side by side.
+
+Usage:
+    python ComputeFactory/benchmarks/bench_simulator.py [--days 7] [--load 1.0] [--trace jobs.jsonl]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.placement import PlacementPolicy
+from services.simulator import SchedulingSimulator, load_trace, synthetic_trace
+
+
+def report(label: str, result):
+    print(f"\n  {label}")
+    print(f"    {result.events:,} events in {result.wall_seconds:.2f}s wall "
+          f"({result.simulated_seconds / 86400:.1f} simulated days)")
+    print(f"    completed={result.jobs_completed:,} unfinished={result.jobs_unfinished:,} "
+          f"throughput={result.throughput_per_hour:,.1f} jobs/h")
+    print("    utilization  " + "  ".join(
+        f"{pool}={value:.1%}" for pool, value in result.utilization.items()
+    ))
+    print(f"    preemptions={result.preemptions:,} {result.preemptions_by_priority} "
+          f"lost_work={result.lost_work_hours:,.1f} unit-hours")
+    for priority, stats in result.wait_seconds.items():
+        print(f"    wait {priority:<9} n={int(stats['count']):>7,}  p50={stats['p50']:>9,.0f}s  "
+              f"p95={stats['p95']:>9,.0f}s  p99={stats['p99']:>9,.0f}s")
+
+
+def run(days: float, load: float, seed: int, trace_path: str = None):
+    trace = load_trace(trace_path) if trace_path else synthetic_trace(days * 86400, seed, load=load)
+    print("=" * 72)
+    print(f"Scheduling simulator: {len(trace):,} jobs over {days:g} days")
+    print("=" * 72)
+
+    for policy in (PlacementPolicy.BEST_FIT, PlacementPolicy.SPREAD):
+        for preemption in (True, False):
+            simulator = SchedulingSimulator(trace, placement_policy=policy, preemption=preemption)
+            label = f"{policy.value}, preemption {'on' if preemption else 'off'}"
+            report(label, simulator.run(until=days * 86400))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=7.0)
+    parser.add_argument("--load", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", default=None, help="Recorded trace (.jsonl or .csv)")
+    args = parser.parse_args()
+    run(args.days, args.load, args.seed, args.trace)
@@ -0,0 +1,399 @@
+"""
+Autoscaler for Compute Factory
+Predictive pool scaling driven by queue depth, arrival rate and wait times.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from pydantic import BaseModel, Field
+from datetime import datetime
+import concurrent.futures
+import math
+import threading
+import time
+import numpy as np
+
+from .resource_manager import ResourceManager, NodeSpec, PoolType
+from .scheduler import JobScheduler, JobPriority
+
+
+class NodeProvider(ABC):
+    """Source of compute nodes (cloud API, cluster manager, simulator)"""
+
+    @abstractmethod
+    def node_shape(self, pool_type: PoolType) -> NodeSpec:
+        """Capacity of one node launched for a pool"""
+
+    @abstractmethod
+    def provision(self, pool_type: PoolType, count: int) -> List[str]:
+        """
+        Request new nodes for a pool.
+
+        Returns:
+            IDs of the nodes being launched
+        """
+
+    @abstractmethod
+    def poll_ready(self, pool_type: PoolType) -> List[NodeSpec]:
+        """Nodes that finished booting since the last poll"""
+
+    @abstractmethod
+    def pending_count(self, pool_type: PoolType) -> int:
+        """Nodes requested but not yet ready"""
+
+    @abstractmethod
+    def terminate(self, pool_type: PoolType, node_id: str) -> bool:
+        """Release a node back to the provider"""
+
+    def boot_latency(self, pool_type: PoolType) -> float:
+        """Expected seconds from provision() to ready, used as the prediction horizon"""
+        return 0.0
+
+    def owns(self, node_id: str) -> bool:
+        """Whether the node was launched by this provider (and may be terminated)"""
+        return False
+
+
+class SimulatedNodeProvider(NodeProvider):
+    """Offline provider whose nodes become ready after a fixed boot latency"""
+
+    def __init__(
+        self,
+        shapes: Dict[PoolType, NodeSpec],
+        boot_latency: float = 60.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            shapes: Node template per pool (node_id is replaced per node)
+            boot_latency: Seconds between provision() and the node being ready
+            clock: Time source, replaceable for virtual-time simulation
+        """
+        self.shapes = shapes
+        self.latency = boot_latency
+        self.clock = clock
+        self._booting: Dict[PoolType, List[Tuple[float, NodeSpec]]] = {pt: [] for pt in shapes}
+        self._owned: set = set()
+        self._counter = 0
+        self.provisioned = 0
+        self.terminated = 0
+
+    def node_shape(self, pool_type: PoolType) -> NodeSpec:
+        return self.shapes[pool_type]
+
+    def provision(self, pool_type: PoolType, count: int) -> List[str]:
+        ready_at = self.clock() + self.latency
+        node_ids = []
+        for _ in range(count):
+            self._counter += 1
+            node_id = f"{PoolType(pool_type).value}-sim-{self._counter}"
+            node = self.shapes[pool_type].copy(update={"node_id": node_id})
+            self._booting[pool_type].append((ready_at, node))
+            self._owned.add(node_id)
+            node_ids.append(node_id)
+        self.provisioned += count
+        return node_ids
+
+    def poll_ready(self, pool_type: PoolType) -> List[NodeSpec]:
+        now = self.clock()
+        booting = self._booting.get(pool_type, [])
+        ready = [node for ready_at, node in booting if ready_at <= now]
+        self._booting[pool_type] = [(t, node) for t, node in booting if t > now]
+        return ready
+
+    def pending_count(self, pool_type: PoolType) -> int:
+        return len(self._booting.get(pool_type, []))
+
+    def terminate(self, pool_type: PoolType, node_id: str) -> bool:
+        if node_id not in self._owned:
+            return False
+        self._owned.discard(node_id)
+        self.terminated += 1
+        return True
+
+    def boot_latency(self, pool_type: PoolType) -> float:
+        return self.latency
+
+    def owns(self, node_id: str) -> bool:
+        return node_id in self._owned
+
+
+class ScalingPolicy(BaseModel):
+    """Autoscaling limits and thresholds for one pool"""
+    min_nodes: int = 0
+    max_nodes: int = 100
+    max_step: int = 10                     # Nodes added/removed per decision
+    target_wait_seconds: Dict[JobPriority, float] = Field(default_factory=lambda: {
+        JobPriority.CRITICAL: 10.0,
+        JobPriority.HIGH: 60.0,
+        JobPriority.NORMAL: 300.0,
+        JobPriority.LOW: 1800.0
+    })
+    scale_up_stabilization: float = 30.0   # Predicted shortfall must persist this long
+    scale_up_cooldown: float = 60.0
+    scale_down_utilization: float = 0.5    # Only shrink below this utilization
+    scale_down_idle_seconds: float = 600.0 # Node must be idle this long
+    scale_down_cooldown: float = 300.0
+    arrival_smoothing: float = 0.3         # EWMA weight of the newest rate sample
+
+
+class ScalingEvent(BaseModel):
+    """Record of an autoscaling decision"""
+    timestamp: datetime
+    pool_type: PoolType
+    action: str          # "scale_up" | "scale_down"
+    node_count: int
+    reason: str
+
+    class Config:
+        use_enum_values = True
+
+
+class Autoscaler:
+    """
+    Grows and shrinks ResourceManager pools through a NodeProvider.
+
+    Each step estimates the capacity a pool will need one boot latency from
+    now: resources of all queued jobs plus the smoothed arrival rate times the
+    mean job size over that horizon, minus free capacity and nodes already
+    booting. Scale-up happens at once when any priority's oldest job has
+    waited past its target, otherwise only after the predicted shortfall has
+    persisted for the stabilization period. Scale-down requires an empty
+    queue, low utilization and nodes idle for the idle period; both
+    directions have cooldowns so the pool does not flap. Wait times count
+    from when a job last entered the queue.
+
+    Steps started by start() run through `dispatch`, which must run them on
+    the thread that owns the scheduler (see SchedulingLoop.call_threadsafe),
+    as they read the queue and add and remove nodes.
+    """
+
+    def __init__(
+        self,
+        scheduler: JobScheduler,
+        resource_manager: ResourceManager,
+        provider: NodeProvider,
+        policies: Dict[PoolType, ScalingPolicy],
+        clock: Callable[[], float] = time.time,
+        dispatch: Optional[Callable[[Callable[[], Any]], Any]] = None
+    ):
+        """
+        Args:
+            scheduler: Scheduler whose queue drives scaling
+            resource_manager: Manager whose pools are scaled
+            provider: Source of nodes
+            policies: Scaling policy per pool
+            clock: Time source, replaceable for virtual-time simulation
+            dispatch: Runs a step on the scheduler's owning thread
+                (default: call it directly, then schedule pending jobs)
+        """
+        self.scheduler = scheduler
+        self.resource_manager = resource_manager
+        self.provider = provider
+        self.policies = {PoolType(pt): policy for pt, policy in policies.items()}
+        self.clock = clock
+        self.dispatch = dispatch or self._dispatch_directly
+        self.events: List[ScalingEvent] = []
+
+        self._arrival_rate: Dict[PoolType, float] = {pt: 0.0 for pt in self.policies}
+        self._last_submitted: Dict[PoolType, int] = {}
+        self._last_step: Optional[float] = None
+        self._shortfall_since: Dict[PoolType, Optional[float]] = {pt: None for pt in self.policies}
+        self._last_scale_up: Dict[PoolType, float] = {pt: -math.inf for pt in self.policies}
+        self._last_scale_down: Dict[PoolType, float] = {pt: -math.inf for pt in self.policies}
+        self._idle_since: Dict[str, float] = {}
+
+        self._running = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, interval: float = 10.0):
+        """Run step() every `interval` seconds on a background thread"""
+        if self._running:
+            return
+        self._running = True
+        self._stop_event.clear()
+
+        def loop():
+            in_flight = None  # Future of the last step handed to dispatch
+            while not self._stop_event.wait(interval):
+                if in_flight is not None and not in_flight.done():
+                    continue  # Still queued on the scheduler thread; don't pile up steps
+                try:
+                    result = self.dispatch(self.step)
+                    in_flight = result if isinstance(result, concurrent.futures.Future) else None
+                    if in_flight is not None:
+                        in_flight.result(timeout=interval)
+                except concurrent.futures.TimeoutError:
+                    pass
+                except Exception as e:
+                    print(f"⚠️  Autoscaler step failed: {e}")
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background loop"""
+        self._running = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def step(self) -> List[ScalingEvent]:
+        """
+        Register booted nodes and make one scaling decision per pool.
+
+        Returns:
+            Scaling events emitted in this step
+        """
+        now = self.clock()
+        elapsed = now - self._last_step if self._last_step is not None else None
+        self._last_step = now
+
+        pending = self._pending_by_pool()
+        events = []
+        for pool_type, policy in self.policies.items():
+            for node in self.provider.poll_ready(pool_type):
+                self.resource_manager.add_node(pool_type, node)
+            self._update_arrival_rate(pool_type, policy, elapsed)
+
+            event = self._scale_up(pool_type, policy, pending.get(pool_type.value, []), now)
+            if event is None and not pending.get(pool_type.value):
+                event = self._scale_down(pool_type, policy, now)
+            if event:
+                events.append(event)
+        self.events.extend(events)
+        return events
+
+    def get_status(self) -> Dict:
+        """Current signals per pool"""
+        return {
+            pool_type.value: {
+                "nodes": len(self.resource_manager.pools[pool_type]),
+                "booting": self.provider.pending_count(pool_type),
+                "arrival_rate_per_min": round(self._arrival_rate[pool_type] * 60, 3)
+            }
+            for pool_type in self.policies
+        }
+
+    def _dispatch_directly(self, fn: Callable[[], Any]):
+        fn()
+        self.scheduler.schedule_pending(self.resource_manager)
+
+    def _pending_by_pool(self) -> Dict[str, list]:
+        pending: Dict[str, list] = {}
+        for job in self.scheduler.job_queue.values():
+            if job.pool_type is not None and job.resource_spec is not None:
+                pending.setdefault(job.pool_type, []).append(job)
+        return pending
+
+    def _update_arrival_rate(self, pool_type: PoolType, policy: ScalingPolicy, elapsed: Optional[float]):
+        submitted = self.scheduler.submitted_counts.get(pool_type.value, 0)
+        previous = self._last_submitted.get(pool_type, submitted)
+        self._last_submitted[pool_type] = submitted
+        if elapsed:
+            sample = (submitted - previous) / elapsed
+            alpha = policy.arrival_smoothing
+            self._arrival_rate[pool_type] = alpha * sample + (1 - alpha) * self._arrival_rate[pool_type]
+
+    def _scale_up(
+        self,
+        pool_type: PoolType,
+        policy: ScalingPolicy,
+        jobs: list,
+        now: float
+    ) -> Optional[ScalingEvent]:
+        inventory = self.resource_manager.pools[pool_type]
+        shape = self.provider.node_shape(pool_type)
+        shape_vector = np.array(
+            [shape.cpu_cores, shape.memory_gb, shape.accelerator_count], dtype=float
+        )
+
+        demand = np.zeros(3)
+        breached = None
+        for job in jobs:
+            demand += self.resource_manager.demand_vector(job.resource_spec) * job.gang_size
+            waited = now - (job.queued_at or job.created_at).timestamp()
+            target = policy.target_wait_seconds.get(job.priority)
+            if target is not None and waited > target:
+                breached = breached or f"{job.priority} wait {waited:.0f}s > {target:.0f}s"
+
+        horizon = self.provider.boot_latency(pool_type)
+        if jobs and self._arrival_rate[pool_type] > 0:
+            demand += demand / len(jobs) * self._arrival_rate[pool_type] * horizon
+
+        n = inventory.size
+        free = inventory.free[:, :n][:, inventory.active[:n]].sum(axis=1)
+        booting = shape_vector * self.provider.pending_count(pool_type)
+        shortfall = demand - free - booting
+        needed = 0
+        for dim in range(3):
+            if shortfall[dim] > 0 and shape_vector[dim] > 0:
+                needed = max(needed, math.ceil(shortfall[dim] / shape_vector[dim]))
+
+        if needed == 0:
+            self._shortfall_since[pool_type] = None
+            return None
+        if self._shortfall_since[pool_type] is None:
+            self._shortfall_since[pool_type] = now
+        if now - self._last_scale_up[pool_type] < policy.scale_up_cooldown:
+            return None
+        persisted = now - self._shortfall_since[pool_type] >= policy.scale_up_stabilization
+        if not breached and not persisted:
+            return None
+
+        current = len(inventory) + self.provider.pending_count(pool_type)
+        count = min(needed, policy.max_step, policy.max_nodes - current)
+        if count <= 0:
+            return None
+        self.provider.provision(pool_type, count)
+        self._last_scale_up[pool_type] = now
+        self._shortfall_since[pool_type] = None
+        return ScalingEvent(
+            timestamp=datetime.fromtimestamp(now),
+            pool_type=pool_type,
+            action="scale_up",
+            node_count=count,
+            reason=breached or f"predicted shortfall of {needed} node(s)"
+        )
+
+    def _scale_down(self, pool_type: PoolType, policy: ScalingPolicy, now: float) -> Optional[ScalingEvent]:
+        inventory = self.resource_manager.pools[pool_type]
+        n = inventory.size
+        active = inventory.active[:n]
+        idle = active & np.all(inventory.free[:, :n] >= inventory.capacity[:, :n], axis=0)
+
+        removable = []
+        for index in range(n):
+            node_id = inventory.node_ids[index]
+            if not idle[index] or not self.provider.owns(node_id):
+                self._idle_since.pop(node_id, None)
+                continue
+            since = self._idle_since.setdefault(node_id, now)
+            if now - since >= policy.scale_down_idle_seconds:
+                removable.append(node_id)
+
+        if not removable or now - self._last_scale_down[pool_type] < policy.scale_down_cooldown:
+            return None
+        total = inventory.capacity[:, :n][:, active].sum(axis=1)
+        used = total - inventory.free[:, :n][:, active].sum(axis=1)
+        utilization = float(np.max(np.divide(used, total, out=np.zeros(3), where=total > 0)))
+        if utilization >= policy.scale_down_utilization:
+            return None
+
+        count = min(len(removable), policy.max_step, len(inventory) - policy.min_nodes)
+        if count <= 0:
+            return None
+        for node_id in removable[:count]:
+            self.resource_manager.remove_node(pool_type, node_id)
+            self.provider.terminate(pool_type, node_id)
+            self._idle_since.pop(node_id, None)
+        self._last_scale_down[pool_type] = now
+        return ScalingEvent(
+            timestamp=datetime.fromtimestamp(now),
+            pool_type=pool_type,
+            action="scale_down",
+            node_count=count,
+            reason=f"{count} node(s) idle for {policy.scale_down_idle_seconds:.0f}s"
+        )
@@ -0,0 +1,364 @@
+"""
+Backfill Planner for Compute Factory
+EASY and conservative backfill: reserve the earliest start of blocked jobs
+from runtime estimates and let shorter jobs use the gaps.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+import itertools
+import math
+import numpy as np
+
+from .resource_manager import ResourceManager, ResourceType
+
+
+_NONE: FrozenSet[int] = frozenset()
+
+
+class BackfillMode(str, Enum):
+    """How a scheduling pass treats jobs that cannot start yet"""
+    OFF = "off"  # Strict order: a blocked job blocks its whole pool
+    EASY = "easy"  # Reserve for the first blocked job of each pool
+    CONSERVATIVE = "conservative"  # Reserve for every blocked job
+
+
+@dataclass
+class Reservation:
+    """Capacity promised to a blocked job from its earliest start onward"""
+    job_id: str
+    pool_type: str
+    start: float  # Unix seconds
+    nodes: np.ndarray  # Node slot indices the job is planned on
+    demand: np.ndarray  # (3, len(nodes)) resources the job needs on each node
+    slack: np.ndarray  # (3, len(nodes)) room left there for jobs running past start
+
+
+class BackfillPlanner:
+    """
+    Backfill scheduling from job runtime estimates.
+
+    Without reservations, a job that does not fit is skipped and smaller jobs
+    behind it keep taking whatever frees up, so a large gang can wait
+    forever. With backfill, the first job of a pool that cannot start (EASY)
+    or every such job (CONSERVATIVE) gets a reservation: the earliest time
+    its resources will be free, found by releasing running jobs' allocations
+    at started_at + runtime_estimate, and the nodes it will use then. Jobs
+    further back may still start now if they finish before the reservation
+    begins, or if they only use capacity the reserved job will not need.
+    Jobs without an estimate are assumed to run forever, so they can only
+    use spare capacity and never make room for a reservation.
+
+    Release times are kept per pool as jobs start and stop (via
+    JobScheduler), so computing a reservation costs a few vectorized passes
+    over the running allocations of one pool.
+    """
+
+    def __init__(
+        self,
+        resource_manager: ResourceManager,
+        mode: BackfillMode = BackfillMode.EASY,
+        max_reservations: int = 32
+    ):
+        """
+        Args:
+            resource_manager: Manager whose pools are planned
+            mode: Backfill mode
+            max_reservations: Reservations per pool and pass in CONSERVATIVE
+                mode; blocked jobs beyond this are skipped as without backfill
+        """
+        self.resource_manager = resource_manager
+        self.mode = BackfillMode(mode)
+        self.max_reservations = max_reservations
+        self.backfilled = 0  # Jobs started ahead of a blocked job
+        self.reservations: Dict[str, List[Reservation]] = {}  # Last pass, per pool
+        self._releases: Dict[str, Dict[str, List[tuple]]] = {}  # pool -> job_id -> events
+
+    def job_started(self, job: Any):
+        """Record when a started job's allocations are expected back"""
+        if job.pool_type is None or not job.runtime_estimate or job.started_at is None:
+            return
+        inventory = self.resource_manager.pools[job.pool_type]
+        end = job.started_at.timestamp() + job.runtime_estimate
+        events = []
+        for allocation in self.resource_manager.get_allocations(job.allocation_id):
+            index = inventory.index_of(allocation.node_id) if allocation.node_id else None
+            if index is not None:
+                demand = self.resource_manager.demand_vector(allocation.resource_spec)
+                events.append((end, index, *demand.tolist()))
+        self._releases.setdefault(job.pool_type, {})[job.job_id] = events
+
+    def job_stopped(self, job: Any):
+        """Forget a finished or preempted job's release"""
+        self._releases.get(job.pool_type, {}).pop(job.job_id, None)
+
+    def begin(self, now: datetime) -> "BackfillPass":
+        """Start a scheduling pass at the given time"""
+        self.reservations = {}
+        return BackfillPass(self, now.timestamp())
+
+    def release_events(self, pool_type: str, now: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Expected releases of running jobs in a pool.
+
+        Jobs that have overrun their estimate are expected back now.
+
+        Returns:
+            (end times, node slot indices, (3, m) resources) sorted by end time
+        """
+        rows = list(itertools.chain.from_iterable(self._releases.get(pool_type, {}).values()))
+        if not rows:
+            return np.zeros(0), np.zeros(0, dtype=np.int64), np.zeros((3, 0))
+        table = np.array(rows)
+        table = table[np.argsort(table[:, 0], kind="stable")]
+        return np.maximum(table[:, 0], now), table[:, 1].astype(np.int64), table[:, 2:].T.copy()
+
+    def get_status(self) -> Dict:
+        """Mode, backfilled job count and the last pass's reservations"""
+        return {
+            "mode": self.mode.value,
+            "backfilled_jobs": self.backfilled,
+            "reservations": [
+                {
+                    "job_id": r.job_id,
+                    "pool_type": r.pool_type,
+                    "start": datetime.fromtimestamp(r.start).isoformat(),
+                    "nodes": len(r.nodes)
+                }
+                for reservations in self.reservations.values()
+                for r in reservations
+            ]
+        }
+
+
+class BackfillPass:
+    """
+    Reservation state of one scheduling pass (see BackfillPlanner).
+
+    The scheduler asks admits() before trying a job, places it inside
+    holding(), which hides reserved capacity the job must not use, and then
+    reports started() or blocked().
+    """
+
+    def __init__(self, planner: BackfillPlanner, now: float):
+        self.planner = planner
+        self.now = now
+        self.reservations = planner.reservations
+        self.blocked_pools: Set[str] = set()
+        self._timelines: Dict[str, _Timeline] = {}
+        self._reserved: Dict[str, np.ndarray] = {}  # pool -> capacity promised to reservations
+
+    def admits(self, job: Any) -> bool:
+        """Whether the job may be tried at all (False behind a strict block)"""
+        return not (self.planner.mode == BackfillMode.OFF and job.pool_type in self.blocked_pools)
+
+    def applied(self, job: Any) -> FrozenSet[int]:
+        """Positions of the pool's reservations that the job would outlast"""
+        reservations = self.reservations.get(job.pool_type)
+        if not reservations:
+            return _NONE
+        end = self._end(job)
+        return frozenset(i for i, r in enumerate(reservations) if r.start < end)
+
+    @contextmanager
+    def holding(self, job: Any) -> Iterator[None]:
+        """Hide reserved capacity from the job while it is being placed"""
+        reservations = self._outlasted(job)
+        if not reservations:
+            yield
+            return
+        inventory = self.planner.resource_manager.pools[job.pool_type]
+        n = inventory.size
+        usable = inventory.free[:, :n].copy()
+        for r in reservations:
+            usable[:, r.nodes] = np.minimum(usable[:, r.nodes], r.slack)
+        hold = inventory.free[:, :n] - usable
+        inventory.free[:, :n] -= hold
+        try:
+            yield
+        finally:
+            inventory.free[:, :n] += hold
+
+    def started(self, job: Any):
+        """Charge a job started in this pass to the reservations it outlives"""
+        if job.pool_type in self.blocked_pools:
+            self.planner.backfilled += 1
+        reservations = self._outlasted(job)
+        if not reservations:
+            return
+        resource_manager = self.planner.resource_manager
+        inventory = resource_manager.pools[job.pool_type]
+        for allocation in resource_manager.get_allocations(job.allocation_id):
+            index = inventory.index_of(allocation.node_id)
+            demand = resource_manager.demand_vector(allocation.resource_spec)
+            for r in reservations:
+                r.slack[:, r.nodes == index] -= demand[:, None]
+
+    def blocked(self, job: Any) -> Optional[Reservation]:
+        """
+        Record that a job could not start, reserving its earliest start if
+        the mode calls for it.
+
+        Returns:
+            The new reservation, or None
+        """
+        pool_type = job.pool_type
+        mode = self.planner.mode
+        if pool_type not in self.blocked_pools:
+            self.blocked_pools.add(pool_type)
+        elif mode != BackfillMode.CONSERVATIVE:
+            return None
+        if mode == BackfillMode.OFF or job.resource_spec is None:
+            return None
+        existing = self.reservations.setdefault(pool_type, [])
+        if len(existing) >= self.planner.max_reservations:
+            return None
+        reservation = self._reserve(job)
+        if reservation is not None:
+            existing.append(reservation)
+            inventory = self.planner.resource_manager.pools[pool_type]
+            reserved = self._reserved.setdefault(pool_type, np.zeros_like(inventory.free))
+            reserved[:, reservation.nodes] += reservation.demand
+        return reservation
+
+    # Internals
+
+    def _end(self, job: Any) -> float:
+        return self.now + job.runtime_estimate if job.runtime_estimate else math.inf
+
+    def _outlasted(self, job: Any) -> List[Reservation]:
+        end = self._end(job)
+        return [r for r in self.reservations.get(job.pool_type, ()) if r.start < end]
+
+    def _timeline(self, pool_type: str) -> "_Timeline":
+        timeline = self._timelines.get(pool_type)
+        if timeline is None:
+            events = self.planner.release_events(pool_type, self.now)
+            timeline = self._timelines[pool_type] = _Timeline(*events)
+        return timeline
+
+    def _reserve(self, job: Any) -> Optional[Reservation]:
+        """
+        Find the earliest time and nodes at which a job fits once running jobs
+        release their allocations, treating earlier reservations as taken.
+        """
+        resource_manager = self.planner.resource_manager
+        inventory = resource_manager.pools[job.pool_type]
+        spec = job.resource_spec
+        demand = resource_manager.demand_vector(spec)
+        if not demand.any():
+            return None
+        accelerator_type = None if spec.resource_type == ResourceType.CPU else spec.resource_type
+        n = inventory.size
+        profile = inventory.free[:, :n].copy()
+        reserved = self._reserved.get(job.pool_type)
+        if reserved is not None:
+            profile -= reserved[:, :n]
+        mask = inventory.eligible(demand, accelerator_type, spec.accelerator_model)
+        timeline = self._timeline(job.pool_type)
+
+        slots = max(1, job.gang_size)
+        for start in self._candidate_starts(demand, slots, mask, profile, timeline):
+            future = timeline.free_at(start, profile)
+            if slots == 1:
+                index = inventory.select(
+                    demand, resource_manager.placement_policy,
+                    accelerator_type, spec.accelerator_model, free=future
+                )
+                plan = [(index, 1)] if index is not None else None
+            else:
+                plan = inventory.plan_gang(
+                    demand, slots, accelerator_type, spec.accelerator_model, free=future
+                )
+            if plan is None:
+                continue
+            indices = np.array([index for index, _ in plan], dtype=np.int64)
+            needed = demand[:, None] * np.array([count for _, count in plan], dtype=float)
+            return Reservation(
+                job_id=job.job_id,
+                pool_type=job.pool_type,
+                start=start,
+                nodes=indices,
+                demand=needed,
+                slack=future[:, indices] - needed
+            )
+        return None
+
+    def _candidate_starts(
+        self,
+        demand: np.ndarray,
+        slots: int,
+        mask: np.ndarray,
+        profile: np.ndarray,
+        timeline: "_Timeline",
+        max_candidates: int = 16
+    ) -> List[float]:
+        """
+        Release times, earliest first, at which enough slots are free on
+        eligible nodes for the job (a necessary condition; the caller still
+        plans the placement).
+        """
+        dims = np.flatnonzero(demand > 0)
+        per_slot = demand[dims][:, None]
+
+        def slot_counts(free: np.ndarray) -> np.ndarray:
+            return np.maximum(np.floor(free[dims] / per_slot).min(axis=0), 0)
+
+        initial = slot_counts(profile[:, mask]).sum() if mask.any() else 0
+        if not len(timeline.ends):
+            return [self.now] if initial >= slots else []
+        # Slots each release adds on its node, from the node's free capacity
+        # just before and just after it
+        after = profile[:, timeline.by_node] + timeline.released
+        gained = slot_counts(after) - slot_counts(after - timeline.node_amounts)
+        gained[~mask[timeline.by_node]] = 0
+        in_time_order = np.empty(len(gained))
+        in_time_order[timeline.order] = gained
+
+        total = initial + np.cumsum(in_time_order)
+        reachable = np.flatnonzero(total >= slots)
+        if not len(reachable):
+            return []
+        times = [self.now] if initial >= slots else []
+        ends = timeline.ends[reachable[0]:]
+        distinct = np.concatenate(([True], ends[1:] != ends[:-1]))  # ends are sorted
+        times.extend(ends[distinct][:max_candidates].tolist())
+        return times
+
+
+class _Timeline:
+    """
+    Expected releases of one pool (see BackfillPlanner.release_events),
+    with running totals per node.
+    """
+
+    def __init__(self, ends: np.ndarray, nodes: np.ndarray, amounts: np.ndarray):
+        self.ends = ends
+        self.nodes = nodes
+        self.amounts = amounts
+        # Events grouped by node, in time order within a node
+        self.order = np.lexsort((ends, nodes))
+        self.by_node = nodes[self.order]
+        self.node_amounts = amounts[:, self.order]
+        if not len(ends):  # Nothing is expected to be released
+            self.released = self.node_amounts
+            return
+        cumulative = np.cumsum(self.node_amounts, axis=1)
+        first = np.r_[0, np.flatnonzero(self.by_node[1:] != self.by_node[:-1]) + 1]
+        lengths = np.diff(np.r_[first, len(self.order)])
+        base = np.repeat(cumulative[:, first] - self.node_amounts[:, first], lengths, axis=1)
+        self.released = cumulative - base  # Released on the node up to and including each event
+
+    def free_at(self, when: float, profile: np.ndarray) -> np.ndarray:
+        """Free capacity once every release up to `when` has happened"""
+        done = int(np.searchsorted(self.ends, when, side="right"))
+        future = profile.copy()
+        n = future.shape[1]
+        for dim in range(future.shape[0]):
+            future[dim] += np.bincount(
+                self.nodes[:done], weights=self.amounts[dim, :done], minlength=n
+            )[:n]
+        return future
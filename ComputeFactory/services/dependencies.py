@@ -0,0 +1,144 @@
+"""
+Job Dependencies for Compute Factory
+DAG of unfinished jobs with release on completion and critical-path ranking.
+"""
+
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+class DependencyError(ValueError):
+    """Raised when a job depends on a job the scheduler does not know"""
+
+
+class DependencyGraph:
+    """
+    Edges between unfinished jobs and their critical paths.
+
+    Only jobs that still matter are kept: an edge disappears as soon as its
+    upstream job completes, and a job leaves the graph once it finishes or
+    is failed by an upstream. A job's critical_path is the estimated length
+    of the longest chain of dependent work it gates: the maximum over its
+    dependents of their runtime estimate plus their own critical_path (0
+    for jobs nothing waits on). Jobs without an estimate count as
+    default_runtime seconds, so unestimated DAGs are ranked by remaining
+    depth. Paths are updated incrementally, walking upstream only while a
+    value actually changes.
+    """
+
+    def __init__(self, default_runtime: float = 1.0):
+        """
+        Args:
+            default_runtime: Runtime assumed for jobs without runtime_estimate
+        """
+        self.default_runtime = default_runtime
+        self.jobs: Dict[str, Any] = {}
+        self.upstream: Dict[str, Set[str]] = {}  # job_id -> unfinished upstream job_ids
+        self.downstream: Dict[str, Set[str]] = {}  # job_id -> waiting dependent job_ids
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.jobs
+
+    def add(self, job: Any, upstream: Iterable[Any]) -> List[Any]:
+        """
+        Register a job and its unfinished upstream jobs.
+
+        Args:
+            job: New job, which nothing depends on yet
+            upstream: Upstream jobs that have not finished yet
+
+        Returns:
+            Other jobs whose critical_path changed
+        """
+        upstream = list(upstream)
+        if not upstream:
+            return []
+        self.jobs[job.job_id] = job
+        self.upstream[job.job_id] = {u.job_id for u in upstream}
+        for parent in upstream:
+            self.jobs[parent.job_id] = parent
+            self.downstream.setdefault(parent.job_id, set()).add(job.job_id)
+        return self._propagate(upstream)
+
+    def finished(self, job_id: str, success: bool) -> Tuple[List[Any], List[Any], List[Any]]:
+        """
+        Remove a finished job and work out the effect on its dependents.
+
+        Args:
+            job_id: Job that completed, failed or was cancelled
+            success: Whether it completed successfully
+
+        Returns:
+            (dependents no longer waiting on anything, dependents failed
+            transitively by this failure, other jobs whose critical_path
+            changed)
+        """
+        if job_id not in self.jobs:
+            return [], [], []
+        released, failed = [], []
+        touched: Dict[str, Any] = {}
+        if success:
+            for child in self.downstream.get(job_id, ()):
+                waiting = self.upstream[child]
+                waiting.discard(job_id)
+                if not waiting:
+                    released.append(self.jobs[child])
+                    self._forget_if_isolated(child)
+        else:
+            stack = list(self.downstream.get(job_id, ()))
+            while stack:
+                child = stack.pop()
+                if child not in self.jobs:
+                    continue
+                failed.append(self.jobs[child])
+                stack.extend(self.downstream.get(child, ()))
+                touched.update(self._remove(child))
+        touched.update(self._remove(job_id))
+        for job in failed:
+            touched.pop(job.job_id, None)
+        touched.pop(job_id, None)
+        return released, failed, self._propagate(touched.values())
+
+    def _remove(self, job_id: str) -> Dict[str, Any]:
+        """Drop a job and its edges; returns its former upstream jobs"""
+        self.jobs.pop(job_id, None)
+        parents = self.upstream.pop(job_id, set())
+        result = {p: self.jobs[p] for p in parents if p in self.jobs}
+        for parent in parents:
+            children = self.downstream.get(parent)
+            if children is not None:
+                children.discard(job_id)
+                if not children:
+                    del self.downstream[parent]
+                    self._forget_if_isolated(parent)
+        for child in self.downstream.pop(job_id, ()):
+            waiting = self.upstream.get(child)
+            if waiting is not None:
+                waiting.discard(job_id)
+        return result
+
+    def _forget_if_isolated(self, job_id: str):
+        """Keep the job only while it has edges"""
+        if not self.upstream.get(job_id) and not self.downstream.get(job_id):
+            self.upstream.pop(job_id, None)
+            self.downstream.pop(job_id, None)
+            self.jobs.pop(job_id, None)
+
+    def _runtime(self, job: Any) -> float:
+        return job.runtime_estimate or self.default_runtime
+
+    def _propagate(self, jobs: Iterable[Any]) -> List[Any]:
+        """Recompute critical paths from the given jobs upstream"""
+        changed: Dict[str, Any] = {}
+        stack = list(jobs)
+        while stack:
+            job = stack.pop()
+            path = max(
+                (self._runtime(self.jobs[c]) + self.jobs[c].critical_path
+                 for c in self.downstream.get(job.job_id, ())),
+                default=0.0
+            )
+            if path != job.critical_path:
+                job.critical_path = path
+                changed[job.job_id] = job
+                stack.extend(self.jobs[p] for p in self.upstream.get(job.job_id, ()))
+        return list(changed.values())
@@ -0,0 +1,522 @@
+"""
+Local Executor for Compute Factory
+Runs compute jobs as subprocesses pinned to their cores, with memory limits.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from collections import deque
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import threading
+import time
+import psutil
+
+from .resource_manager import ResourceManager, ResourceType, NodeSpec, PoolType
+from .scheduler import JobScheduler, ComputeJob
+from .topology import read_host_topology
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+GIB = 1024**3
+
+
+class _Process:
+    """A launched job"""
+
+    def __init__(
+        self,
+        job: ComputeJob,
+        popen: subprocess.Popen,
+        cores: List[int],
+        devices: List[int],
+        cgroup: Optional[str]
+    ):
+        self.job = job
+        self.popen = popen
+        self.cores = cores
+        self.devices = devices
+        self.cgroup = cgroup
+        self.pidfd: Optional[int] = None
+        self.kill_at: Optional[float] = None  # SIGKILL deadline after SIGTERM
+
+
+class LocalExecutor:
+    """
+    Launches jobs placed on this host as subprocesses.
+
+    A job runs when it starts (JobScheduler.start_job) if it has a command
+    and all of its allocations are on this executor's node. Each process is
+    pinned with os.sched_setaffinity to as many host cores as it was
+    allocated (CPU jobs: resource_spec.count, on the allocation's cpu_ids
+    when the resource manager chose them; accelerator jobs:
+    cores_per_accelerator per device, plus CUDA_VISIBLE_DEVICES), so jobs
+    never share cores and benchmarks are not disturbed by neighbours. Memory
+    is capped at the allocation's memory_gb: through a per-job cgroup v2
+    (memory.max and cpuset.cpus) when the hierarchy is writable, otherwise
+    with RLIMIT_AS. Preempted jobs get SIGTERM, then SIGKILL after
+    kill_grace seconds.
+
+    Launching and reaping happen on a background thread (exits are noticed
+    through pidfds where the kernel supports them), so scheduling passes
+    never wait on fork/exec. Exit codes are reported back by releasing the
+    job's allocation and calling JobScheduler.complete_job through
+    `dispatch`, which must run the change on the thread that owns the
+    scheduler (see SchedulingLoop.call_threadsafe).
+    """
+
+    def __init__(
+        self,
+        resource_manager: ResourceManager,
+        scheduler: JobScheduler,
+        node_id: Optional[str] = None,
+        cores: Optional[List[int]] = None,
+        accelerators: int = 0,
+        cores_per_accelerator: int = 1,
+        cgroup_root: Optional[str] = CGROUP_ROOT,
+        cgroup_name: str = "compute-factory",
+        log_dir: Optional[str] = None,
+        kill_grace: float = 10.0,
+        dispatch: Optional[Callable[[Callable[[], Any]], Any]] = None
+    ):
+        """
+        Args:
+            resource_manager: Manager holding the jobs' allocations
+            scheduler: Scheduler whose started jobs are executed
+            node_id: Node this executor runs jobs for (default: hostname)
+            cores: Host cores jobs may be pinned to (default: this
+                process's affinity)
+            accelerators: Local accelerator devices, numbered from 0
+            cores_per_accelerator: Cores pinned per accelerator requested
+            cgroup_root: Mount point of the cgroup v2 hierarchy, or None to
+                only use rlimits
+            cgroup_name: Parent cgroup created for job cgroups
+            log_dir: Directory for <job_id>.log output files (default:
+                inherit this process's stdout/stderr)
+            kill_grace: Seconds between SIGTERM and SIGKILL on preemption
+            dispatch: Runs a state change on the scheduler's owning thread
+                (default: call it directly, then schedule pending jobs)
+        """
+        self.resource_manager = resource_manager
+        self.scheduler = scheduler
+        self.node_id = node_id or socket.gethostname()
+        self.cores = sorted(cores if cores is not None else self._host_cores())
+        self.accelerators = accelerators
+        self.cores_per_accelerator = cores_per_accelerator
+        self.log_dir = log_dir
+        self.kill_grace = kill_grace
+        self.dispatch = dispatch or self._dispatch_directly
+        self.cgroup_parent = self._setup_cgroup(cgroup_root, cgroup_name) if cgroup_root else None
+
+        self.launched = 0
+        self.exited = 0
+        self.launch_failures = 0
+        self._free_cores: Set[int] = set(self.cores)
+        self._free_devices: Set[int] = set(range(accelerators))
+        self._processes: Dict[int, _Process] = {}  # pid -> process, until reaped
+        self._current: Dict[str, _Process] = {}  # job_id -> process of the job's current run
+        self._launches: deque = deque()
+        self._lock = threading.Lock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def node_spec(self, memory_gb: Optional[int] = None) -> NodeSpec:
+        """
+        Describe this host for ResourceManager.add_node, so the scheduler
+        never places more on it than the executor can pin.
+
+        Args:
+            memory_gb: Memory to offer (default: total host memory)
+        """
+        return NodeSpec(
+            node_id=self.node_id,
+            cpu_cores=len(self.cores),
+            memory_gb=memory_gb if memory_gb is not None else int(psutil.virtual_memory().total // GIB),
+            accelerator_type=ResourceType.GPU if self.accelerators else None,
+            accelerator_count=self.accelerators,
+            topology=read_host_topology(cpus=self.cores)
+        )
+
+    def start(self, pool_type: Optional[PoolType] = None):
+        """
+        Attach to the scheduler and start the launch/reap thread.
+
+        Jobs recovered as running on this node have no process any more;
+        they are failed and their resources released.
+
+        Args:
+            pool_type: Register this host as a node of the pool first
+        """
+        if self._running:
+            return
+        if pool_type is not None and self.node_id not in self.resource_manager.nodes:
+            self.resource_manager.add_node(pool_type, self.node_spec())
+        for job in list(self.scheduler.running_jobs.values()):
+            if job.command and self._is_local(job):
+                self._finish(job.job_id, None)
+        self.scheduler.executor = self
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, kill: bool = True):
+        """
+        Stop the thread and detach from the scheduler.
+
+        Args:
+            kill: Also kill running jobs' process groups
+        """
+        if self.scheduler.executor is self:
+            self.scheduler.executor = None
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            if kill:
+                self._signal(process, signal.SIGKILL)
+            if process.pidfd is not None:
+                os.close(process.pidfd)
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+    # Scheduler hooks
+
+    def job_started(self, job: ComputeJob):
+        """Queue a started job for launch if it runs on this node"""
+        if not job.command or not self._is_local(job):
+            return
+        with self._lock:
+            self._launches.append(job)
+        self._wake()
+
+    def job_stopped(self, job: ComputeJob):
+        """Terminate the process group of a job preempted or completed from outside"""
+        with self._lock:
+            queued = [j for j in self._launches if j.job_id == job.job_id]
+            if queued:
+                self._launches.remove(queued[0])
+                return
+            process = self._current.pop(job.job_id, None)
+            if process is None:
+                return
+            process.kill_at = time.monotonic() + self.kill_grace
+        self._signal(process, signal.SIGTERM)
+        self._wake()
+
+    def get_status(self) -> Dict:
+        """Launched, running and exited counts and per-job pinning"""
+        with self._lock:
+            processes = list(self._processes.values())
+            free_cores = len(self._free_cores)
+        return {
+            "node_id": self.node_id,
+            "running": self._running,
+            "cores": len(self.cores),
+            "free_cores": free_cores,
+            "cgroup": self.cgroup_parent,
+            "launched": self.launched,
+            "exited": self.exited,
+            "launch_failures": self.launch_failures,
+            "processes": [
+                {
+                    "job_id": p.job.job_id,
+                    "pid": p.popen.pid,
+                    "cores": p.cores,
+                    "terminating": p.kill_at is not None
+                }
+                for p in processes
+            ]
+        }
+
+    # Launching
+
+    def _launch(self, job: ComputeJob) -> bool:
+        """
+        Pin, limit and start one job; failures complete the job as failed.
+
+        Returns:
+            False if the job must wait for terminating processes to free
+            their cores
+        """
+        num_cores, num_devices, memory_gb = self._demand(job)
+        pinned = self._pinned_cores(job)
+        cores = devices = None
+        with self._lock:
+            if num_cores <= len(self._free_cores) and num_devices <= len(self._free_devices):
+                # Cores chosen by topology-aware placement, then the
+                # lowest-numbered free ones, which keeps a job's cores adjacent
+                preferred = [c for c in pinned if c in self._free_cores]
+                cores = sorted((preferred + sorted(self._free_cores.difference(preferred)))[:num_cores])
+                devices = sorted(self._free_devices)[:num_devices]
+                self._free_cores.difference_update(cores)
+                self._free_devices.difference_update(devices)
+            elif len(self._processes) > len(self._current):
+                return False
+        if cores is None:
+            print(f"⚠️  Not enough free cores or devices on {self.node_id} for {job.job_id}")
+            self._fail_launch(job)
+            return True
+
+        cgroup = output = None
+        try:
+            cgroup = self._create_cgroup(job.job_id, cores, memory_gb)
+            env = dict(os.environ, COMPUTE_JOB_ID=job.job_id)
+            if self.accelerators:
+                env["CUDA_VISIBLE_DEVICES"] = ",".join(map(str, devices))
+            if self.log_dir:
+                os.makedirs(self.log_dir, exist_ok=True)
+                output = open(os.path.join(self.log_dir, f"{job.job_id}.log"), "ab")
+            popen = subprocess.Popen(
+                job.command,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=output,
+                stderr=subprocess.STDOUT if output else None,
+                start_new_session=True,  # Own process group, killed as a whole
+                preexec_fn=self._limits(cores, None if cgroup else memory_gb, cgroup)
+            )
+        except (OSError, subprocess.SubprocessError) as e:  # SubprocessError: preexec_fn failed
+            print(f"⚠️  Failed to launch {job.job_id}: {e}")
+            self._release_local(cores, devices, cgroup)
+            self._fail_launch(job)
+            return True
+        except Exception:
+            self._release_local(cores, devices, cgroup)
+            raise  # _run fails the job
+        finally:
+            if output is not None:
+                output.close()
+
+        process = _Process(job, popen, cores, devices, cgroup)
+        if hasattr(os, "pidfd_open"):
+            try:
+                process.pidfd = os.pidfd_open(popen.pid)
+                self._selector.register(process.pidfd, selectors.EVENT_READ, process)
+            except OSError:
+                process.pidfd = None
+        with self._lock:
+            self._processes[popen.pid] = process
+            self._current[job.job_id] = process
+        self.launched += 1
+        return True
+
+    def _fail_launch(self, job: ComputeJob):
+        """Complete a job that could not be launched as failed"""
+        self.launch_failures += 1
+        try:
+            self.dispatch(lambda: self._finish(job.job_id, None))
+        except Exception as e:
+            print(f"⚠️  Failed to report launch failure of {job.job_id}: {e}")
+
+    def _demand(self, job: ComputeJob) -> Tuple[int, int, Optional[int]]:
+        """(cores, devices, memory_gb) of a job's allocations on this node"""
+        cores = devices = memory_gb = 0
+        for allocation in self.resource_manager.get_allocations(job.allocation_id):
+            spec = allocation.resource_spec
+            if spec.resource_type == ResourceType.CPU:
+                cores += spec.count
+            else:
+                devices += spec.count
+                cores += spec.count * self.cores_per_accelerator
+            memory_gb += spec.memory_gb or 0
+        return cores, devices, memory_gb or None
+
+    def _pinned_cores(self, job: ComputeJob) -> List[int]:
+        """Cores the resource manager assigned to a job's allocations"""
+        return sorted(
+            cpu
+            for allocation in self.resource_manager.get_allocations(job.allocation_id)
+            for cpu in allocation.cpu_ids or ()
+        )
+
+    @staticmethod
+    def _limits(cores: List[int], memory_gb: Optional[int], cgroup: Optional[str]) -> Callable[[], None]:
+        """preexec_fn applying pinning and limits in the child before exec"""
+        def apply():
+            if cgroup:
+                with open(os.path.join(cgroup, "cgroup.procs"), "w") as f:
+                    f.write(str(os.getpid()))
+            if hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, cores)
+            if memory_gb and resource is not None:
+                limit = int(memory_gb * GIB)
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        return apply
+
+    # Reaping
+
+    def _run(self):
+        """Launch queued jobs, reap exits and escalate overdue terminations"""
+        while self._running:
+            with self._lock:
+                launches = list(self._launches)
+                self._launches.clear()
+            waiting = []
+            for job in launches:
+                try:
+                    if not self._launch(job):
+                        waiting.append(job)
+                except Exception as e:
+                    print(f"⚠️  Launch of {job.job_id} failed: {e}")
+                    self._fail_launch(job)
+            if waiting:  # Retried once a reaped process frees its cores
+                with self._lock:
+                    self._launches.extendleft(reversed(waiting))
+
+            for key, _ in self._selector.select(timeout=self._timeout()):
+                if key.fileobj == self._wake_r:
+                    self._drain_wake()
+                else:
+                    self._reap(key.data)
+            if not hasattr(os, "pidfd_open"):
+                with self._lock:
+                    exited = [p for p in self._processes.values() if p.popen.poll() is not None]
+                for process in exited:
+                    self._reap(process)
+
+            now = time.monotonic()
+            with self._lock:
+                overdue = [p for p in self._processes.values() if p.kill_at is not None and p.kill_at <= now]
+            for process in overdue:
+                process.kill_at = float("inf")
+                self._signal(process, signal.SIGKILL)
+
+    def _timeout(self) -> Optional[float]:
+        with self._lock:
+            deadlines = [p.kill_at for p in self._processes.values() if p.kill_at not in (None, float("inf"))]
+        timeout = max(min(deadlines) - time.monotonic(), 0.0) if deadlines else None
+        if not hasattr(os, "pidfd_open"):
+            timeout = 0.1 if timeout is None else min(timeout, 0.1)
+        return timeout
+
+    def _reap(self, process: _Process):
+        """Collect an exited process and report its exit code"""
+        code = process.popen.poll()
+        if code is None:
+            return
+        if process.pidfd is not None:
+            self._selector.unregister(process.pidfd)
+            os.close(process.pidfd)
+            process.pidfd = None
+        job_id = process.job.job_id
+        with self._lock:
+            self._processes.pop(process.popen.pid, None)
+            current = self._current.get(job_id) is process
+            if current:
+                del self._current[job_id]
+        self._release_local(process.cores, process.devices, process.cgroup)
+        self.exited += 1
+        if current:  # Preempted runs were already stopped by the scheduler
+            self.dispatch(lambda: self._finish(job_id, code))
+
+    def _finish(self, job_id: str, exit_code: Optional[int]):
+        """Record the exit code, release the allocation and complete the job"""
+        job = self.scheduler.running_jobs.get(job_id)
+        if job is None:
+            return
+        job.exit_code = exit_code
+        if job.allocation_id:
+            self.resource_manager.release_resource(job.allocation_id)
+        self.scheduler.complete_job(job_id, success=exit_code == 0)
+
+    def _dispatch_directly(self, fn: Callable[[], Any]):
+        fn()
+        self.scheduler.schedule_pending(self.resource_manager)
+
+    def _release_local(self, cores: List[int], devices: List[int], cgroup: Optional[str]):
+        with self._lock:
+            self._free_cores.update(cores)
+            self._free_devices.update(devices)
+        if cgroup:
+            try:
+                os.rmdir(cgroup)
+            except OSError:
+                pass
+
+    def _signal(self, process: _Process, signum: int):
+        try:
+            os.killpg(process.popen.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _drain_wake(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    # Placement helpers
+
+    def _is_local(self, job: ComputeJob) -> bool:
+        allocations = self.resource_manager.get_allocations(job.allocation_id) if job.allocation_id else []
+        return bool(allocations) and all(a.node_id == self.node_id for a in allocations)
+
+    @staticmethod
+    def _host_cores() -> List[int]:
+        if hasattr(os, "sched_getaffinity"):
+            return list(os.sched_getaffinity(0))
+        return list(range(os.cpu_count() or 1))
+
+    # cgroup v2
+
+    @staticmethod
+    def _setup_cgroup(root: str, name: str) -> Optional[str]:
+        """Create the parent cgroup for jobs, or None if cgroup v2 is not writable"""
+        if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return None
+        parent = os.path.join(root, name)
+        try:
+            os.makedirs(parent, exist_ok=True)
+            with open(os.path.join(parent, "cgroup.subtree_control"), "w") as f:
+                f.write("+cpuset +memory")
+        except OSError:
+            return None
+        return parent
+
+    def _create_cgroup(self, job_id: str, cores: List[int], memory_gb: Optional[int]) -> Optional[str]:
+        """Per-job cgroup with memory.max and cpuset.cpus, or None to fall back to rlimits"""
+        if not self.cgroup_parent:
+            return None
+        path = os.path.join(self.cgroup_parent, job_id)
+        try:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, "cpuset.cpus"), "w") as f:
+                f.write(",".join(map(str, cores)))
+            if memory_gb:
+                with open(os.path.join(path, "memory.max"), "w") as f:
+                    f.write(str(int(memory_gb * GIB)))
+        except OSError:
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+            return None
+        return path
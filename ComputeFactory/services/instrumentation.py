@@ -0,0 +1,209 @@
+"""
+Scheduler Instrumentation for Compute Factory
+Queue-wait, placement-latency, preemption and utilization metrics in Prometheus text format.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from datetime import datetime
+
+from .placement import RESOURCE_DIMS
+from .resource_manager import ResourceManager, PoolType
+
+
+# Job waits span sub-second placements to day-long queues
+WAIT_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 1800, 3600, 4 * 3600, 12 * 3600, 24 * 3600)
+# Placement calls and scheduling passes take microseconds to tens of milliseconds
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: observe() is a bisect and two additions.
+
+    Buckets are upper bounds; values above the last one only land in +Inf.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str = "") -> List[str]:
+        """Prometheus bucket/sum/count lines (labels: 'key="value",...' or '')"""
+        sep = "," if labels else ""
+        result = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            result.append(f'{name}_bucket{{{labels}{sep}le="{bound:g}"}} {cumulative}')
+        result.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        result.append(f"{name}_sum{suffix} {self.sum}")
+        result.append(f"{name}_count{suffix} {self.count}")
+        return result
+
+
+class SchedulerMetrics:
+    """
+    Instrumentation of a JobScheduler and its ResourceManager.
+
+    Once attached, the scheduler reports queue entries, starts, placements,
+    preemptions and scheduling passes; each report updates a fixed-bucket
+    histogram or a counter, so the hot path pays a few additions and no
+    allocation. Queue depth and pool capacity, allocation and metered
+    usage are read only when exporting. export_prometheus_format() renders
+    everything in the text format of ObservabilityFactory's
+    MetricsCollector, which can include it via register_collector().
+
+    Histograms:
+        compute_queue_wait_seconds{priority}: time from entering the queue
+            (submission, release by upstream jobs, or requeue) to start
+        compute_submit_to_start_seconds{priority}: submission to first start,
+            including time blocked on dependencies
+        compute_allocation_latency_seconds{pool}: ResourceManager placement
+            call per job, successful or not
+        compute_schedule_pass_seconds: one schedule_pending() pass
+    """
+
+    def __init__(self, resource_manager: ResourceManager, scheduler):
+        """
+        Args:
+            resource_manager: Manager whose pools are reported
+            scheduler: JobScheduler to instrument (see attach)
+        """
+        self.resource_manager = resource_manager
+        self.scheduler = scheduler
+        self.queue_wait: Dict[str, Histogram] = {}  # priority -> histogram
+        self.submit_to_start: Dict[str, Histogram] = {}  # priority -> histogram
+        self.allocation_latency: Dict[str, Histogram] = {}  # pool -> histogram
+        self.schedule_pass = Histogram(LATENCY_BUCKETS)
+        self.allocations: Dict[Tuple[str, str], int] = {}  # (pool, result) -> count
+        self.started: Dict[str, int] = {}  # priority -> jobs started
+        self.preemptions: Dict[str, int] = {}  # priority -> jobs preempted
+        self.requeues: Dict[str, int] = {}  # priority -> jobs requeued for any reason
+
+    def attach(self):
+        """Start receiving reports from the scheduler"""
+        self.scheduler.metrics = self
+
+    def detach(self):
+        if self.scheduler.metrics is self:
+            self.scheduler.metrics = None
+
+    # Hot path (called by JobScheduler)
+
+    def job_started(self, job, first_start: bool):
+        priority = job.priority
+        histogram = self.queue_wait.get(priority)
+        if histogram is None:
+            histogram = self.queue_wait[priority] = Histogram(WAIT_BUCKETS)
+            self.submit_to_start[priority] = Histogram(WAIT_BUCKETS)
+        started_at = job.started_at
+        histogram.observe((started_at - (job.queued_at or job.created_at)).total_seconds())
+        if first_start:
+            self.submit_to_start[priority].observe((started_at - job.created_at).total_seconds())
+        self.started[priority] = self.started.get(priority, 0) + 1
+
+    def allocation_attempted(self, pool_type: str, seconds: float, success: bool):
+        histogram = self.allocation_latency.get(pool_type)
+        if histogram is None:
+            histogram = self.allocation_latency[pool_type] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+        key = (pool_type, "placed" if success else "no_capacity")
+        self.allocations[key] = self.allocations.get(key, 0) + 1
+
+    def job_preempted(self, job):
+        self.preemptions[job.priority] = self.preemptions.get(job.priority, 0) + 1
+
+    def job_requeued(self, job):
+        self.requeues[job.priority] = self.requeues.get(job.priority, 0) + 1
+
+    def pass_finished(self, seconds: float):
+        self.schedule_pass.observe(seconds)
+
+    # Export
+
+    def export_prometheus_format(self, now: Optional[datetime] = None) -> str:
+        """
+        Render all metrics as Prometheus text.
+
+        Args:
+            now: Time to meter usage up to (default: the meter's clock)
+
+        Returns:
+            Prometheus metrics text
+        """
+        lines = []
+
+        def histograms(name: str, by_label: Dict[str, Histogram], label: str):
+            if not by_label:
+                return
+            lines.append(f"# TYPE {name} histogram")
+            for value in sorted(by_label):
+                lines.extend(by_label[value].lines(name, f'{label}="{value}"'))
+
+        def counter(name: str, values: Dict, labels: Tuple[str, ...]):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                pairs = ",".join(f'{l}="{v}"' for l, v in zip(labels, key))
+                lines.append(f"{name}{{{pairs}}} {value}")
+
+        histograms("compute_queue_wait_seconds", self.queue_wait, "priority")
+        histograms("compute_submit_to_start_seconds", self.submit_to_start, "priority")
+        histograms("compute_allocation_latency_seconds", self.allocation_latency, "pool")
+        lines.append("# TYPE compute_schedule_pass_seconds histogram")
+        lines.extend(self.schedule_pass.lines("compute_schedule_pass_seconds"))
+        counter("compute_jobs_started_total", self.started, ("priority",))
+        counter("compute_allocations_total", self.allocations, ("pool", "result"))
+        counter("compute_preemptions_total", self.preemptions, ("priority",))
+        counter("compute_requeues_total", self.requeues, ("priority",))
+
+        scheduler = self.scheduler
+        lines.append("# TYPE compute_jobs gauge")
+        for state, count in (
+            ("pending", len(scheduler.job_queue)),
+            ("blocked", len(scheduler.blocked_jobs)),
+            ("running", len(scheduler.running_jobs))
+        ):
+            lines.append(f'compute_jobs{{state="{state}"}} {count}')
+
+        capacity_lines, allocated_lines, utilization_lines = [], [], []
+        for pool_type in PoolType:
+            inventory = self.resource_manager.pools[pool_type]
+            n = inventory.size
+            active = inventory.active[:n]
+            capacity = inventory.capacity[:, :n][:, active].sum(axis=1)
+            allocated = capacity - inventory.free[:, :n][:, active].sum(axis=1)
+            for d, resource in enumerate(RESOURCE_DIMS):
+                labels = f'pool="{pool_type.value}",resource="{resource}"'
+                capacity_lines.append(f"compute_pool_capacity{{{labels}}} {capacity[d]:g}")
+                allocated_lines.append(f"compute_pool_allocated{{{labels}}} {allocated[d]:g}")
+                ratio = allocated[d] / capacity[d] if capacity[d] > 0 else 0.0
+                utilization_lines.append(f"compute_pool_utilization{{{labels}}} {ratio:.6f}")
+        lines.append("# TYPE compute_pool_capacity gauge")
+        lines.extend(capacity_lines)
+        lines.append("# TYPE compute_pool_allocated gauge")
+        lines.extend(allocated_lines)
+        lines.append("# TYPE compute_pool_utilization gauge")
+        lines.extend(utilization_lines)
+
+        # Allocated unit-seconds since start: rate() gives utilization over any window
+        usage = self.resource_manager.meter.cumulative_by_key(now)
+        if usage:
+            lines.append("# TYPE compute_pool_usage_unit_seconds_total counter")
+            for (pool, resource_type), seconds in sorted(usage.items()):
+                lines.append(
+                    f'compute_pool_usage_unit_seconds_total{{pool="{pool}",resource_type="{resource_type}"}} '
+                    f"{seconds:.3f}"
+                )
+        return "\n".join(lines)
@@ -0,0 +1,173 @@
+"""
+Job Queue for Compute Factory
+Heap-backed priority queue with a job_id index for O(log n) scheduling operations.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+import heapq
+import itertools
+
+
+# Rank by JobPriority value; lower ranks are scheduled first
+PRIORITY_ORDER = {
+    "critical": 0,
+    "high": 1,
+    "normal": 2,
+    "low": 3
+}
+
+
+class JobQueue:
+    """
+    Priority queue of pending jobs.
+
+    Entries are ``[rank, -critical_path, sequence, entry_id, job]`` lists on
+    a binary heap, so within a priority jobs gating the longest chain of
+    dependent work go first (see DependencyGraph) and otherwise leave the
+    queue in submission order. A re-ranked job keeps its sequence, so its
+    entry may tie with the dead one it replaces; the unique entry_id breaks
+    such ties before heapq could compare jobs. A job_id -> entry index allows
+    removal of arbitrary jobs: the entry is marked dead in place and skipped
+    when it reaches the top of the heap (lazy deletion), and the heap is
+    compacted once dead entries outnumber live ones.
+    """
+
+    _REMOVED = None  # Placeholder for a removed job
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._index: Dict[str, list] = {}
+        self._counter = itertools.count()
+        self._front_counter = itertools.count(-1, -1)
+        self._entry_ids = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __bool__(self) -> bool:
+        return bool(self._index)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._index
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over pending jobs in scheduling order"""
+        for entry in sorted(e for e in self._heap if e[4] is not self._REMOVED):
+            yield entry[4]
+
+    def values(self) -> List[Any]:
+        """Pending jobs in no particular order (cheaper than iterating)"""
+        return [entry[4] for entry in self._index.values()]
+
+    def push(self, job: Any, front: bool = False) -> None:
+        """
+        Add a job to the queue, replacing any pending job with the same ID.
+
+        Args:
+            job: Job to enqueue
+            front: Queue ahead of all other jobs of the same priority
+                (used when re-queueing preempted jobs)
+        """
+        if job.job_id in self._index:
+            self.remove(job.job_id)
+        sequence = next(self._front_counter) if front else next(self._counter)
+        self._insert(job, sequence)
+
+    def update(self, job: Any) -> bool:
+        """
+        Re-rank a pending job after its priority or critical path changed,
+        keeping its place among jobs of equal rank.
+
+        Returns:
+            True if the job is queued
+        """
+        entry = self._index.get(job.job_id)
+        if entry is None:
+            return False
+        if entry[:2] != self._rank(job):
+            entry[4] = self._REMOVED
+            self._insert(job, entry[2])
+            if len(self._heap) > 2 * len(self._index) + 64:
+                self._compact()
+        return True
+
+    def pop(self) -> Optional[Any]:
+        """
+        Remove and return the highest priority job.
+
+        Returns:
+            Next job, or None if the queue is empty
+        """
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            job = entry[4]
+            if job is not self._REMOVED:
+                del self._index[job.job_id]
+                return job
+        return None
+
+    def peek(self) -> Optional[Any]:
+        """Return the highest priority job without removing it"""
+        while self._heap and self._heap[0][4] is self._REMOVED:
+            heapq.heappop(self._heap)
+        return self._heap[0][4] if self._heap else None
+
+    def get(self, job_id: str) -> Optional[Any]:
+        """Look up a pending job by ID"""
+        entry = self._index.get(job_id)
+        return entry[4] if entry else None
+
+    def remove(self, job_id: str) -> Optional[Any]:
+        """
+        Remove a pending job by ID.
+
+        Args:
+            job_id: ID of job to remove
+
+        Returns:
+            Removed job, or None if not queued
+        """
+        entry = self._index.pop(job_id, None)
+        if entry is None:
+            return None
+        job = entry[4]
+        entry[4] = self._REMOVED
+        if len(self._heap) > 2 * len(self._index) + 64:
+            self._compact()
+        return job
+
+    def head(self, n: int = 10) -> List[Any]:
+        """Return the first n jobs in scheduling order"""
+        return list(itertools.islice(self.ordered(), n))
+
+    def ordered(self) -> Iterator[Any]:
+        """
+        Yield pending jobs in scheduling order, lazily.
+
+        Walks the heap top-down through a small frontier heap of child
+        positions, so taking k jobs costs O(k log k) rather than a scan of
+        the whole queue. The queue must not change while iterating.
+        """
+        heap = self._heap
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            entry, i = heapq.heappop(frontier)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            if entry[4] is not self._REMOVED:
+                yield entry[4]
+
+    @staticmethod
+    def _rank(job: Any) -> list:
+        return [PRIORITY_ORDER[job.priority], -getattr(job, "critical_path", 0.0)]
+
+    def _insert(self, job: Any, sequence: int):
+        entry = self._rank(job) + [sequence, next(self._entry_ids), job]
+        self._index[job.job_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _compact(self):
+        """Drop removed entries and restore the heap invariant"""
+        self._heap = [e for e in self._heap if e[4] is not self._REMOVED]
+        heapq.heapify(self._heap)
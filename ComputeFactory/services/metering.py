@@ -0,0 +1,340 @@
+"""
+Usage Meter for Compute Factory
+Integrates resource allocations over time for metered cost accounting.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import numpy as np
+
+
+def _label(value) -> str:
+    """Plain string for an enum member or its value"""
+    return getattr(value, "value", value)
+
+
+def _local(t: datetime) -> datetime:
+    """Naive local time like the clock's; aware times (e.g. ISO 8601 with Z) are converted"""
+    return t if t.tzinfo is None else t.astimezone().replace(tzinfo=None)
+
+
+class UsageSeries:
+    """
+    Step function of units in use over time, with O(log n) integrals.
+
+    Every allocation start/end is an event ``(t_i, delta_i)``. Prefix sums
+    ``R_i = sum(delta)`` and ``S_i = sum(delta * t)`` give the cumulative
+    unit-seconds up to time t as ``t * R_k - S_k`` for the last event
+    ``k <= t``, so any period is two binary searches. Events normally arrive
+    in time order and are appended; late events (e.g. when backfilling) are
+    buffered and merged in one sort before the next query.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.times = np.zeros(initial_capacity)
+        self.deltas = np.zeros(initial_capacity)
+        self.cum_rate = np.zeros(initial_capacity)
+        self.cum_rate_time = np.zeros(initial_capacity)
+        self.size = 0
+        self._late: List[Tuple[float, float]] = []
+
+    def add(self, t: float, delta: float):
+        """
+        Record a change in units in use.
+
+        Args:
+            t: Event time (seconds since the meter origin)
+            delta: Units added (positive) or removed (negative)
+        """
+        n = self.size
+        if self._late or (n and t < self.times[n - 1]):
+            self._late.append((t, delta))
+            return
+        if n == len(self.times):
+            self._grow()
+        self.times[n] = t
+        self.deltas[n] = delta
+        self.cum_rate[n] = (self.cum_rate[n - 1] if n else 0.0) + delta
+        self.cum_rate_time[n] = (self.cum_rate_time[n - 1] if n else 0.0) + delta * t
+        self.size = n + 1
+
+    def cumulative(self, t: float) -> float:
+        """Unit-seconds consumed from the origin up to time t"""
+        if self._late:
+            self._merge()
+        k = int(np.searchsorted(self.times[:self.size], t, side="right")) - 1
+        if k < 0:
+            return 0.0
+        return float(t * self.cum_rate[k] - self.cum_rate_time[k])
+
+    def integral(self, start: float, end: float) -> float:
+        """Unit-seconds consumed in [start, end]"""
+        if end <= start:
+            return 0.0
+        return self.cumulative(end) - self.cumulative(start)
+
+    def in_use(self, t: float) -> float:
+        """Units in use at time t"""
+        if self._late:
+            self._merge()
+        k = int(np.searchsorted(self.times[:self.size], t, side="right")) - 1
+        return float(self.cum_rate[k]) if k >= 0 else 0.0
+
+    def _merge(self):
+        """Sort buffered late events into place and rebuild the prefix sums"""
+        late = np.array(self._late)
+        self._late = []
+        n = self.size
+        times = np.concatenate([self.times[:n], late[:, 0]])
+        deltas = np.concatenate([self.deltas[:n], late[:, 1]])
+        order = np.argsort(times, kind="stable")
+        m = len(times)
+        if m > len(self.times):
+            self._grow(m)
+        self.times[:m] = times[order]
+        self.deltas[:m] = deltas[order]
+        np.cumsum(self.deltas[:m], out=self.cum_rate[:m])
+        np.cumsum(self.deltas[:m] * self.times[:m], out=self.cum_rate_time[:m])
+        self.size = m
+
+    def _grow(self, minimum: int = 0):
+        size = len(self.times) * 2
+        while size < minimum:
+            size *= 2
+        for name in ("times", "deltas", "cum_rate", "cum_rate_time"):
+            old = getattr(self, name)
+            new = np.zeros(size)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+
+class UsageMeter:
+    """
+    Metered usage of every allocation recorded by a ResourceManager.
+
+    Keeps one UsageSeries per (pool_type, resource_type) for O(log n) period
+    totals, plus columnar per-allocation intervals for per-job queries and
+    top-consumer scans. Open allocations are metered up to the current time;
+    periods are clamped to now. Period bounds may be naive local times or
+    timezone-aware.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now):
+        """
+        Args:
+            clock: Time source used to clamp periods to "now"
+        """
+        self.clock = clock
+        self.origin: Optional[float] = None
+        self.series: Dict[Tuple[str, str], UsageSeries] = {}
+        # Per-allocation intervals (open allocations end at +inf)
+        self._starts = np.zeros(1024)
+        self._ends = np.full(1024, np.inf)
+        self._units = np.zeros(1024)
+        self._job_codes = np.full(1024, -1, dtype=np.int64)
+        self._key_codes = np.zeros(1024, dtype=np.int64)
+        self._size = 0
+        self._index: Dict[str, int] = {}
+        self._job_ids: List[str] = []
+        self._job_codes_by_id: Dict[str, int] = {}
+        self._job_rows: Dict[str, List[int]] = {}
+        self._keys: List[Tuple[str, str]] = []
+        self._key_codes_by_key: Dict[Tuple[str, str], int] = {}
+
+    def record_allocation(self, allocation) -> None:
+        """
+        Start metering an allocation.
+
+        Args:
+            allocation: ResourceAllocation that was just created
+        """
+        if allocation.allocation_id in self._index:
+            return
+        key = (_label(allocation.pool_type), _label(allocation.resource_spec.resource_type))
+        units = float(allocation.resource_spec.count)
+        start = self._t(allocation.allocated_at)
+        self._series(key).add(start, units)
+
+        row = self._size
+        if row == len(self._starts):
+            self._grow()
+        self._starts[row] = start
+        self._units[row] = units
+        self._key_codes[row] = self._key_code(key)
+        if allocation.job_id:
+            self._job_codes[row] = self._job_code(allocation.job_id)
+            self._job_rows.setdefault(allocation.job_id, []).append(row)
+        self._index[allocation.allocation_id] = row
+        self._size = row + 1
+
+        if allocation.released_at is not None:
+            self.record_release(allocation)
+
+    def record_release(self, allocation) -> None:
+        """
+        Stop metering an allocation at its released_at time.
+
+        Args:
+            allocation: ResourceAllocation that was just released
+        """
+        row = self._index.get(allocation.allocation_id)
+        if row is None or allocation.released_at is None or np.isfinite(self._ends[row]):
+            return
+        end = max(self._t(allocation.released_at), self._starts[row])
+        self._ends[row] = end
+        key = self._keys[self._key_codes[row]]
+        self._series(key).add(end, -self._units[row])
+
+    def usage_seconds(
+        self,
+        start: datetime,
+        end: datetime,
+        pool_type: Optional[str] = None,
+        resource_type: Optional[str] = None
+    ) -> float:
+        """
+        Unit-seconds consumed in a period, e.g. GPU-seconds.
+
+        Args:
+            start: Period start
+            end: Period end
+            pool_type: Optional pool filter
+            resource_type: Optional resource type filter
+
+        Returns:
+            Sum of units x seconds in use over the period
+        """
+        a, b = self._t(start), self._until(end)
+        pool_type = _label(pool_type) if pool_type is not None else None
+        resource_type = _label(resource_type) if resource_type is not None else None
+        return sum(
+            series.integral(a, b)
+            for (pool, rtype), series in self.series.items()
+            if (pool_type is None or pool == pool_type)
+            and (resource_type is None or rtype == resource_type)
+        )
+
+    def usage_by_key(self, start: datetime, end: datetime) -> Dict[Tuple[str, str], float]:
+        """Unit-seconds per (pool_type, resource_type) in a period"""
+        a, b = self._t(start), self._until(end)
+        return {key: series.integral(a, b) for key, series in self.series.items()}
+
+    def cumulative_by_key(self, when: Optional[datetime] = None) -> Dict[Tuple[str, str], float]:
+        """Unit-seconds per (pool_type, resource_type) since metering started"""
+        if self.origin is None:
+            return {}
+        t = self._until(when)
+        return {key: series.cumulative(t) for key, series in self.series.items()}
+
+    def job_usage(
+        self,
+        job_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, float]:
+        """
+        Unit-seconds consumed by one job, per resource type.
+
+        Args:
+            job_id: Job to query
+            start: Optional period start (default: all time)
+            end: Optional period end (default: now)
+
+        Returns:
+            Dictionary of resource_type -> unit-seconds
+        """
+        rows = self._job_rows.get(job_id)
+        if not rows:
+            return {}
+        rows = np.array(rows)
+        a = self._t(start) if start else -np.inf
+        b = self._until(end)
+        overlap = self._overlap(rows, a, b)
+        usage: Dict[str, float] = {}
+        for row, seconds in zip(rows, overlap):
+            rtype = self._keys[self._key_codes[row]][1]
+            usage[rtype] = usage.get(rtype, 0.0) + float(seconds)
+        return usage
+
+    def top_jobs(
+        self,
+        start: datetime,
+        end: datetime,
+        resource_type: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        Jobs with the highest usage in a period (one vectorized pass).
+
+        Args:
+            start: Period start
+            end: Period end
+            resource_type: Optional resource type filter (e.g. "gpu")
+            limit: Number of jobs to return
+
+        Returns:
+            List of (job_id, unit-seconds), highest first
+        """
+        n = self._size
+        a, b = self._t(start), self._until(end)
+        mask = (self._starts[:n] < b) & (self._ends[:n] > a) & (self._job_codes[:n] >= 0)
+        if resource_type is not None:
+            codes = [i for i, key in enumerate(self._keys) if key[1] == _label(resource_type)]
+            mask &= np.isin(self._key_codes[:n], codes)
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return []
+        totals = np.bincount(
+            self._job_codes[rows],
+            weights=self._overlap(rows, a, b),
+            minlength=len(self._job_ids)
+        )
+        top = np.argsort(-totals)[:limit]
+        return [(self._job_ids[i], float(totals[i])) for i in top if totals[i] > 0]
+
+    def _overlap(self, rows: np.ndarray, a: float, b: float) -> np.ndarray:
+        """Unit-seconds of each allocation row inside [a, b]"""
+        starts = np.maximum(self._starts[rows], a)
+        ends = np.minimum(self._ends[rows], b)
+        return np.clip(ends - starts, 0.0, None) * self._units[rows]
+
+    def _until(self, end: Optional[datetime]) -> float:
+        """Period end clamped to now (default: now), in meter seconds"""
+        now = self.clock()
+        return self._t(now if end is None else min(_local(end), now))
+
+    def _t(self, when: datetime) -> float:
+        """Seconds since the meter origin (keeps float sums precise)"""
+        ts = when.timestamp()
+        if self.origin is None:
+            self.origin = ts
+        return ts - self.origin
+
+    def _series(self, key: Tuple[str, str]) -> UsageSeries:
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = UsageSeries()
+        return series
+
+    def _key_code(self, key: Tuple[str, str]) -> int:
+        code = self._key_codes_by_key.get(key)
+        if code is None:
+            code = self._key_codes_by_key[key] = len(self._keys)
+            self._keys.append(key)
+        return code
+
+    def _job_code(self, job_id: str) -> int:
+        code = self._job_codes_by_id.get(job_id)
+        if code is None:
+            code = self._job_codes_by_id[job_id] = len(self._job_ids)
+            self._job_ids.append(job_id)
+        return code
+
+    def _grow(self):
+        size = len(self._starts) * 2
+        for name, fill in (("_starts", 0.0), ("_ends", np.inf), ("_units", 0.0),
+                           ("_job_codes", -1), ("_key_codes", 0)):
+            old = getattr(self, name)
+            new = np.full(size, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
@@ -6,7 +6,9 @@ Tracks resource usage, metrics, and cost.
 from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import psutil
+from .sampler import ResourceSampler
+from .timeseries import TimeSeriesStore
+from .metering import UsageMeter
 
 
 class UsageMetrics(BaseModel):
@@ -27,15 +29,47 @@ class CostReport(BaseModel):
     inference_cost: float
     training_cost: float
     total_cost: float
+    environment_cost: float = 0.0
+    gpu_hours: float = 0.0
+    cpu_hours: float = 0.0
+    accelerator_hours: float = 0.0
 
 
 class ResourceMonitor:
     """Monitors resource usage and calculates costs"""
     
-    def __init__(self):
-        self.metrics_history: List[UsageMetrics] = []
+    def __init__(
+        self,
+        sampler: Optional[ResourceSampler] = None,
+        meter: Optional[UsageMeter] = None
+    ):
+        """
+        Args:
+            sampler: Background resource sampler
+            meter: Usage meter of the ResourceManager to bill from
+                (ResourceManager.meter)
+        """
+        self.metrics_store = TimeSeriesStore()
         self.cost_per_gpu_hour = 1.0  # USD
         self.cost_per_cpu_hour = 0.1  # USD
+        self.cost_per_accelerator_hour = 1.0  # USD, NPU/TPU
+        self.sampler = sampler or ResourceSampler()
+        self.meter = meter or UsageMeter()
+    
+    def start_sampling(self):
+        """Start background resource sampling"""
+        self.sampler.start()
+    
+    def stop_sampling(self):
+        """Stop background resource sampling"""
+        self.sampler.stop()
+    
+    def _snapshot(self):
+        """Latest sampler snapshot, sampling inline if the sampler is not running"""
+        snapshot = self.sampler.latest()
+        if snapshot is None or not self.sampler.running:
+            snapshot = self.sampler.sample()
+        return snapshot
     
     def collect_metrics(self, resource_id: str) -> UsageMetrics:
         """
@@ -47,30 +81,38 @@ class ResourceMonitor:
         Returns:
             UsageMetrics snapshot
         """
+        snapshot = self._snapshot()
         metrics = UsageMetrics(
-            timestamp=datetime.now(),
+            timestamp=snapshot.timestamp,
             resource_id=resource_id,
-            cpu_percent=psutil.cpu_percent(interval=1),
-            memory_percent=psutil.virtual_memory().percent
+            cpu_percent=snapshot.cpu_percent,
+            memory_percent=snapshot.memory_percent
         )
-        self.metrics_history.append(metrics)
+        self.record_metrics(metrics)
         return metrics
     
-    def get_current_usage(self) -> Dict:
-        """Get current system resource usage"""
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+    def record_metrics(self, metrics: UsageMetrics):
+        """
+        Store a usage sample in the time-series store.
         
-        return {
-            "cpu_percent": cpu_percent,
-            "memory_total_gb": memory.total / (1024**3),
-            "memory_used_gb": memory.used / (1024**3),
-            "memory_percent": memory.percent,
-            "disk_total_gb": disk.total / (1024**3),
-            "disk_used_gb": disk.used / (1024**3),
-            "disk_percent": disk.percent
-        }
+        Args:
+            metrics: Sample to record
+        """
+        self.metrics_store.record(
+            metrics.resource_id,
+            metrics.timestamp,
+            cpu_percent=metrics.cpu_percent,
+            memory_percent=metrics.memory_percent,
+            gpu_utilization=metrics.gpu_utilization,
+            gpu_memory_used=metrics.gpu_memory_used
+        )
+    
+    def get_current_usage(self) -> Dict:
+        """Get current system resource usage from the latest sample"""
+        snapshot = self._snapshot()
+        usage = snapshot.dict()
+        usage["timestamp"] = snapshot.timestamp.isoformat()
+        return usage
     
     def calculate_cost(
         self, 
@@ -96,13 +138,21 @@ class ResourceMonitor:
         cpu_cost = cpu_count * duration_hours * self.cost_per_cpu_hour
         return gpu_cost + cpu_cost
     
+    def hourly_rate(self, resource_type: str) -> float:
+        """Price per unit-hour of a resource type"""
+        if resource_type == "gpu":
+            return self.cost_per_gpu_hour
+        if resource_type == "cpu":
+            return self.cost_per_cpu_hour
+        return self.cost_per_accelerator_hour
+    
     def generate_cost_report(
         self, 
         start: datetime, 
         end: datetime
     ) -> CostReport:
         """
-        Generate cost report for a time period.
+        Generate cost report for a time period from metered allocations.
         
         Args:
             start: Report period start
@@ -111,45 +161,140 @@ class ResourceMonitor:
         Returns:
             CostReport with breakdown
         """
-        duration_hours = (end - start).total_seconds() / 3600
+        pool_costs: Dict[str, float] = {}
+        hours_by_type: Dict[str, float] = {}
+        for (pool, resource_type), seconds in self.meter.usage_by_key(start, end).items():
+            hours = seconds / 3600
+            hours_by_type[resource_type] = hours_by_type.get(resource_type, 0.0) + hours
+            pool_costs[pool] = pool_costs.get(pool, 0.0) + hours * self.hourly_rate(resource_type)
         
-        # Mock calculations - in real implementation, query actual usage
-        inference_cost = duration_hours * 0.5
-        training_cost = duration_hours * 2.0
+        gpu_hours = hours_by_type.get("gpu", 0.0)
+        cpu_hours = hours_by_type.get("cpu", 0.0)
+        accelerator_hours = sum(
+            h for rtype, h in hours_by_type.items() if rtype not in ("gpu", "cpu")
+        )
         
         return CostReport(
             period_start=start,
             period_end=end,
-            total_compute_hours=duration_hours,
-            inference_cost=inference_cost,
-            training_cost=training_cost,
-            total_cost=inference_cost + training_cost
+            total_compute_hours=sum(hours_by_type.values()),
+            inference_cost=pool_costs.get("inference", 0.0),
+            training_cost=pool_costs.get("training", 0.0),
+            environment_cost=pool_costs.get("environment", 0.0),
+            total_cost=sum(pool_costs.values()),
+            gpu_hours=gpu_hours,
+            cpu_hours=cpu_hours,
+            accelerator_hours=accelerator_hours
+        )
+    
+    def calculate_job_cost(
+        self,
+        job_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Calculate the metered cost of one job.
+        
+        Args:
+            job_id: Job to bill
+            start: Optional period start (default: all time)
+            end: Optional period end (default: now)
+            
+        Returns:
+            Dictionary with unit-hours per resource type and total cost
+        """
+        usage = self.meter.job_usage(job_id, start, end)
+        hours = {rtype: seconds / 3600 for rtype, seconds in usage.items()}
+        return {
+            "job_id": job_id,
+            "hours": hours,
+            "total_cost": sum(h * self.hourly_rate(rtype) for rtype, h in hours.items())
+        }
+    
+    def calculate_pool_cost(self, pool_type: str, start: datetime, end: datetime) -> float:
+        """
+        Calculate the metered cost of one pool over a period.
+        
+        Args:
+            pool_type: Pool to bill
+            start: Period start
+            end: Period end
+            
+        Returns:
+            Total cost in USD
+        """
+        pool_type = getattr(pool_type, "value", pool_type)
+        return sum(
+            seconds / 3600 * self.hourly_rate(resource_type)
+            for (pool, resource_type), seconds in self.meter.usage_by_key(start, end).items()
+            if pool == pool_type
         )
     
-    def get_metrics_summary(self, resource_id: Optional[str] = None) -> Dict:
+    def get_top_jobs(
+        self,
+        start: datetime,
+        end: datetime,
+        resource_type: str = "gpu",
+        limit: int = 10
+    ) -> List[Dict]:
+        """
+        Find the jobs that consumed the most of a resource in a period.
+        
+        Args:
+            start: Period start
+            end: Period end
+            resource_type: Resource type to rank by
+            limit: Number of jobs to return
+            
+        Returns:
+            List of {job_id, hours, cost}, highest usage first
+        """
+        resource_type = getattr(resource_type, "value", resource_type)
+        rate = self.hourly_rate(resource_type)
+        return [
+            {"job_id": job_id, "hours": seconds / 3600, "cost": seconds / 3600 * rate}
+            for job_id, seconds in self.meter.top_jobs(start, end, resource_type, limit)
+        ]
+    
+    def get_metrics_summary(
+        self,
+        resource_id: Optional[str] = None,
+        window_seconds: Optional[float] = None
+    ) -> Dict:
         """
         Get summary of collected metrics.
         
         Args:
             resource_id: Optional filter by resource ID
+            window_seconds: Optional trailing window; None covers all samples
             
         Returns:
             Metrics summary statistics
         """
-        if resource_id:
-            metrics = [m for m in self.metrics_history if m.resource_id == resource_id]
-        else:
-            metrics = self.metrics_history
-        
-        if not metrics:
+        summary = self.metrics_store.summary(resource_id, window_seconds)
+        if not summary:
             return {"message": "No metrics available"}
+        return summary
+    
+    def get_metrics_window(
+        self,
+        resource_id: str,
+        start: datetime,
+        end: datetime,
+        resolution: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Get bucketed metrics for a resource over a time window.
         
-        avg_cpu = sum(m.cpu_percent for m in metrics) / len(metrics)
-        avg_memory = sum(m.memory_percent for m in metrics) / len(metrics)
-        
-        return {
-            "total_samples": len(metrics),
-            "avg_cpu_percent": round(avg_cpu, 2),
-            "avg_memory_percent": round(avg_memory, 2),
-            "latest_timestamp": metrics[-1].timestamp.isoformat()
-        }
+        Args:
+            resource_id: Resource to query
+            start: Window start
+            end: Window end
+            resolution: Bucket width in seconds (1, 60 or 3600); chosen
+                automatically from the window length if omitted
+            
+        Returns:
+            Per-bucket count/avg/min/max for each metric, oldest first
+        """
+        return self.metrics_store.window(resource_id, start, end, resolution)
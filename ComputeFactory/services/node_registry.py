@@ -0,0 +1,442 @@
+"""
+Node Registry for Compute Factory
+Heartbeat tracking with phi-accrual failure detection and automatic failover.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from collections import deque
+from enum import Enum
+import concurrent.futures
+import math
+import threading
+import time
+
+from .resource_manager import ResourceManager, ResourceType, PoolType
+from .scheduler import JobScheduler
+
+
+class NodeHealth(str, Enum):
+    """Liveness of a monitored node (values match compute_nodes.status)"""
+    ACTIVE = "active"
+    BUSY = "busy"        # Active with resources allocated
+    SUSPECT = "suspect"  # Heartbeats overdue, still schedulable
+    OFFLINE = "offline"  # Declared dead; allocations released
+
+
+class PhiAccrualDetector:
+    """
+    Phi accrual failure detector for one heartbeat stream.
+
+    Keeps a sliding window of heartbeat inter-arrival times and reports
+    phi = -log10(P(a heartbeat arrives later than now)) under a normal
+    model of that window, so the threshold expresses confidence rather
+    than a fixed timeout and adapts to each node's own jitter (Hayashibara
+    et al.; the logistic approximation of the normal tail is Akka's).
+    Until the window has data, intervals are assumed to equal the expected
+    heartbeat interval.
+    """
+
+    def __init__(
+        self,
+        expected_interval: float,
+        acceptable_pause: float = 0.0,
+        window: int = 100,
+        min_std: float = 0.1
+    ):
+        """
+        Args:
+            expected_interval: Nominal seconds between heartbeats
+            acceptable_pause: Extra seconds of silence tolerated (e.g. GC
+                pauses or network hiccups) before phi starts rising fast
+            window: Number of recent intervals kept
+            min_std: Lower bound on the interval standard deviation
+        """
+        self.expected_interval = expected_interval
+        self.acceptable_pause = acceptable_pause
+        self.min_std = min_std
+        self.intervals: deque = deque(maxlen=window)
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        self.last: Optional[float] = None
+
+    def heartbeat(self, now: float):
+        """Record a heartbeat arrival"""
+        if self.last is not None:
+            interval = now - self.last
+            if len(self.intervals) == self.intervals.maxlen:
+                old = self.intervals[0]
+                self._sum -= old
+                self._sum_squares -= old * old
+            self.intervals.append(interval)
+            self._sum += interval
+            self._sum_squares += interval * interval
+        self.last = now
+
+    def reset(self):
+        """Forget history, e.g. after the node was declared dead"""
+        self.intervals.clear()
+        self._sum = self._sum_squares = 0.0
+        self.last = None
+
+    def phi(self, now: float) -> float:
+        """Suspicion level at time `now` (0 right after a heartbeat)"""
+        if self.last is None:
+            return 0.0
+        n = len(self.intervals)
+        if n:
+            mean = self._sum / n
+            std = math.sqrt(max(self._sum_squares / n - mean * mean, 0.0))
+        else:
+            mean, std = self.expected_interval, self.expected_interval / 4
+        mean += self.acceptable_pause
+        std = max(std, self.min_std)
+        y = (now - self.last - mean) / std
+        z = -y * (1.5976 + 0.070566 * y * y)
+        # Logistic of z, written so neither branch can overflow
+        p_later = 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+        return 0.0 - math.log10(max(p_later, 1e-300))
+
+
+class _Monitored:
+    """Registry state of one heartbeating node"""
+
+    def __init__(self, node_id: str, pool_type: PoolType, detector: PhiAccrualDetector):
+        self.node_id = node_id
+        self.pool_type = pool_type
+        self.detector = detector
+        self.health = NodeHealth.ACTIVE
+        self.heartbeats = 0
+        self.failures = 0
+        self.written: Optional[str] = None  # Last status handed to the sink
+        self.pending: Optional[NodeHealth] = None  # OFFLINE/ACTIVE not yet applied to the pool
+        self.dispatching = False  # A failover/recovery is queued on the scheduler thread
+
+
+class NodeRegistry:
+    """
+    Live view of compute nodes that report heartbeats.
+
+    A node is monitored from its first heartbeat, so statically registered
+    nodes that never heartbeat are unaffected. heartbeat() only takes a
+    lock and appends to the node's detector, so it is safe to call from
+    request handlers on any thread. A background thread evaluates every
+    node's phi each check_interval: above suspect_phi the node is SUSPECT,
+    above dead_phi it is OFFLINE and failed over. With the defaults (1 s
+    heartbeats, dead_phi 8) a silent node is declared dead in roughly
+    three seconds.
+
+    Failover runs on the scheduler's owning thread through `dispatch`
+    (see SchedulingLoop.call_threadsafe): the node is removed from its pool,
+    running jobs with any allocation on it are released (whole gangs) and
+    requeued at the front of the queue, and other allocations on it are
+    released. A heartbeat from an OFFLINE node re-adds it with full
+    capacity. A failover or recovery that cannot be dispatched, or fails on
+    the scheduler thread (e.g. the loop is overloaded), stays pending and
+    is retried by the next check.
+
+    Status changes (including ACTIVE/BUSY from allocated capacity) are
+    collected and handed to `status_sink` in one batch every
+    flush_interval, e.g. to update the compute_nodes table.
+    """
+
+    def __init__(
+        self,
+        resource_manager: ResourceManager,
+        scheduler: JobScheduler,
+        heartbeat_interval: float = 1.0,
+        acceptable_pause: Optional[float] = None,
+        suspect_phi: float = 3.0,
+        dead_phi: float = 8.0,
+        check_interval: Optional[float] = None,
+        flush_interval: float = 2.0,
+        status_sink: Optional[Callable[[List[Dict]], Any]] = None,
+        dispatch: Optional[Callable[[Callable[[], Any]], Any]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            resource_manager: Manager holding the nodes and allocations
+            scheduler: Scheduler whose jobs are requeued on node failure
+            heartbeat_interval: Seconds between heartbeats nodes are told to use
+            acceptable_pause: Silence tolerated before suspicion rises
+                (default: one heartbeat interval)
+            suspect_phi: Phi above which a node is SUSPECT
+            dead_phi: Phi above which a node is declared OFFLINE
+            check_interval: Seconds between detector evaluations
+                (default: half a heartbeat interval)
+            flush_interval: Seconds between status_sink batches
+            status_sink: Receives lists of changed node records
+                ({"name", "type", "status", "specs"})
+            dispatch: Runs failover/recovery on the scheduler's owning
+                thread (default: call directly, then schedule pending jobs)
+            clock: Monotonic time source
+        """
+        self.resource_manager = resource_manager
+        self.scheduler = scheduler
+        self.heartbeat_interval = heartbeat_interval
+        self.acceptable_pause = heartbeat_interval if acceptable_pause is None else acceptable_pause
+        self.suspect_phi = suspect_phi
+        self.dead_phi = dead_phi
+        self.check_interval = check_interval or heartbeat_interval / 2
+        self.flush_interval = flush_interval
+        self.status_sink = status_sink
+        self.dispatch = dispatch or self._dispatch_directly
+        self.clock = clock
+
+        self.nodes: Dict[str, _Monitored] = {}
+        self.failovers = 0
+        self.requeued_jobs = 0
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_flush = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Start the detection/flush thread"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="node-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread after a final status flush"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=2)
+        self._thread = None
+        self.flush()
+
+    def heartbeat(self, node_id: str, pool_type: Optional[PoolType] = None) -> Optional[NodeHealth]:
+        """
+        Record a heartbeat from a node.
+
+        Args:
+            node_id: Reporting node, registered with the resource manager
+            pool_type: Pool the node serves (default: looked up)
+
+        Returns:
+            The node's health after the heartbeat, or None if the node is
+            unknown
+        """
+        now = self.clock()
+        with self._lock:
+            state = self.nodes.get(node_id)
+            if state is None:
+                if node_id not in self.resource_manager.nodes:
+                    return None
+                pool_type = pool_type or self._pool_of(node_id)
+                if pool_type is None:
+                    return None
+                state = self.nodes[node_id] = _Monitored(
+                    node_id, PoolType(pool_type),
+                    PhiAccrualDetector(self.heartbeat_interval, self.acceptable_pause)
+                )
+            state.heartbeats += 1
+            state.detector.heartbeat(now)
+            recovered = False
+            if state.health == NodeHealth.OFFLINE:
+                state.health = NodeHealth.ACTIVE
+                if state.pending == NodeHealth.OFFLINE and not state.dispatching:
+                    state.pending = None  # The failover never ran; the node is still in its pool
+                else:
+                    state.pending = NodeHealth.ACTIVE
+                    if not state.dispatching:
+                        state.dispatching = recovered = True
+            elif state.health == NodeHealth.SUSPECT:
+                state.health = NodeHealth.ACTIVE
+            health = state.health
+        if recovered:
+            self._submit(state, NodeHealth.ACTIVE)
+        return health
+
+    def check(self) -> List[str]:
+        """
+        Evaluate every node's detector, fail over newly dead nodes and
+        retry failovers and recoveries that did not go through.
+
+        Returns:
+            IDs of nodes declared dead by this check
+        """
+        now = self.clock()
+        dead = []
+        retries = []
+        with self._lock:
+            for state in self.nodes.values():
+                if state.health != NodeHealth.OFFLINE:
+                    phi = state.detector.phi(now)
+                    if phi >= self.dead_phi:
+                        state.health = NodeHealth.OFFLINE
+                        state.failures += 1
+                        state.detector.reset()
+                        dead.append(state)
+                        if state.pending == NodeHealth.ACTIVE and not state.dispatching:
+                            state.pending = None  # The recovery never ran; the node is still out
+                            continue
+                        state.pending = NodeHealth.OFFLINE
+                    elif phi >= self.suspect_phi:
+                        state.health = NodeHealth.SUSPECT
+                    else:
+                        state.health = NodeHealth.ACTIVE
+                if state.pending is not None and not state.dispatching:
+                    state.dispatching = True
+                    retries.append((state, state.pending))
+        for state in dead:
+            print(f"⚠️  Node {state.node_id} missed heartbeats; failing over")
+        for state, health in retries:
+            self._submit(state, health)
+        return [state.node_id for state in dead]
+
+    def flush(self) -> int:
+        """
+        Hand changed node statuses to the status sink in one batch.
+
+        Returns:
+            Number of records written
+        """
+        with self._lock:
+            states = list(self.nodes.values())
+        updates = []
+        for state in states:
+            status = self._status(state)
+            if status != state.written:
+                updates.append((state, status))
+        if not updates or self.status_sink is None:
+            return 0
+        records = [self._record(state, status) for state, status in updates]
+        try:
+            self.status_sink(records)
+        except Exception as e:
+            print(f"⚠️  Node status write failed: {e}")
+            return 0
+        for state, status in updates:
+            state.written = status
+        self.flushes += 1
+        return len(records)
+
+    def get_status(self) -> Dict:
+        """Per-node health, phi and heartbeat counts"""
+        now = self.clock()
+        with self._lock:
+            states = list(self.nodes.values())
+        return {
+            "heartbeat_interval": self.heartbeat_interval,
+            "failovers": self.failovers,
+            "requeued_jobs": self.requeued_jobs,
+            "nodes": {
+                state.node_id: {
+                    "pool_type": state.pool_type.value,
+                    "health": self._status(state),
+                    "phi": round(state.detector.phi(now), 3),
+                    "heartbeats": state.heartbeats,
+                    "failures": state.failures,
+                    "pending": state.pending.value if state.pending is not None else None,
+                    "last_seen_seconds": (
+                        round(now - state.detector.last, 3) if state.detector.last is not None else None
+                    )
+                }
+                for state in states
+            }
+        }
+
+    # Failover (scheduler thread)
+
+    def _fail_node(self, state: _Monitored):
+        """Remove a dead node, release its allocations and requeue its jobs"""
+        rm, node_id = self.resource_manager, state.node_id
+        rm.remove_node(state.pool_type, node_id)
+        for job in list(self.scheduler.running_jobs.values()):
+            if not job.allocation_id:
+                continue
+            if any(a.node_id == node_id for a in rm.get_allocations(job.allocation_id)):
+                rm.release_resource(job.allocation_id)
+                if self.scheduler.requeue_job(job.job_id):
+                    job.allocation_id = None
+                    self.requeued_jobs += 1
+        # Allocations made outside the scheduler (rare event, so a scan is fine)
+        for allocation in list(rm.allocations.values()):
+            if allocation.node_id == node_id and allocation.released_at is None:
+                rm.release_resource(allocation.allocation_id)
+        self.failovers += 1
+
+    def _restore_node(self, state: _Monitored):
+        """Return a recovered node to its pool with full capacity"""
+        node = self.resource_manager.nodes.get(state.node_id)
+        if node is not None:
+            self.resource_manager.add_node(state.pool_type, node)
+            print(f"✅ Node {state.node_id} is back")
+
+    def _submit(self, state: _Monitored, health: NodeHealth):
+        """Dispatch the failover (OFFLINE) or recovery (ACTIVE) of a node"""
+        fn = self._fail_node if health == NodeHealth.OFFLINE else self._restore_node
+        try:
+            result = self.dispatch(lambda: fn(state))
+        except Exception as e:
+            self._settle(state, health, e)
+            return
+        if isinstance(result, concurrent.futures.Future):
+            def done(future: concurrent.futures.Future):
+                error = concurrent.futures.CancelledError() if future.cancelled() else future.exception()
+                self._settle(state, health, error)
+            result.add_done_callback(done)
+        else:
+            self._settle(state, health, None)
+
+    def _settle(self, state: _Monitored, health: NodeHealth, error: Optional[BaseException]):
+        """Clear a transition once applied; a failed one stays pending for the next check"""
+        with self._lock:
+            state.dispatching = False
+            if error is None and state.pending == health:
+                state.pending = None
+        if error is not None:
+            action = "Failover" if health == NodeHealth.OFFLINE else "Recovery"
+            print(f"⚠️  {action} of node {state.node_id} failed, retrying: {error}")
+
+    def _dispatch_directly(self, fn: Callable[[], Any]):
+        fn()
+        self.scheduler.schedule_pending(self.resource_manager)
+
+    # Internals
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check()
+                if self.clock() - self._last_flush >= self.flush_interval:
+                    self._last_flush = self.clock()
+                    self.flush()
+            except Exception as e:
+                print(f"⚠️  Node registry check failed: {e}")
+
+    def _pool_of(self, node_id: str) -> Optional[PoolType]:
+        for pool_type, inventory in self.resource_manager.pools.items():
+            if node_id in inventory:
+                return pool_type
+        return None
+
+    def _status(self, state: _Monitored) -> str:
+        """compute_nodes status: OFFLINE/SUSPECT as is, ACTIVE split into active/busy"""
+        health = state.health
+        if health != NodeHealth.ACTIVE:
+            return health.value
+        inventory = self.resource_manager.pools[state.pool_type]
+        index = inventory.index_of(state.node_id)
+        if index is not None and (inventory.free[:, index] < inventory.capacity[:, index]).any():
+            return NodeHealth.BUSY.value
+        return NodeHealth.ACTIVE.value
+
+    def _record(self, state: _Monitored, status: str) -> Dict:
+        node = self.resource_manager.nodes.get(state.node_id)
+        accelerated = node is not None and node.accelerator_count > 0
+        return {
+            "name": state.node_id,
+            "type": ResourceType(node.accelerator_type).value if accelerated else ResourceType.CPU.value,
+            "status": status,
+            "specs": node.model_dump(exclude={"topology"}) if node is not None else {}
+        }
@@ -0,0 +1,425 @@
+"""
+Placement Engine for Compute Factory
+Array-backed node inventory with vectorized bin-packing placement.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from enum import Enum
+import numpy as np
+
+
+class PlacementPolicy(str, Enum):
+    """Node selection policies"""
+    FIRST_FIT = "first_fit"    # Lowest-index node that fits
+    BEST_FIT = "best_fit"      # Node left with the least spare capacity
+    SPREAD = "spread"          # Node left with the most spare capacity
+
+
+# Rows of the capacity/free matrices
+RESOURCE_DIMS = ("cpu", "memory_gb", "accelerators")
+CPU, MEMORY, ACCELERATORS = range(len(RESOURCE_DIMS))
+
+# Rows of the locality matrix: largest free core block within one L3 cache
+# domain / one NUMA node
+L3_BLOCK, NUMA_BLOCK = 0, 1
+
+
+class NodeInventory:
+    """
+    Capacity inventory for the nodes of one resource pool.
+
+    Node capacity and free capacity are kept column-wise as ``(3, nodes)``
+    float matrices over RESOURCE_DIMS, so feasibility checks and candidate
+    scoring run as a handful of contiguous NumPy operations regardless of pool
+    size. Removed nodes stay in the matrices as inactive columns so that node
+    indices remain stable.
+
+    Nodes with a known CPU topology also carry a ``(2, nodes)`` locality
+    matrix of their largest free core blocks (see set_locality); select()
+    prefers nodes where a CPU request stays inside one L3 domain, then one
+    NUMA node. Nodes without topology count as one unbounded block.
+    """
+
+    def __init__(self, initial_capacity: int = 64):
+        size = max(1, initial_capacity)
+        self.capacity = np.zeros((len(RESOURCE_DIMS), size))
+        self.free = np.zeros((len(RESOURCE_DIMS), size))
+        self.active = np.zeros(size, dtype=bool)
+        self.bandwidth = np.zeros(size)
+        self.kind_codes = np.zeros(size, dtype=np.int32)
+        self.model_codes = np.zeros(size, dtype=np.int32)
+        self._inv_capacity = np.zeros((len(RESOURCE_DIMS), size))
+        self.locality = np.full((2, size), np.inf)
+        self.node_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    def __contains__(self, node_id: str) -> bool:
+        index = self._index.get(node_id)
+        return index is not None and bool(self.active[index])
+
+    @property
+    def size(self) -> int:
+        """Number of node slots in use, including removed nodes"""
+        return len(self.node_ids)
+
+    def add_node(
+        self,
+        node_id: str,
+        cpu: float,
+        memory_gb: float,
+        accelerators: float = 0,
+        accelerator_type: Optional[str] = None,
+        accelerator_model: Optional[str] = None,
+        bandwidth_gbps: float = 0.0
+    ) -> int:
+        """
+        Register a node, or update the capacity of an existing one.
+
+        Capacity allocated on an existing node stays allocated: its free
+        capacity becomes the new capacity minus what is in use, which is
+        negative in a dimension that shrank below its usage (the node then
+        takes nothing more until enough is released).
+
+        Args:
+            node_id: Unique node identifier
+            cpu: Number of CPU cores
+            memory_gb: Host memory in GB
+            accelerators: Number of GPUs/NPUs/TPUs
+            accelerator_type: Resource type of the accelerators
+            accelerator_model: Accelerator model name
+            bandwidth_gbps: Interconnect bandwidth of the node
+
+        Returns:
+            Slot index of the node
+        """
+        vector = np.array([cpu, memory_gb, accelerators], dtype=float)
+        index = self._index.get(node_id)
+        if index is not None:
+            used = self.capacity[:, index] - self.free[:, index]
+        else:
+            used = 0.0
+            index = len(self.node_ids)
+            if index == len(self.active):
+                self._grow()
+            self.node_ids.append(node_id)
+            self._index[node_id] = index
+
+        self.capacity[:, index] = vector
+        self.free[:, index] = vector - used
+        with np.errstate(divide="ignore"):
+            self._inv_capacity[:, index] = np.where(vector > 0, 1.0 / vector, 0.0)
+        self.active[index] = True
+        self.locality[:, index] = np.inf
+        self.bandwidth[index] = bandwidth_gbps or 0.0
+        self.kind_codes[index] = self._code(accelerator_type)
+        self.model_codes[index] = self._code(accelerator_model)
+        return index
+
+    def remove_node(self, node_id: str) -> bool:
+        """
+        Take a node out of service. Its slot is kept but never selected.
+
+        Args:
+            node_id: ID of node to remove
+
+        Returns:
+            True if the node was active
+        """
+        index = self._index.get(node_id)
+        if index is None or not self.active[index]:
+            return False
+        self.active[index] = False
+        return True
+
+    def set_locality(self, index: int, l3_block: float, numa_block: float):
+        """
+        Record a node's largest free core blocks.
+
+        Args:
+            index: Slot index of the node
+            l3_block: Most free cores within one L3 cache domain
+            numa_block: Most free cores within one NUMA node
+        """
+        self.locality[L3_BLOCK, index] = l3_block
+        self.locality[NUMA_BLOCK, index] = numa_block
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        """Slot index of a node"""
+        return self._index.get(node_id)
+
+    def eligible(
+        self,
+        demand: np.ndarray,
+        accelerator_type: Optional[str] = None,
+        accelerator_model: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Boolean mask over active node slots whose hardware matches a request,
+        ignoring current free capacity.
+
+        Args:
+            demand: Resource vector over RESOURCE_DIMS
+            accelerator_type: Required accelerator type, if any
+            accelerator_model: Required accelerator model, if any
+
+        Returns:
+            Mask of length ``size``
+        """
+        n = self.size
+        mask = self.active[:n].copy()
+        if demand[ACCELERATORS] > 0 and accelerator_type is not None:
+            mask &= self.kind_codes[:n] == self._codes.get(accelerator_type, -1)
+        if accelerator_model is not None:
+            mask &= self.model_codes[:n] == self._codes.get(accelerator_model, -1)
+        return mask
+
+    def feasible(
+        self,
+        demand: np.ndarray,
+        accelerator_type: Optional[str] = None,
+        accelerator_model: Optional[str] = None,
+        free: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Boolean mask over node slots that can hold the demand vector.
+
+        Args:
+            demand: Resource vector over RESOURCE_DIMS
+            accelerator_type: Required accelerator type, if any
+            accelerator_model: Required accelerator model, if any
+            free: Free-capacity matrix to test against instead of the
+                current one (e.g. projected capacity at a future time)
+
+        Returns:
+            Mask of length ``size``
+        """
+        n = self.size
+        free = self.free if free is None else free
+        mask = self.eligible(demand, accelerator_type, accelerator_model)
+        for dim in range(len(RESOURCE_DIMS)):
+            if demand[dim] > 0:
+                mask &= free[dim, :n] >= demand[dim]
+        return mask
+
+    def score(self, demand: np.ndarray, free: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Normalized spare capacity left on each node after placing the demand.
+
+        Args:
+            demand: Resource vector over RESOURCE_DIMS
+            free: Free-capacity matrix to score against (default: current)
+
+        Returns:
+            Array of scores over all slots (lower is tighter)
+        """
+        n = self.size
+        free = self.free if free is None else free
+        scores = np.zeros(n)
+        for dim in range(len(RESOURCE_DIMS)):
+            scores += (free[dim, :n] - demand[dim]) * self._inv_capacity[dim, :n]
+        return scores
+
+    def select(
+        self,
+        demand: np.ndarray,
+        policy: PlacementPolicy = PlacementPolicy.BEST_FIT,
+        accelerator_type: Optional[str] = None,
+        accelerator_model: Optional[str] = None,
+        free: Optional[np.ndarray] = None
+    ) -> Optional[int]:
+        """
+        Pick a node slot for the demand vector.
+
+        Args:
+            demand: Resource vector over RESOURCE_DIMS
+            policy: Placement policy
+            accelerator_type: Required accelerator type, if any
+            accelerator_model: Required accelerator model, if any
+            free: Free-capacity matrix to plan against (default: current).
+                Core locality is only known for the current state, so it
+                is not considered when planning against another matrix.
+
+        Returns:
+            Selected slot index, or None if no node fits
+        """
+        mask = self.feasible(demand, accelerator_type, accelerator_model, free)
+        first = int(mask.argmax()) if mask.size else 0
+        if not mask.size or not mask[first]:
+            return None
+        if free is None and demand[CPU] > 0:
+            mask = self._local(mask, demand[CPU])
+            first = int(mask.argmax())
+        if policy == PlacementPolicy.FIRST_FIT:
+            return first
+        scores = self.score(demand, free)
+        if policy == PlacementPolicy.SPREAD:
+            return int(np.where(mask, scores, -np.inf).argmax())
+        return int(np.where(mask, scores, np.inf).argmin())
+
+    def slots(
+        self,
+        demand: np.ndarray,
+        mask: np.ndarray,
+        free: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Number of copies of the demand vector each masked node can hold.
+
+        Args:
+            demand: Per-slot resource vector over RESOURCE_DIMS
+            mask: Candidate node mask from feasible()
+            free: Free-capacity matrix to count against (default: current)
+
+        Returns:
+            Integer array over all slots (0 where masked out)
+        """
+        n = self.size
+        free = self.free if free is None else free
+        fits = np.full(n, np.inf)
+        for dim in range(len(RESOURCE_DIMS)):
+            if demand[dim] > 0:
+                fits = np.minimum(fits, np.floor(free[dim, :n] / demand[dim]))
+        fits[np.isinf(fits)] = 0
+        return np.where(mask, fits, 0).astype(np.int64)
+
+    def plan_gang(
+        self,
+        demand: np.ndarray,
+        num_slots: int,
+        accelerator_type: Optional[str] = None,
+        accelerator_model: Optional[str] = None,
+        free: Optional[np.ndarray] = None
+    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        Plan an all-or-nothing placement of num_slots copies of a demand vector.
+
+        Nodes are grouped by accelerator model so a gang is never split across
+        heterogeneous hardware. Within a group the plan uses the highest
+        bandwidth tier that can hold the whole gang, and inside that tier the
+        nodes with the most room first, so gangs land on as few well-connected
+        nodes as possible. Nothing is reserved here.
+
+        Args:
+            demand: Per-slot resource vector over RESOURCE_DIMS
+            num_slots: Number of slots the gang needs
+            accelerator_type: Required accelerator type, if any
+            accelerator_model: Required accelerator model, if any
+            free: Free-capacity matrix to plan against (default: current)
+
+        Returns:
+            List of (slot index, slots on that node), or None if infeasible
+        """
+        if num_slots <= 0 or not demand.any():
+            return None
+        mask = self.feasible(demand, accelerator_type, accelerator_model, free)
+        fits = self.slots(demand, mask, free)
+        if fits.sum() < num_slots:
+            return None
+
+        n = self.size
+        best = None
+        best_key = None
+        for code in np.unique(self.model_codes[:n][mask]):
+            group = np.flatnonzero(mask & (self.model_codes[:n] == code))
+            group_fits = fits[group]
+            if group_fits.sum() < num_slots:
+                continue
+            bandwidth = self.bandwidth[group]
+            for tier in np.unique(bandwidth)[::-1]:
+                in_tier = bandwidth >= tier
+                if group_fits[in_tier].sum() < num_slots:
+                    continue
+                rows = group[in_tier]
+                counts = group_fits[in_tier]
+                order = np.argsort(-counts, kind="stable")
+                cumulative = np.cumsum(counts[order])
+                used = int(np.searchsorted(cumulative, num_slots)) + 1
+                key = (float(tier), -used)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = (rows[order[:used]], counts[order[:used]])
+                break
+
+        if best is None:
+            return None
+        plan = []
+        remaining = num_slots
+        for index, count in zip(*best):
+            take = int(min(count, remaining))
+            plan.append((int(index), take))
+            remaining -= take
+        return plan
+
+    def reserve(self, index: int, demand: np.ndarray):
+        """Subtract a demand vector from a node's free capacity"""
+        self.free[:, index] -= demand
+
+    def release(self, index: int, demand: np.ndarray):
+        """Return a demand vector to a node's free capacity"""
+        self.free[:, index] = np.minimum(self.free[:, index] + demand, self.capacity[:, index])
+
+    def stats(self) -> Dict:
+        """
+        Capacity, utilization and fragmentation per resource dimension.
+
+        Fragmentation is ``1 - largest_free_on_one_node / total_free``: 0 when
+        all spare capacity sits on one node, approaching 1 when it is scattered
+        in pieces too small for large requests.
+        """
+        n = self.size
+        active = self.active[:n]
+        capacity = self.capacity[:, :n][:, active]
+        free = self.free[:, :n][:, active]
+        total = capacity.sum(axis=1)
+        available = free.sum(axis=1)
+        largest = free.max(axis=1) if free.shape[1] else np.zeros(len(RESOURCE_DIMS))
+
+        result = {}
+        for i, dim in enumerate(RESOURCE_DIMS):
+            used = total[i] - available[i]
+            result[dim] = {
+                "total": float(total[i]),
+                "free": float(available[i]),
+                "utilization": round(float(used / total[i]), 4) if total[i] > 0 else 0.0,
+                "fragmentation": (
+                    round(float(1 - largest[i] / available[i]), 4) if available[i] > 0 else 0.0
+                )
+            }
+        return result
+
+    def _local(self, mask: np.ndarray, cores: float) -> np.ndarray:
+        """Narrow a mask to nodes that fit the cores in one L3 domain, else one NUMA node"""
+        n = self.size
+        for row in (L3_BLOCK, NUMA_BLOCK):
+            local = mask & (self.locality[row, :n] >= cores)
+            if local.any():
+                return local
+        return mask
+
+    def _code(self, label: Optional[str]) -> int:
+        """Intern a label as a small integer (0 means unset)"""
+        if label is None:
+            return 0
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self._codes) + 1
+            self._codes[label] = code
+        return code
+
+    def _grow(self):
+        """Double the slot capacity of all arrays"""
+        size = len(self.active) * 2
+        for name in ("capacity", "free", "_inv_capacity", "locality"):
+            old = getattr(self, name)
+            new = np.full((old.shape[0], size), np.inf if name == "locality" else 0.0)
+            new[:, :old.shape[1]] = old
+            setattr(self, name, new)
+        for name in ("active", "bandwidth", "kind_codes", "model_codes"):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
@@ -0,0 +1,341 @@
+"""
+Preemption Engine for Compute Factory
+Evicts the cheapest set of preemptible jobs so urgent jobs can start.
+"""
+
+from typing import Callable, Dict, List, Optional, Set
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import combinations
+import numpy as np
+
+from .job_queue import PRIORITY_ORDER
+from .resource_manager import ResourceManager, PoolType, ResourceType
+from .scheduler import JobScheduler, ComputeJob, JobPriority
+
+
+# Per-node victim sets larger than this are chosen greedily instead of exactly
+MAX_EXACT_VICTIMS = 12
+
+
+@dataclass
+class PreemptionCandidate:
+    """A running job that could be evicted"""
+    job: ComputeJob
+    lost_work: float
+    freed: Dict[int, np.ndarray] = field(default_factory=dict)  # node slot -> resources
+
+
+class PreemptionEngine:
+    """
+    Chooses and evicts preemptible jobs for urgent jobs that cannot be placed.
+
+    Victims must be preemptible, running in the same pool and strictly lower
+    priority than the job being placed. Lost work is the seconds since the
+    victim's last checkpoint (or start) times its gang size. For single-node
+    jobs the engine picks the smallest victim set that frees one node,
+    breaking ties by lost work; for gangs it adds the cheapest victims until
+    the gang fits and then drops the ones it did not need. Nothing is
+    evicted unless the job is admitted and fits once the victims are gone.
+    """
+
+    def __init__(
+        self,
+        scheduler: JobScheduler,
+        resource_manager: ResourceManager,
+        checkpoint_hook: Optional[Callable[[ComputeJob], None]] = None,
+        min_priority: JobPriority = JobPriority.HIGH
+    ):
+        """
+        Args:
+            scheduler: Scheduler owning the queued and running jobs
+            resource_manager: Manager owning the allocations
+            checkpoint_hook: Called with each victim before it is evicted
+            min_priority: Lowest priority allowed to trigger preemption
+        """
+        self.scheduler = scheduler
+        self.resource_manager = resource_manager
+        self.checkpoint_hook = checkpoint_hook
+        self.min_priority = min_priority
+        self.preemption_count = 0
+        self.checkpoint_failures = 0
+
+    def attach(self):
+        """Preempt for urgent jobs at the end of every JobScheduler.schedule_pending pass"""
+        self.scheduler.preemption = self
+
+    def detach(self):
+        if self.scheduler.preemption is self:
+            self.scheduler.preemption = None
+
+    def schedule(
+        self,
+        scan_limit: int = 1000,
+        pool_types: Optional[Set[str]] = None
+    ) -> List[ComputeJob]:
+        """
+        Run a scheduling pass, preempting for urgent jobs that did not fit.
+
+        Args:
+            scan_limit: Maximum number of queued jobs to consider
+            pool_types: Only place jobs in these pools
+
+        Returns:
+            Jobs started in this pass
+        """
+        started = self.scheduler.schedule_pending(self.resource_manager, scan_limit, pool_types)
+        if self.scheduler.preemption is not self:
+            started.extend(self.preempt_waiting(scan_limit, pool_types))
+        return started
+
+    def preempt_waiting(
+        self,
+        scan_limit: int = 1000,
+        pool_types: Optional[Set[str]] = None
+    ) -> List[ComputeJob]:
+        """
+        Preempt for the urgent queued jobs a scheduling pass left waiting.
+
+        Args:
+            scan_limit: Maximum number of queued jobs to consider
+            pool_types: Only place jobs in these pools
+
+        Returns:
+            Urgent jobs started
+        """
+        started = []
+        # Fair-share queues are not ordered by priority, so scan the whole head
+        for job in self.scheduler.job_queue.head(scan_limit):
+            if not self._is_urgent(job):
+                continue
+            if pool_types is not None and job.pool_type not in pool_types:
+                continue
+            if self.preempt_for(job.job_id) is not None:
+                started.append(job)
+        return started
+
+    def preempt_for(self, job_id: str) -> Optional[List[ComputeJob]]:
+        """
+        Start an urgent queued job, evicting victims if needed.
+
+        Args:
+            job_id: ID of a queued job with pool_type and resource_spec set
+
+        Returns:
+            Evicted jobs (empty if none were needed), or None if the job is
+            not urgent or cannot be placed even with preemption
+        """
+        job = self.scheduler.job_queue.get(job_id)
+        if job is None or not self._is_urgent(job):
+            return None
+        if self.scheduler.place_job(job_id, self.resource_manager):
+            return []
+
+        reservations = self.scheduler.reservations
+        if reservations is not None and not reservations.admits(job):
+            return None
+        victims = self.select_victims(job)
+        if victims is None or not self._fits_without(job, victims):
+            return None
+        for candidate in victims:
+            self._evict(candidate.job)
+        if not self.scheduler.place_job(job_id, self.resource_manager):
+            print(f"⚠️  Job {job_id} did not fit after preempting {len(victims)} jobs")
+            return None
+        return [c.job for c in victims]
+
+    def select_victims(
+        self,
+        job: ComputeJob,
+        now: Optional[datetime] = None
+    ) -> Optional[List[PreemptionCandidate]]:
+        """
+        Choose the victims to evict so that a job fits. Nothing is changed.
+
+        Args:
+            job: Job to be placed
+            now: Reference time for lost-work estimates
+
+        Returns:
+            Victims to evict, or None if no victim set frees enough capacity
+        """
+        if job.resource_spec is None or job.pool_type is None:
+            return None
+        pool_type = PoolType(job.pool_type)
+        candidates = self._candidates(job, pool_type, now or self.scheduler.clock())
+        if not candidates:
+            return None
+        if job.gang_size > 1:
+            return self._select_for_gang(job, pool_type, candidates)
+        return self._select_for_node(job, pool_type, candidates)
+
+    def _fits_without(self, job: ComputeJob, victims: List[PreemptionCandidate]) -> bool:
+        """Whether job would be placed once the victims' capacity is freed"""
+        spec = job.resource_spec
+        inventory = self.resource_manager.pools[PoolType(job.pool_type)]
+        demand = self.resource_manager.demand_vector(spec)
+        accelerator_type = None if spec.resource_type == ResourceType.CPU else spec.resource_type
+        free = inventory.free.copy()
+        for victim in victims:
+            for index, freed in victim.freed.items():
+                free[:, index] += freed
+        if job.gang_size > 1:
+            return inventory.plan_gang(
+                demand, job.gang_size, accelerator_type, spec.accelerator_model, free=free
+            ) is not None
+        return bool(inventory.feasible(demand, accelerator_type, spec.accelerator_model, free).any())
+
+    def _is_urgent(self, job: ComputeJob) -> bool:
+        return PRIORITY_ORDER[job.priority] <= PRIORITY_ORDER[self.min_priority]
+
+    def _candidates(
+        self,
+        job: ComputeJob,
+        pool_type: PoolType,
+        now: datetime
+    ) -> List[PreemptionCandidate]:
+        """Running jobs that may be evicted for job, with the capacity they hold"""
+        rank = PRIORITY_ORDER[job.priority]
+        inventory = self.resource_manager.pools[pool_type]
+        candidates = []
+        for running in self.scheduler.running_jobs.values():
+            if not running.preemptible or PRIORITY_ORDER[running.priority] <= rank:
+                continue
+            if not running.allocation_id:
+                continue
+            freed: Dict[int, np.ndarray] = {}
+            for allocation in self.resource_manager.get_allocations(running.allocation_id):
+                if allocation.pool_type != pool_type or allocation.node_id is None:
+                    continue
+                index = inventory.index_of(allocation.node_id)
+                if index is None:
+                    continue
+                demand = self.resource_manager.demand_vector(allocation.resource_spec)
+                freed[index] = freed.get(index, 0) + demand
+            if not freed:
+                continue
+            since = max(filter(None, [running.started_at, running.last_checkpoint_at]))
+            lost_work = max(0.0, (now - since).total_seconds()) * max(1, running.gang_size)
+            candidates.append(PreemptionCandidate(job=running, lost_work=lost_work, freed=freed))
+        return candidates
+
+    def _select_for_node(
+        self,
+        job: ComputeJob,
+        pool_type: PoolType,
+        candidates: List[PreemptionCandidate]
+    ) -> Optional[List[PreemptionCandidate]]:
+        """Smallest, then cheapest, victim set that frees one node for job"""
+        spec = job.resource_spec
+        inventory = self.resource_manager.pools[pool_type]
+        demand = self.resource_manager.demand_vector(spec)
+        eligible = inventory.eligible(
+            demand,
+            accelerator_type=None if spec.resource_type == ResourceType.CPU else spec.resource_type,
+            accelerator_model=spec.accelerator_model
+        )
+
+        by_node: Dict[int, List[PreemptionCandidate]] = {}
+        for candidate in candidates:
+            for index in candidate.freed:
+                if eligible[index]:
+                    by_node.setdefault(index, []).append(candidate)
+
+        best = None
+        best_key = None
+        for index, victims in by_node.items():
+            free = inventory.free[:, index]
+            if not np.all(free + sum(v.freed[index] for v in victims) >= demand):
+                continue
+            chosen = self._smallest_cover(index, free, demand, victims)
+            key = (len(chosen), sum(v.lost_work for v in chosen))
+            if best_key is None or key < best_key:
+                best, best_key = chosen, key
+        return best
+
+    @staticmethod
+    def _smallest_cover(
+        index: int,
+        free: np.ndarray,
+        demand: np.ndarray,
+        victims: List[PreemptionCandidate]
+    ) -> List[PreemptionCandidate]:
+        """Fewest victims on one node covering the demand, cheapest among ties"""
+        victims = sorted(victims, key=lambda v: v.lost_work)
+        if len(victims) > MAX_EXACT_VICTIMS:
+            chosen, available = [], free.copy()
+            for victim in victims:
+                chosen.append(victim)
+                available = available + victim.freed[index]
+                if np.all(available >= demand):
+                    break
+            return chosen
+
+        for size in range(1, len(victims) + 1):
+            best, best_cost = None, None
+            for subset in combinations(victims, size):
+                if np.all(free + sum(v.freed[index] for v in subset) >= demand):
+                    cost = sum(v.lost_work for v in subset)
+                    if best_cost is None or cost < best_cost:
+                        best, best_cost = list(subset), cost
+            if best is not None:
+                return best
+        return victims
+
+    def _select_for_gang(
+        self,
+        job: ComputeJob,
+        pool_type: PoolType,
+        candidates: List[PreemptionCandidate]
+    ) -> Optional[List[PreemptionCandidate]]:
+        """
+        Victims for a gang: add the cheapest victims until the gang fits, then
+        drop any victim, most expensive first, that the plan can do without.
+        """
+        spec = job.resource_spec
+        inventory = self.resource_manager.pools[pool_type]
+        demand = self.resource_manager.demand_vector(spec)
+        accelerator_type = None if spec.resource_type == ResourceType.CPU else spec.resource_type
+
+        def fits() -> bool:
+            return inventory.plan_gang(
+                demand, job.gang_size, accelerator_type, spec.accelerator_model
+            ) is not None
+
+        def credit(victim: PreemptionCandidate, sign: int):
+            for index, freed in victim.freed.items():
+                inventory.free[:, index] += sign * freed
+
+        saved = inventory.free.copy()
+        chosen: List[PreemptionCandidate] = []
+        try:
+            for victim in sorted(candidates, key=lambda v: v.lost_work):
+                credit(victim, 1)
+                chosen.append(victim)
+                if fits():
+                    break
+            else:
+                return None
+
+            for victim in sorted(chosen, key=lambda v: -v.lost_work):
+                credit(victim, -1)
+                if fits():
+                    chosen.remove(victim)
+                else:
+                    credit(victim, 1)
+            return chosen
+        finally:
+            inventory.free[:] = saved
+
+    def _evict(self, job: ComputeJob):
+        """Checkpoint a victim, release its resources and re-queue it"""
+        if self.checkpoint_hook:
+            try:
+                self.checkpoint_hook(job)
+                self.scheduler.record_checkpoint(job.job_id)
+            except Exception:
+                self.checkpoint_failures += 1
+        self.resource_manager.release_resource(job.allocation_id)
+        if self.scheduler.preempt_job(job.job_id):
+            job.allocation_id = None
+            self.preemption_count += 1
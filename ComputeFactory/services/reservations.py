@@ -0,0 +1,607 @@
+"""
+Advance Reservations for Compute Factory
+Calendar of guaranteed pool capacity over time windows, with O(log n) admission.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from enum import Enum
+from pydantic import BaseModel
+from datetime import datetime
+import math
+import random
+
+from .fair_share import DEFAULT_TENANT
+from .ids import new_id
+from .placement import CPU, MEMORY, ACCELERATORS
+from .resource_manager import ResourceManager, ResourceSpec, PoolType
+
+
+_ZERO = (0.0, 0.0, 0.0)
+_EPS = 1e-9
+
+
+def _add(a: tuple, b: tuple) -> tuple:
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def _neg(a: tuple) -> tuple:
+    return (-a[0], -a[1], -a[2])
+
+
+def _exceeds(value: tuple, limit: tuple) -> bool:
+    return value[0] > limit[0] + _EPS or value[1] > limit[1] + _EPS or value[2] > limit[2] + _EPS
+
+
+def _local(t: datetime) -> datetime:
+    """Naive local time like the clock's; aware times (e.g. ISO 8601 with Z) are converted"""
+    return t if t.tzinfo is None else t.astimezone().replace(tzinfo=None)
+
+
+class ReservationError(ValueError):
+    """Raised for requests against unknown or unusable reservations"""
+
+
+class _Node:
+    """Treap node: a time point and the load change there, plus subtree aggregates"""
+
+    __slots__ = ("key", "delta", "priority", "left", "right", "total", "peak", "low", "high")
+
+    def __init__(self, key: float, delta: tuple):
+        self.key = key
+        self.delta = delta
+        self.priority = random.random()
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        self.total = self.peak = delta
+        self.low = self.high = key
+
+
+def _pull(node: _Node):
+    """Recompute a node's aggregates from its children"""
+    left, right, delta = node.left, node.right, node.delta
+    if left is not None:
+        total = _add(left.total, delta)
+        peak = (max(left.peak[0], total[0]), max(left.peak[1], total[1]), max(left.peak[2], total[2]))
+        node.low = left.low
+    else:
+        total = peak = delta
+        node.low = node.key
+    if right is not None:
+        peak = (
+            max(peak[0], total[0] + right.peak[0]),
+            max(peak[1], total[1] + right.peak[1]),
+            max(peak[2], total[2] + right.peak[2])
+        )
+        total = _add(total, right.total)
+        node.high = right.high
+    else:
+        node.high = node.key
+    node.total = total
+    node.peak = peak
+
+
+def _split(node: Optional[_Node], key: float, inclusive: bool = False) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into (keys < key, keys >= key), or (<=, >) if inclusive"""
+    if node is None:
+        return None, None
+    if node.key < key or (inclusive and node.key == key):
+        node.right, rest = _split(node.right, key, inclusive)
+        _pull(node)
+        return node, rest
+    rest, node.left = _split(node.left, key, inclusive)
+    _pull(node)
+    return rest, node
+
+
+def _merge(a: Optional[_Node], b: Optional[_Node]) -> Optional[_Node]:
+    """Join two treaps where every key of a is below every key of b"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority > b.priority:
+        a.right = _merge(a.right, b)
+        _pull(a)
+        return a
+    b.left = _merge(a, b.left)
+    _pull(b)
+    return b
+
+
+class LoadProfile:
+    """
+    Piecewise-constant (cpu, memory_gb, accelerators) load over time.
+
+    Stored as a treap of time points, each carrying the change in load at
+    that point; every subtree also keeps its total change and its peak
+    prefix sum per dimension. So the load at t is one root-to-leaf walk,
+    "is the load ever above a limit within (a, b)" descends only into
+    subtrees whose peak crosses the limit, and adding a reservation is two
+    point updates: all O(log n) in the number of reservation endpoints.
+    """
+
+    def __init__(self):
+        self.root: Optional[_Node] = None
+
+    def __bool__(self) -> bool:
+        return self.root is not None
+
+    def add(self, start: float, end: float, delta: tuple):
+        """Add delta to the load over [start, end)"""
+        if end <= start:
+            return
+        self._add_point(start, delta)
+        if end < math.inf:
+            self._add_point(end, _neg(delta))
+
+    def load_at(self, t: float) -> tuple:
+        """Load at time t"""
+        total = _ZERO
+        node = self.root
+        while node is not None:
+            if node.key <= t:
+                if node.left is not None:
+                    total = _add(total, node.left.total)
+                total = _add(total, node.delta)
+                node = node.right
+            else:
+                node = node.left
+        return total
+
+    def first_above(self, start: float, end: float, limit: tuple) -> Optional[float]:
+        """
+        Earliest time in [start, end) at which the load exceeds limit in
+        any dimension.
+
+        Returns:
+            That time, or None if the load stays within limit
+        """
+        base = self.load_at(start)
+        if _exceeds(base, limit):
+            return start
+        key, _ = self._first_above(self.root, start, end, base, limit)
+        return key
+
+    def next_change(self, t: float) -> Optional[float]:
+        """First time point after t"""
+        best = None
+        node = self.root
+        while node is not None:
+            if node.key > t:
+                best = node.key
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+    def compact(self, before: float):
+        """Fold all points before a time into one point at that time"""
+        past, self.root = _split(self.root, before)
+        if past is not None:
+            self._add_point(before, past.total)
+
+    def _add_point(self, key: float, delta: tuple):
+        left, rest = _split(self.root, key)
+        middle, right = _split(rest, key, inclusive=True)
+        if middle is None:
+            middle = _Node(key, delta)
+        else:
+            middle.delta = _add(middle.delta, delta)
+            _pull(middle)
+        if abs(middle.delta[0]) < _EPS and abs(middle.delta[1]) < _EPS and abs(middle.delta[2]) < _EPS:
+            middle = None
+        self.root = _merge(_merge(left, middle), right)
+
+    def _first_above(self, node: Optional[_Node], lo: float, hi: float, base: tuple, limit: tuple):
+        """(first key in (lo, hi) where base + prefix exceeds limit, base after the scanned keys)"""
+        if node is None or node.high <= lo or node.low >= hi:
+            return None, base
+        if node.low > lo and node.high < hi and not _exceeds(_add(base, node.peak), limit):
+            return None, _add(base, node.total)
+        key, base = self._first_above(node.left, lo, hi, base, limit)
+        if key is not None:
+            return key, base
+        if lo < node.key < hi:
+            base = _add(base, node.delta)
+            if _exceeds(base, limit):
+                return node.key, base
+        return self._first_above(node.right, lo, hi, base, limit)
+
+
+class ReservationStatus(str, Enum):
+    """Lifecycle of an advance reservation"""
+    BOOKED = "booked"        # Window not started yet
+    ACTIVE = "active"        # Within its window
+    COMPLETED = "completed"  # Window over
+    CANCELLED = "cancelled"
+
+
+class AdvanceReservation(BaseModel):
+    """Capacity guaranteed to a pool's jobs for a time window"""
+    reservation_id: str
+    name: str
+    pool_type: PoolType
+    resource_spec: ResourceSpec  # Per slot
+    slots: int = 1
+    start: datetime
+    end: datetime
+    tenant: str = DEFAULT_TENANT
+    created_at: datetime
+    status: ReservationStatus = ReservationStatus.BOOKED
+
+    class Config:
+        use_enum_values = True
+
+
+class ReservationCalendar:
+    """
+    Advance reservations of pool capacity, honoured by JobScheduler.
+
+    Per pool, three LoadProfiles are kept: `booked`, the total capacity of
+    all reservations; `holds`, the part of it not yet used by the
+    reservations' own jobs; and `committed`, the holds plus the expected
+    usage of running jobs (from start until start + runtime_estimate, or
+    indefinitely without an estimate). Usage that no profile explains
+    (jobs overrunning their estimate, allocations made outside the
+    scheduler) is assumed to last.
+
+    A reservation is admitted only if neither its booked load nor the
+    committed load plus its demand exceeds the pool's capacity anywhere in
+    its window. Jobs submitted with a reservation_id wait until its window
+    opens and then start only while the reservation has room, drawing from
+    it. Every other job may only start if committed load plus its demand
+    stays within capacity over [now, now + runtime_estimate); jobs without
+    an estimate must clear every future hold. This applies to every
+    placement, including backfilled jobs. All checks are O(log n) in the
+    number of reservations and running jobs. Capacity is guaranteed per
+    pool in aggregate.
+    """
+
+    def __init__(
+        self,
+        resource_manager: ResourceManager,
+        clock: Callable[[], datetime] = datetime.now,
+        compact_interval: float = 3600.0
+    ):
+        """
+        Args:
+            resource_manager: Source of pool capacity and free capacity
+            clock: Time source, replaceable for virtual-time simulation
+            compact_interval: Seconds between folding past profile points
+        """
+        self.resource_manager = resource_manager
+        self.clock = clock
+        self.compact_interval = compact_interval
+        self.reservations: Dict[str, AdvanceReservation] = {}
+        self.booked: Dict[PoolType, LoadProfile] = {pt: LoadProfile() for pt in PoolType}
+        self.holds: Dict[PoolType, LoadProfile] = {pt: LoadProfile() for pt in PoolType}
+        self.committed: Dict[PoolType, LoadProfile] = {pt: LoadProfile() for pt in PoolType}
+        self._windows: Dict[str, Tuple[float, float, tuple]] = {}  # reservation_id -> (start, end, demand)
+        self._consumed: Dict[str, tuple] = {}  # reservation_id -> demand of its running jobs
+        self._charged: Dict[str, Tuple[str, tuple, float]] = {}  # job_id -> (reservation_id, demand, since)
+        self._usage: Dict[str, Tuple[tuple, float, float]] = {}  # job_id -> (demand, since, until)
+        self._compacted_at = -math.inf
+        self.rejected = 0
+        self.held_back = 0  # Placements refused to protect a reservation
+        self.journal = None  # Set by SchedulerJournal.open
+
+    # Booking
+
+    def reserve(
+        self,
+        pool_type: PoolType,
+        resource_spec: ResourceSpec,
+        start: datetime,
+        end: datetime,
+        slots: int = 1,
+        name: str = "",
+        tenant: str = DEFAULT_TENANT
+    ) -> Optional[AdvanceReservation]:
+        """
+        Book capacity for a time window if the pool can guarantee it.
+
+        Args:
+            pool_type: Pool to reserve in
+            resource_spec: Resources per slot
+            start: Window start (naive local time, or timezone-aware)
+            end: Window end (likewise)
+            slots: Number of copies of resource_spec
+            name: Label, e.g. the sweep or training run
+            tenant: Team the reservation belongs to
+
+        Returns:
+            The reservation, or None if it does not fit
+        """
+        pool_type = PoolType(pool_type)
+        start, end = _local(start), _local(end)
+        now = self.clock()
+        begin, finish = max(start, now).timestamp(), end.timestamp()
+        if finish <= begin:
+            return None
+        limits = self._limits(pool_type, self._demand(resource_spec, slots), now.timestamp())
+        if limits is None or self._blocked(pool_type, begin, finish, limits) is not None:
+            self.rejected += 1
+            return None
+        reservation = AdvanceReservation(
+            reservation_id=new_id("resv_", now),
+            name=name,
+            pool_type=pool_type,
+            resource_spec=resource_spec,
+            slots=slots,
+            start=start,
+            end=end,
+            tenant=tenant,
+            created_at=now
+        )
+        self._book(reservation)
+        if self.journal is not None:
+            self.journal.record_reservation(reservation)
+        return reservation
+
+    def earliest_start(
+        self,
+        pool_type: PoolType,
+        resource_spec: ResourceSpec,
+        duration: float,
+        slots: int = 1,
+        not_before: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """
+        Earliest time a reservation of this size and duration would be
+        admitted.
+
+        Each probe is O(log n) and jumps past the first point where the
+        window does not fit.
+
+        Args:
+            pool_type: Pool to reserve in
+            resource_spec: Resources per slot
+            duration: Window length in seconds
+            slots: Number of copies of resource_spec
+            not_before: Lower bound (default: now)
+
+        Returns:
+            Start time, or None if it never fits (more than the pool's
+            capacity, or blocked by jobs running without an estimate)
+        """
+        pool_type = PoolType(pool_type)
+        now = self.clock()
+        limits = self._limits(pool_type, self._demand(resource_spec, slots), now.timestamp())
+        if limits is None:
+            return None
+        t = max(_local(not_before or now), now).timestamp()
+        while True:
+            blocked = self._blocked(pool_type, t, t + duration, limits)
+            if blocked is None:
+                return datetime.fromtimestamp(t)
+            profile, at = blocked
+            t = profile.next_change(at)
+            if t is None:
+                return None
+
+    def cancel(self, reservation_id: str) -> bool:
+        """
+        Cancel a reservation. Its running jobs continue as ordinary jobs.
+
+        Returns:
+            True if the reservation was booked or active
+        """
+        reservation = self.reservations.get(reservation_id)
+        window = self._windows.pop(reservation_id, None)
+        if reservation is None or window is None:
+            return False
+        start, end, demand = window
+        pool_type = PoolType(reservation.pool_type)
+        self.booked[pool_type].add(start, end, _neg(demand))
+        self._hold(pool_type, start, end, _neg(demand))
+        for job_id, (owner, used, since) in list(self._charged.items()):
+            if owner == reservation_id:
+                self._hold(pool_type, since, end, used)
+                del self._charged[job_id]
+        self._consumed.pop(reservation_id, None)
+        reservation.status = ReservationStatus.CANCELLED
+        if self.journal is not None:
+            self.journal.record_reservation(reservation)
+        return True
+
+    def get(self, reservation_id: str) -> Optional[AdvanceReservation]:
+        """Look up a reservation by ID"""
+        reservation = self.reservations.get(reservation_id)
+        if reservation is not None:
+            self._refresh(reservation, self.clock())
+        return reservation
+
+    def list(self, pool_type: Optional[PoolType] = None, include_finished: bool = False) -> List[AdvanceReservation]:
+        """Reservations in start order"""
+        now = self.clock()
+        result = []
+        for reservation in self.reservations.values():
+            self._refresh(reservation, now)
+            if pool_type is not None and reservation.pool_type != PoolType(pool_type):
+                continue
+            if not include_finished and reservation.status in (
+                ReservationStatus.COMPLETED, ReservationStatus.CANCELLED
+            ):
+                continue
+            result.append(reservation)
+        return sorted(result, key=lambda r: r.start)
+
+    def next_boundary(self) -> Optional[datetime]:
+        """Next time a reservation window opens or closes"""
+        now = self.clock().timestamp()
+        times = [t for t in (profile.next_change(now) for profile in self.booked.values()) if t is not None]
+        return datetime.fromtimestamp(min(times)) if times else None
+
+    def restore(self, reservation: AdvanceReservation):
+        """Re-book a reservation recovered from the journal"""
+        self.reservations[reservation.reservation_id] = reservation
+        if reservation.status != ReservationStatus.CANCELLED:
+            self._book(reservation)
+
+    # Scheduler hooks
+
+    def admits(self, job: Any) -> bool:
+        """
+        Whether a job may start now without breaking a reservation.
+
+        Args:
+            job: Pending job with pool_type and resource_spec
+
+        Returns:
+            False if the job must wait
+        """
+        if job.resource_spec is None or job.pool_type is None:
+            return True
+        now = self.clock().timestamp()
+        demand = self._job_demand(job)
+        window = self._windows.get(job.reservation_id) if job.reservation_id else None
+        if window is not None and now < window[1]:
+            start, _, reserved = window
+            if now < start:
+                return False
+            consumed = self._consumed.get(job.reservation_id, _ZERO)
+            return not _exceeds(_add(consumed, demand), reserved)
+
+        pool_type = PoolType(job.pool_type)
+        if not self.holds[pool_type]:
+            return True
+        if now - self._compacted_at >= self.compact_interval:
+            self._compact(now)
+        limits = self._limits(pool_type, demand, now)
+        end = now + job.runtime_estimate if job.runtime_estimate else math.inf
+        if limits is not None and self.committed[pool_type].first_above(now, end, limits[1]) is None:
+            return True
+        self.held_back += 1
+        return False
+
+    def job_started(self, job: Any):
+        """Track a started job's expected usage and draw it from its reservation"""
+        if job.resource_spec is None or job.pool_type is None or job.job_id in self._usage:
+            return
+        pool_type = PoolType(job.pool_type)
+        demand = self._job_demand(job)
+        since = (job.started_at or self.clock()).timestamp()
+        until = since + job.runtime_estimate if job.runtime_estimate else math.inf
+        self._usage[job.job_id] = (demand, since, until)
+        self.committed[pool_type].add(since, until, demand)
+
+        window = self._windows.get(job.reservation_id) if job.reservation_id else None
+        if window is None:
+            return
+        start, end, _ = window
+        if start <= since < end:
+            self._charged[job.job_id] = (job.reservation_id, demand, since)
+            self._consumed[job.reservation_id] = _add(self._consumed.get(job.reservation_id, _ZERO), demand)
+            self._hold(pool_type, since, end, _neg(demand))
+
+    def job_stopped(self, job: Any):
+        """Drop a finished or preempted job's usage and return it to its reservation"""
+        usage = self._usage.pop(job.job_id, None)
+        if usage is None:
+            return
+        pool_type = PoolType(job.pool_type)
+        demand, since, until = usage
+        now = self.clock().timestamp()
+        self.committed[pool_type].add(max(now, since), until, _neg(demand))
+
+        charge = self._charged.pop(job.job_id, None)
+        if charge is None:
+            return
+        reservation_id = charge[0]
+        self._consumed[reservation_id] = _add(self._consumed[reservation_id], _neg(demand))
+        _, end, _ = self._windows[reservation_id]
+        self._hold(pool_type, max(now, since), end, demand)
+
+    def get_status(self) -> Dict:
+        """Counts of reservations by status and admission counters"""
+        counts = {status.value: 0 for status in ReservationStatus}
+        now = self.clock()
+        for reservation in self.reservations.values():
+            self._refresh(reservation, now)
+            counts[reservation.status] += 1
+        return {
+            "reservations": counts,
+            "rejected": self.rejected,
+            "held_back_placements": self.held_back
+        }
+
+    # Internals
+
+    def _book(self, reservation: AdvanceReservation):
+        pool_type = PoolType(reservation.pool_type)
+        start, end = reservation.start.timestamp(), reservation.end.timestamp()
+        demand = self._demand(reservation.resource_spec, reservation.slots)
+        self.reservations[reservation.reservation_id] = reservation
+        self._windows[reservation.reservation_id] = (start, end, demand)
+        self.booked[pool_type].add(start, end, demand)
+        self._hold(pool_type, start, end, demand)
+
+    def _hold(self, pool_type: PoolType, start: float, end: float, delta: tuple):
+        """Change unconsumed reserved capacity, which is also committed"""
+        self.holds[pool_type].add(start, end, delta)
+        self.committed[pool_type].add(start, end, delta)
+
+    def _limits(self, pool_type: PoolType, demand: tuple, now: float) -> Optional[Tuple[tuple, tuple]]:
+        """
+        Highest booked and committed load that still leave room for demand.
+
+        Returns:
+            (booked limit, committed limit), or None if demand exceeds the
+            pool's capacity
+        """
+        inventory = self.resource_manager.pools[pool_type]
+        n = inventory.size
+        active = inventory.active[:n]
+        capacity = inventory.capacity[:, :n][:, active].sum(axis=1).tolist()
+        free = inventory.free[:, :n][:, active].sum(axis=1).tolist()
+        committed = self.committed[pool_type].load_at(now)
+        holds = self.holds[pool_type].load_at(now)
+        booked_limit, committed_limit = [], []
+        for d in range(3):
+            # Usage the running-job profile does not explain is assumed to last
+            unexplained = max(0.0, (capacity[d] - free[d]) - (committed[d] - holds[d]))
+            booked_limit.append(capacity[d] - demand[d])
+            committed_limit.append(capacity[d] - demand[d] - unexplained)
+        if min(booked_limit) < -_EPS:
+            return None
+        return tuple(booked_limit), tuple(committed_limit)
+
+    def _blocked(self, pool_type: PoolType, start: float, end: float, limits: Tuple[tuple, tuple]):
+        """(profile, first time it is over its limit in [start, end)), or None"""
+        for profile, limit in ((self.booked[pool_type], limits[0]), (self.committed[pool_type], limits[1])):
+            at = profile.first_above(start, end, limit)
+            if at is not None:
+                return profile, at
+        return None
+
+    def _refresh(self, reservation: AdvanceReservation, now: datetime):
+        if reservation.status == ReservationStatus.CANCELLED:
+            return
+        if now >= reservation.end:
+            reservation.status = ReservationStatus.COMPLETED
+            if self._windows.pop(reservation.reservation_id, None) is not None:
+                self._consumed.pop(reservation.reservation_id, None)
+                for job_id, charge in list(self._charged.items()):
+                    if charge[0] == reservation.reservation_id:
+                        del self._charged[job_id]
+        elif now >= reservation.start:
+            reservation.status = ReservationStatus.ACTIVE
+        else:
+            reservation.status = ReservationStatus.BOOKED
+
+    def _compact(self, now: float):
+        """Drop finished windows and fold past profile points"""
+        self._compacted_at = now
+        current = datetime.fromtimestamp(now)
+        for reservation in list(self.reservations.values()):
+            self._refresh(reservation, current)
+        for profiles in (self.booked, self.holds, self.committed):
+            for profile in profiles.values():
+                profile.compact(now)
+
+    def _demand(self, resource_spec: ResourceSpec, slots: int) -> tuple:
+        demand = self.resource_manager.demand_vector(resource_spec) * max(1, slots)
+        return (float(demand[CPU]), float(demand[MEMORY]), float(demand[ACCELERATORS]))
+
+    def _job_demand(self, job: Any) -> tuple:
+        return self._demand(job.resource_spec, job.gang_size)
@@ -3,10 +3,15 @@ Resource Manager for Compute Factory
 Handles resource abstraction, allocation, and pool management.
 """
 
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 from enum import Enum
 from pydantic import BaseModel
 from datetime import datetime
+import numpy as np
+from .placement import NodeInventory, PlacementPolicy, CPU, MEMORY, ACCELERATORS
+from .topology import CoreTracker, HostTopology
+from .metering import UsageMeter
+from .ids import new_id
 
 
 class ResourceType(str, Enum):
@@ -36,6 +41,21 @@ class ResourceSpec(BaseModel):
         use_enum_values = True
 
 
+class NodeSpec(BaseModel):
+    """Capacity of a compute node in a resource pool"""
+    node_id: str
+    cpu_cores: int
+    memory_gb: int
+    accelerator_type: Optional[ResourceType] = None
+    accelerator_count: int = 0
+    accelerator_model: Optional[str] = None
+    bandwidth_gbps: Optional[float] = None
+    topology: Optional[HostTopology] = None
+    
+    class Config:
+        use_enum_values = True
+
+
 class ResourceAllocation(BaseModel):
     """Record of resource allocation"""
     allocation_id: str
@@ -44,64 +64,312 @@ class ResourceAllocation(BaseModel):
     allocated_at: datetime
     released_at: Optional[datetime] = None
     job_id: Optional[str] = None
+    node_id: Optional[str] = None
+    gang_id: Optional[str] = None
+    cpu_ids: Optional[List[int]] = None
     
     class Config:
         use_enum_values = True
 
 
+# Pools whose CPU allocations are pinned to specific cores when the node's
+# topology is known
+TOPOLOGY_POOLS = (PoolType.ENVIRONMENT, PoolType.TRAINING)
+
+
 class ResourceManager:
     """Manages compute resource allocation and pools"""
     
-    def __init__(self):
-        self.pools: Dict[PoolType, List[ResourceSpec]] = {
-            PoolType.INFERENCE: [],
-            PoolType.TRAINING: [],
-            PoolType.ENVIRONMENT: []
+    def __init__(
+        self,
+        placement_policy: PlacementPolicy = PlacementPolicy.BEST_FIT,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        """
+        Args:
+            placement_policy: Default node selection policy
+            clock: Time source, replaceable for virtual-time simulation
+        """
+        self.pools: Dict[PoolType, NodeInventory] = {
+            PoolType.INFERENCE: NodeInventory(),
+            PoolType.TRAINING: NodeInventory(),
+            PoolType.ENVIRONMENT: NodeInventory()
         }
+        self.nodes: Dict[str, NodeSpec] = {}
         self.allocations: Dict[str, ResourceAllocation] = {}
+        self.gangs: Dict[str, List[str]] = {}
+        self.placement_policy = placement_policy
+        self.clock = clock
+        self.meter = UsageMeter(clock=clock)
+        self._active_counts: Dict[PoolType, int] = {pt: 0 for pt in PoolType}
+        self.cores: Dict[str, CoreTracker] = {}  # node_id -> free cores, topology pools only
+        # Pinned allocations: [active, within one NUMA node, within one L3, NUMA nodes spanned]
+        self._locality: Dict[PoolType, List[int]] = {pt: [0, 0, 0, 0] for pt in PoolType}
+        self.journal = None  # Set by SchedulerJournal.open
+        self.capacity_version = 0  # Bumped whenever nodes are added or removed
+    
+    def add_node(self, pool_type: PoolType, node: NodeSpec) -> NodeSpec:
+        """
+        Register a node's capacity with a pool.
+        
+        Registering a node again updates its capacity; allocations on it
+        stay live and keep their capacity and pinned cores.
+        
+        Args:
+            pool_type: Pool the node serves
+            node: Node capacity specification
+            
+        Returns:
+            Registered NodeSpec
+            
+        Raises:
+            ValueError: If live allocations pin cores the new topology lacks
+        """
+        pinned = [
+            allocation for allocation in self.allocations.values()
+            if allocation.node_id == node.node_id and allocation.cpu_ids
+        ]
+        keeps_cores = node.topology is not None and pool_type in TOPOLOGY_POOLS
+        if pinned:
+            cpus = set(node.topology.cpus()) if keeps_cores else set()
+            missing = sorted({cpu for a in pinned for cpu in a.cpu_ids} - cpus)
+            if missing:
+                raise ValueError(
+                    f"Node {node.node_id} has live allocations pinned to cores {missing} "
+                    f"that the new topology lacks"
+                )
+        self.pools[pool_type].add_node(
+            node.node_id,
+            cpu=node.cpu_cores,
+            memory_gb=node.memory_gb,
+            accelerators=node.accelerator_count,
+            accelerator_type=node.accelerator_type,
+            accelerator_model=node.accelerator_model,
+            bandwidth_gbps=node.bandwidth_gbps or 0.0
+        )
+        self.cores.pop(node.node_id, None)
+        if keeps_cores:
+            tracker = self.cores[node.node_id] = CoreTracker(node.topology)
+            for allocation in pinned:  # Still held by live allocations
+                tracker.take(allocation.cpu_ids)
+            self._update_locality(pool_type, node.node_id, tracker)
+        self.nodes[node.node_id] = node
+        self.capacity_version += 1
+        if self.journal is not None:
+            self.journal.record_node(pool_type, node)
+        return node
+    
+    def remove_node(self, pool_type: PoolType, node_id: str) -> bool:
+        """
+        Stop placing new allocations on a node.
+        
+        Args:
+            pool_type: Pool the node serves
+            node_id: ID of node to remove
+            
+        Returns:
+            True if the node was removed
+        """
+        removed = self.pools[pool_type].remove_node(node_id)
+        if removed:
+            self.capacity_version += 1
+            if self.journal is not None:
+                self.journal.record_node_removal(pool_type, node_id)
+        return removed
+    
+    def total_capacity(self) -> np.ndarray:
+        """Capacity of all active nodes in every pool as a (cpu, memory_gb, accelerators) vector"""
+        total = np.zeros(3)
+        for inventory in self.pools.values():
+            n = inventory.size
+            total += inventory.capacity[:, :n][:, inventory.active[:n]].sum(axis=1)
+        return total
+    
+    @staticmethod
+    def demand_vector(resource_spec: ResourceSpec) -> np.ndarray:
+        """Convert a ResourceSpec into a (cpu, memory_gb, accelerators) vector"""
+        demand = np.zeros(3)
+        if resource_spec.resource_type == ResourceType.CPU:
+            demand[CPU] = resource_spec.count
+        else:
+            demand[ACCELERATORS] = resource_spec.count
+        demand[MEMORY] = resource_spec.memory_gb or 0
+        return demand
     
     def allocate_resource(
         self, 
         pool_type: PoolType, 
         resource_spec: ResourceSpec,
-        job_id: Optional[str] = None
-    ) -> ResourceAllocation:
+        job_id: Optional[str] = None,
+        policy: Optional[PlacementPolicy] = None
+    ) -> Optional[ResourceAllocation]:
         """
         Allocate resources from a specific pool.
         
+        CPU allocations on nodes with a known topology in TOPOLOGY_POOLS are
+        pinned to specific cores (allocation.cpu_ids), chosen to stay within
+        one L3 cache domain or, failing that, one NUMA node.
+        
         Args:
             pool_type: Type of resource pool
             resource_spec: Specification of required resources
             job_id: Optional job identifier
+            policy: Placement policy, defaults to the manager's policy
             
         Returns:
-            ResourceAllocation record
+            ResourceAllocation record, or None if no node has capacity
         """
-        allocation_id = f"alloc_{datetime.now().timestamp()}"
+        inventory = self.pools[pool_type]
+        demand = self.demand_vector(resource_spec)
+        index = inventory.select(
+            demand,
+            policy or self.placement_policy,
+            accelerator_type=(
+                None if resource_spec.resource_type == ResourceType.CPU
+                else resource_spec.resource_type
+            ),
+            accelerator_model=resource_spec.accelerator_model
+        )
+        if index is None:
+            return None
+        inventory.reserve(index, demand)
+        
+        allocated_at = self.clock()
+        allocation_id = new_id("alloc_", allocated_at)
         allocation = ResourceAllocation(
             allocation_id=allocation_id,
             pool_type=pool_type,
             resource_spec=resource_spec,
-            allocated_at=datetime.now(),
-            job_id=job_id
+            allocated_at=allocated_at,
+            job_id=job_id,
+            node_id=inventory.node_ids[index]
         )
+        self._pin_cores(pool_type, allocation)
         self.allocations[allocation_id] = allocation
+        self.meter.record_allocation(allocation)
+        if self.journal is not None:
+            self.journal.record_allocation(allocation)
+        self._active_counts[pool_type] += 1
         return allocation
     
+    def allocate_gang(
+        self,
+        pool_type: PoolType,
+        resource_spec: ResourceSpec,
+        num_slots: int,
+        job_id: Optional[str] = None
+    ) -> Optional[List[ResourceAllocation]]:
+        """
+        Allocate num_slots copies of resource_spec across nodes, all or nothing.
+        
+        The whole placement is planned before anything is reserved, so a gang
+        that does not fit holds no capacity and cannot block other jobs. Gangs
+        stay on one accelerator model (resource_spec.accelerator_model if set)
+        and prefer the best-connected nodes. Nodes without a bandwidth_gbps
+        rating rank below every rated node.
+        
+        Args:
+            pool_type: Type of resource pool
+            resource_spec: Resources needed by each slot (e.g. one worker)
+            num_slots: Number of slots in the gang
+            job_id: Optional job identifier
+            
+        Returns:
+            One ResourceAllocation per node used, or None if the gang cannot be
+            placed in full. Release them together via the shared gang_id.
+        """
+        inventory = self.pools[pool_type]
+        demand = self.demand_vector(resource_spec)
+        plan = inventory.plan_gang(
+            demand,
+            num_slots,
+            accelerator_type=(
+                None if resource_spec.resource_type == ResourceType.CPU
+                else resource_spec.resource_type
+            ),
+            accelerator_model=resource_spec.accelerator_model
+        )
+        if plan is None:
+            return None
+        
+        allocated_at = self.clock()
+        gang_id = new_id("gang_", allocated_at)
+        allocations = []
+        for i, (index, slots) in enumerate(plan):
+            inventory.reserve(index, demand * slots)
+            node_spec = resource_spec.copy(update={
+                "count": resource_spec.count * slots,
+                "memory_gb": (
+                    resource_spec.memory_gb * slots
+                    if resource_spec.memory_gb is not None else None
+                )
+            })
+            allocation = ResourceAllocation(
+                allocation_id=f"{gang_id}_{i}",
+                pool_type=pool_type,
+                resource_spec=node_spec,
+                allocated_at=allocated_at,
+                job_id=job_id,
+                node_id=inventory.node_ids[index],
+                gang_id=gang_id
+            )
+            self._pin_cores(pool_type, allocation)
+            self.allocations[allocation.allocation_id] = allocation
+            self.meter.record_allocation(allocation)
+            if self.journal is not None:
+                self.journal.record_allocation(allocation)
+            allocations.append(allocation)
+        self.gangs[gang_id] = [a.allocation_id for a in allocations]
+        self._active_counts[pool_type] += len(allocations)
+        return allocations
+    
     def release_resource(self, allocation_id: str) -> bool:
         """
         Release allocated resources.
         
         Args:
-            allocation_id: ID of the allocation to release
+            allocation_id: ID of the allocation to release, or a gang_id to
+                release every member of the gang
             
         Returns:
             True if successfully released
         """
-        if allocation_id in self.allocations:
-            self.allocations[allocation_id].released_at = datetime.now()
-            return True
-        return False
+        if allocation_id in self.gangs:
+            members = self.gangs.pop(allocation_id)
+            return any([self.release_resource(a) for a in members])
+        
+        allocation = self.allocations.get(allocation_id)
+        if allocation is None or allocation.released_at is not None:
+            return False
+        allocation.released_at = self.clock()
+        self.meter.record_release(allocation)
+        if self.journal is not None:
+            self.journal.record_release(allocation)
+        pool_type = PoolType(allocation.pool_type)
+        inventory = self.pools[pool_type]
+        index = inventory.index_of(allocation.node_id) if allocation.node_id else None
+        if index is not None:
+            inventory.release(index, self.demand_vector(allocation.resource_spec))
+        if allocation.cpu_ids:
+            self._unpin_cores(pool_type, allocation)
+        self._active_counts[pool_type] -= 1
+        return True
+    
+    def get_allocations(self, allocation_id: str) -> List[ResourceAllocation]:
+        """
+        Resolve an allocation or gang ID to its active allocation records.
+        
+        Args:
+            allocation_id: Allocation ID or gang_id
+            
+        Returns:
+            Active allocations (empty if unknown or released)
+        """
+        ids = self.gangs.get(allocation_id, [allocation_id])
+        return [
+            self.allocations[a] for a in ids
+            if a in self.allocations and self.allocations[a].released_at is None
+        ]
     
     def get_pool_status(self, pool_type: PoolType) -> Dict:
         """
@@ -113,18 +381,80 @@ class ResourceManager:
         Returns:
             Dictionary with pool statistics
         """
-        active_allocations = [
-            a for a in self.allocations.values()
-            if a.pool_type == pool_type and a.released_at is None
-        ]
+        inventory = self.pools[pool_type]
+        n = inventory.size
+        schedulable = inventory.active[:n] & (inventory.free[:, :n] > 0).any(axis=0)
         
         return {
             "pool_type": pool_type,
-            "total_resources": len(self.pools[pool_type]),
-            "active_allocations": len(active_allocations),
-            "available": len(self.pools[pool_type]) - len(active_allocations)
+            "total_resources": len(inventory),
+            "active_allocations": self._active_counts[pool_type],
+            "available": int(schedulable.sum()),
+            "resources": inventory.stats(),
+            "placement_quality": self._placement_quality(pool_type)
         }
     
     def get_all_pools(self) -> List[Dict]:
         """Get status of all resource pools"""
         return [self.get_pool_status(pt) for pt in PoolType]
+    
+    def _pin_cores(self, pool_type: PoolType, allocation: ResourceAllocation):
+        """Choose cores for a CPU allocation on a node with known topology"""
+        tracker = self.cores.get(allocation.node_id)
+        spec = allocation.resource_spec
+        if tracker is None or spec.resource_type != ResourceType.CPU:
+            return
+        cpu_ids = tracker.select(spec.count)
+        if cpu_ids:
+            self._assign_cores(pool_type, allocation, cpu_ids)
+    
+    def _assign_cores(self, pool_type: PoolType, allocation: ResourceAllocation, cpu_ids: List[int]):
+        """Take specific cores for an allocation (also used by journal recovery)"""
+        tracker = self.cores.get(allocation.node_id)
+        if tracker is None:
+            return
+        tracker.take(cpu_ids)
+        allocation.cpu_ids = list(cpu_ids)
+        numa_nodes, l3_domains = tracker.span(cpu_ids)
+        counts = self._locality[pool_type]
+        counts[0] += 1
+        counts[1] += numa_nodes <= 1
+        counts[2] += l3_domains <= 1
+        counts[3] += numa_nodes
+        self._update_locality(pool_type, allocation.node_id, tracker)
+    
+    def _unpin_cores(self, pool_type: PoolType, allocation: ResourceAllocation):
+        tracker = self.cores.get(allocation.node_id)
+        if tracker is None:
+            return
+        numa_nodes, l3_domains = tracker.span(allocation.cpu_ids)
+        counts = self._locality[pool_type]
+        counts[0] -= 1
+        counts[1] -= numa_nodes <= 1
+        counts[2] -= l3_domains <= 1
+        counts[3] -= numa_nodes
+        tracker.give(allocation.cpu_ids)
+        self._update_locality(pool_type, allocation.node_id, tracker)
+    
+    def _update_locality(self, pool_type: PoolType, node_id: str, tracker: CoreTracker):
+        inventory = self.pools[pool_type]
+        index = inventory.index_of(node_id)
+        if index is not None:
+            numa_block, l3_block = tracker.largest_free()
+            inventory.set_locality(index, l3_block, numa_block)
+    
+    def _placement_quality(self, pool_type: PoolType) -> Dict:
+        """
+        Locality of the pool's active core-pinned allocations.
+        
+        single_numa and single_l3 are the fractions confined to one NUMA node
+        and one L3 cache domain; avg_numa_span is the mean number of NUMA
+        nodes an allocation's cores are spread over (1.0 is ideal).
+        """
+        active, single_numa, single_l3, spans = self._locality[pool_type]
+        return {
+            "pinned_allocations": active,
+            "single_numa": round(single_numa / active, 4) if active else 1.0,
+            "single_l3": round(single_l3 / active, 4) if active else 1.0,
+            "avg_numa_span": round(spans / active, 4) if active else 1.0
+        }
@@ -0,0 +1,226 @@
+"""
+Resource Sampler for Compute Factory
+Background thread that samples host, process and cgroup usage into a ring buffer.
+"""
+
+from typing import Dict, List, Optional
+from collections import deque
+from pydantic import BaseModel
+from datetime import datetime
+import os
+import threading
+import time
+import psutil
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+class ResourceSnapshot(BaseModel):
+    """Point-in-time resource usage sample"""
+    timestamp: datetime
+    # Host
+    cpu_percent: float
+    memory_total_gb: float
+    memory_used_gb: float
+    memory_percent: float
+    disk_total_gb: float
+    disk_used_gb: float
+    disk_percent: float
+    disk_read_mbps: float = 0.0
+    disk_write_mbps: float = 0.0
+    net_sent_mbps: float = 0.0
+    net_recv_mbps: float = 0.0
+    # Current process
+    process_cpu_percent: float = 0.0
+    process_memory_gb: float = 0.0
+    process_threads: int = 0
+    # cgroup v2 (None when not running under a cgroup v2 hierarchy)
+    cgroup_cpu_cores: Optional[float] = None
+    cgroup_memory_gb: Optional[float] = None
+    cgroup_memory_limit_gb: Optional[float] = None
+
+
+class ResourceSampler:
+    """
+    Samples resource usage on a background thread.
+
+    psutil counters are read without blocking (``cpu_percent(interval=None)``
+    reports usage since the previous sample), rates are derived from counter
+    deltas between samples, and each sample is appended to a fixed-size ring
+    buffer. Readers only take a reference to the newest snapshot.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        history_size: int = 3600,
+        disk_path: str = "/",
+        cgroup_root: str = CGROUP_ROOT
+    ):
+        """
+        Args:
+            interval: Seconds between samples
+            history_size: Number of snapshots kept in the ring buffer
+            disk_path: Filesystem path used for disk usage
+            cgroup_root: Mount point of the cgroup v2 hierarchy
+        """
+        self.interval = interval
+        self.disk_path = disk_path
+        self.cgroup_dir = self._find_cgroup_dir(cgroup_root)
+        self.history: deque = deque(maxlen=history_size)
+        self._latest: Optional[ResourceSnapshot] = None
+        self._process = psutil.Process(os.getpid())
+        self._last_counters: Optional[Dict] = None
+
+        self._running = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """Start the sampling thread"""
+        if self._running:
+            return
+        self._running = True
+        self._stop_event.clear()
+        self.sample()  # Prime counters so the first reading is immediate
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self._running = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def latest(self) -> Optional[ResourceSnapshot]:
+        """Most recent snapshot, without blocking"""
+        return self._latest
+
+    def window(self, seconds: float) -> List[ResourceSnapshot]:
+        """Snapshots taken in the last `seconds` seconds, oldest first"""
+        cutoff = time.time() - seconds
+        return [s for s in list(self.history) if s.timestamp.timestamp() >= cutoff]
+
+    def sample(self) -> ResourceSnapshot:
+        """
+        Take one sample and append it to the ring buffer.
+
+        Returns:
+            New ResourceSnapshot
+        """
+        now = time.monotonic()
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        counters = {
+            "time": now,
+            "disk_io": psutil.disk_io_counters(),
+            "net_io": psutil.net_io_counters(),
+            "cgroup_cpu_usec": self._read_cgroup_cpu_usec()
+        }
+        rates = self._rates(counters)
+        self._last_counters = counters
+
+        snapshot = ResourceSnapshot(
+            timestamp=datetime.now(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_total_gb=memory.total / (1024**3),
+            memory_used_gb=memory.used / (1024**3),
+            memory_percent=memory.percent,
+            disk_total_gb=disk.total / (1024**3),
+            disk_used_gb=disk.used / (1024**3),
+            disk_percent=disk.percent,
+            process_cpu_percent=self._process.cpu_percent(interval=None),
+            process_memory_gb=self._process.memory_info().rss / (1024**3),
+            process_threads=self._process.num_threads(),
+            cgroup_memory_gb=self._read_cgroup_bytes("memory.current"),
+            cgroup_memory_limit_gb=self._read_cgroup_bytes("memory.max"),
+            **rates
+        )
+        self.history.append(snapshot)
+        self._latest = snapshot
+        return snapshot
+
+    def _run(self):
+        """Sampling loop"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️  Resource sampling failed: {e}")
+
+    def _rates(self, counters: Dict) -> Dict:
+        """Per-second rates from the counter delta since the last sample"""
+        previous = self._last_counters
+        if previous is None:
+            return {}
+        elapsed = counters["time"] - previous["time"]
+        if elapsed <= 0:
+            return {}
+
+        mb = 1024**2
+        rates = {}
+        if counters["disk_io"] and previous["disk_io"]:
+            rates["disk_read_mbps"] = (
+                (counters["disk_io"].read_bytes - previous["disk_io"].read_bytes) / mb / elapsed
+            )
+            rates["disk_write_mbps"] = (
+                (counters["disk_io"].write_bytes - previous["disk_io"].write_bytes) / mb / elapsed
+            )
+        if counters["net_io"] and previous["net_io"]:
+            rates["net_sent_mbps"] = (
+                (counters["net_io"].bytes_sent - previous["net_io"].bytes_sent) / mb / elapsed
+            )
+            rates["net_recv_mbps"] = (
+                (counters["net_io"].bytes_recv - previous["net_io"].bytes_recv) / mb / elapsed
+            )
+        if counters["cgroup_cpu_usec"] is not None and previous["cgroup_cpu_usec"] is not None:
+            used = counters["cgroup_cpu_usec"] - previous["cgroup_cpu_usec"]
+            rates["cgroup_cpu_cores"] = used / 1e6 / elapsed
+        return rates
+
+    @staticmethod
+    def _find_cgroup_dir(root: str) -> Optional[str]:
+        """cgroup v2 directory of this process, if the unified hierarchy is mounted"""
+        if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return None
+        try:
+            with open("/proc/self/cgroup") as f:
+                for line in f:
+                    if line.startswith("0::"):
+                        path = os.path.join(root, line.strip()[3:].lstrip("/"))
+                        return path if os.path.isdir(path) else root
+        except OSError:
+            pass
+        return root
+
+    def _read_cgroup_cpu_usec(self) -> Optional[int]:
+        if not self.cgroup_dir:
+            return None
+        try:
+            with open(os.path.join(self.cgroup_dir, "cpu.stat")) as f:
+                for line in f:
+                    key, _, value = line.partition(" ")
+                    if key == "usage_usec":
+                        return int(value)
+        except OSError:
+            pass
+        return None
+
+    def _read_cgroup_bytes(self, name: str) -> Optional[float]:
+        if not self.cgroup_dir:
+            return None
+        try:
+            with open(os.path.join(self.cgroup_dir, name)) as f:
+                value = f.read().strip()
+        except OSError:
+            return None
+        if value == "max":
+            return None
+        return int(value) / (1024**3)
@@ -3,11 +3,19 @@ Job Scheduler for Compute Factory
 Handles job queue, priority scheduling, and autoscaling.
 """
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set
 from enum import Enum
 from pydantic import BaseModel
 from datetime import datetime
+from time import perf_counter
 import asyncio
+from .job_queue import JobQueue
+from .fair_share import FairShareQueue, DEFAULT_TENANT
+from .backfill import BackfillPlanner
+from .dependencies import DependencyGraph, DependencyError
+from .reservations import ReservationCalendar, ReservationError
+from .ids import new_id
+from .resource_manager import ResourceManager, ResourceSpec, PoolType
 
 
 class JobPriority(str, Enum):
@@ -25,6 +33,15 @@ class JobStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     PREEMPTED = "preempted"
+    CANCELLED = "cancelled"
+    BLOCKED = "blocked"  # Waiting for upstream jobs to complete
+    UPSTREAM_FAILED = "upstream_failed"  # An upstream job failed or was cancelled
+
+
+# Final states in which a job never completed successfully
+UNSUCCESSFUL_STATUSES = (
+    JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.UPSTREAM_FAILED
+)
 
 
 class ComputeJob(BaseModel):
@@ -35,27 +52,87 @@ class ComputeJob(BaseModel):
     status: JobStatus = JobStatus.PENDING
     preemptible: bool = False
     created_at: datetime
+    queued_at: Optional[datetime] = None  # Last time the job entered the queue
     started_at: Optional[datetime] = None
+    last_checkpoint_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     allocation_id: Optional[str] = None
+    pool_type: Optional[PoolType] = None
+    resource_spec: Optional[ResourceSpec] = None
+    gang_size: int = 1
+    tenant: str = DEFAULT_TENANT
+    runtime_estimate: Optional[float] = None  # Expected run time in seconds
+    command: Optional[List[str]] = None  # Argument vector run by LocalExecutor
+    exit_code: Optional[int] = None
+    depends_on: List[str] = []  # Upstream job IDs that must complete first
+    critical_path: float = 0.0  # Estimated seconds of dependent work gated by this job
+    reservation_id: Optional[str] = None  # Advance reservation the job runs in
     
     class Config:
         use_enum_values = True
 
 
 class JobScheduler:
-    """Manages job scheduling and execution"""
+    """
+    Manages job scheduling and execution.
+    
+    Jobs may depend on earlier jobs. A job with unfinished upstream jobs
+    waits outside the queue as BLOCKED and is queued once all of them have
+    completed; if one fails or is cancelled, every job downstream of it
+    ends as UPSTREAM_FAILED. Within a priority, queued jobs gating the
+    longest chain of dependent work are scheduled first (see
+    DependencyGraph), so independent stages of a pipeline run in parallel
+    while its critical path keeps moving.
+    
+    With a reservation calendar, every placement must leave the capacity
+    of booked reservations free (see ReservationCalendar).
+    """
     
-    def __init__(self):
-        self.job_queue: List[ComputeJob] = []
+    def __init__(
+        self,
+        clock: Callable[[], datetime] = datetime.now,
+        fair_share: Optional[FairShareQueue] = None,
+        backfill: Optional[BackfillPlanner] = None,
+        reservations: Optional[ReservationCalendar] = None
+    ):
+        """
+        Args:
+            clock: Time source, replaceable for virtual-time simulation
+            fair_share: Multi-tenant queue to order jobs by dominant resource
+                fairness instead of priority alone
+            backfill: Planner that reserves capacity for jobs that cannot
+                start yet (default: skip them without reserving anything)
+            reservations: Calendar of advance reservations to honour when
+                placing jobs
+        """
+        self.clock = clock
+        self.fair_share = fair_share
+        self.backfill = backfill
+        self.reservations = reservations
+        self.job_queue: JobQueue = fair_share if fair_share is not None else JobQueue()
         self.running_jobs: Dict[str, ComputeJob] = {}
+        self.blocked_jobs: Dict[str, ComputeJob] = {}  # Waiting on upstream jobs
         self.completed_jobs: Dict[str, ComputeJob] = {}
+        self.dependencies = DependencyGraph()
+        self.submitted_counts: Dict[Optional[str], int] = {}  # pool_type -> jobs submitted
+        self.journal = None  # Set by SchedulerJournal.open
+        self.executor = None  # Set by LocalExecutor.start
+        self.metrics = None  # Set by SchedulerMetrics.attach
+        self.preemption = None  # Set by PreemptionEngine.attach
     
     def submit_job(
         self, 
         name: str, 
         priority: JobPriority = JobPriority.NORMAL,
-        preemptible: bool = False
+        preemptible: bool = False,
+        pool_type: Optional[PoolType] = None,
+        resource_spec: Optional[ResourceSpec] = None,
+        gang_size: int = 1,
+        tenant: str = DEFAULT_TENANT,
+        runtime_estimate: Optional[float] = None,
+        command: Optional[List[str]] = None,
+        depends_on: Optional[List[str]] = None,
+        reservation_id: Optional[str] = None
     ) -> ComputeJob:
         """
         Submit a new job to the queue.
@@ -64,32 +141,70 @@ class JobScheduler:
             name: Job name
             priority: Job priority level
             preemptible: Whether job can be preempted
+            pool_type: Pool to place the job in (needed by schedule_pending)
+            resource_spec: Resources per slot (needed by schedule_pending)
+            gang_size: Number of slots that must be placed together
+            tenant: Team or project the job is charged to
+            runtime_estimate: Expected run time in seconds (used by backfill)
+            command: Program and arguments to run when the job starts
+            depends_on: IDs of jobs that must complete successfully before
+                this one is queued
+            reservation_id: Advance reservation to run in; the job waits
+                for its window and draws from its capacity
             
         Returns:
             Created ComputeJob
+            
+        Raises:
+            DependencyError: If an upstream job ID is unknown
+            ReservationError: If the reservation is unknown or in another pool
         """
-        job_id = f"job_{datetime.now().timestamp()}"
+        if reservation_id is not None:
+            reservation = self.reservations.get(reservation_id) if self.reservations is not None else None
+            if reservation is None:
+                raise ReservationError(f"Unknown reservation {reservation_id}")
+            if pool_type is not None and PoolType(pool_type) != PoolType(reservation.pool_type):
+                raise ReservationError(f"Reservation {reservation_id} is for pool {reservation.pool_type}")
+        upstream = []
+        for upstream_id in depends_on or ():
+            parent = self.get_job(upstream_id)
+            if parent is None:
+                raise DependencyError(f"Unknown upstream job {upstream_id}")
+            upstream.append(parent)
+        created_at = self.clock()
+        job_id = new_id("job_", created_at)
         job = ComputeJob(
             job_id=job_id,
             name=name,
             priority=priority,
             preemptible=preemptible,
-            created_at=datetime.now()
+            created_at=created_at,
+            pool_type=pool_type,
+            resource_spec=resource_spec,
+            gang_size=gang_size,
+            tenant=tenant,
+            runtime_estimate=runtime_estimate,
+            command=command,
+            depends_on=list(depends_on or ()),
+            reservation_id=reservation_id
         )
-        self.job_queue.append(job)
-        self._sort_queue()
+        if any(p.status in UNSUCCESSFUL_STATUSES for p in upstream):
+            job.status = JobStatus.UPSTREAM_FAILED
+            job.completed_at = created_at
+            self.completed_jobs[job_id] = job
+        else:
+            unfinished = [p for p in upstream if p.status != JobStatus.COMPLETED]
+            self._reprioritize(self.dependencies.add(job, unfinished))
+            if unfinished:
+                job.status = JobStatus.BLOCKED
+                self.blocked_jobs[job_id] = job
+            else:
+                job.queued_at = created_at
+                self.job_queue.push(job)
+        self.submitted_counts[job.pool_type] = self.submitted_counts.get(job.pool_type, 0) + 1
+        self._journal(job)
         return job
     
-    def _sort_queue(self):
-        """Sort job queue by priority"""
-        priority_order = {
-            JobPriority.CRITICAL: 0,
-            JobPriority.HIGH: 1,
-            JobPriority.NORMAL: 2,
-            JobPriority.LOW: 3
-        }
-        self.job_queue.sort(key=lambda j: priority_order[j.priority])
-    
     def start_job(self, job_id: str, allocation_id: str) -> bool:
         """
         Start a job with allocated resources.
@@ -101,13 +216,173 @@ class JobScheduler:
         Returns:
             True if job started successfully
         """
-        job = next((j for j in self.job_queue if j.job_id == job_id), None)
+        job = self.job_queue.remove(job_id)
         if job:
+            first_start = job.started_at is None
             job.status = JobStatus.RUNNING
-            job.started_at = datetime.now()
+            job.started_at = self.clock()
             job.allocation_id = allocation_id
-            self.job_queue.remove(job)
             self.running_jobs[job_id] = job
+            if self.fair_share is not None:
+                self.fair_share.job_started(job)
+            if self.reservations is not None:
+                self.reservations.job_started(job)
+            if self.backfill is not None:
+                self.backfill.job_started(job)
+            if self.executor is not None:
+                self.executor.job_started(job)
+            if self.metrics is not None:
+                self.metrics.job_started(job, first_start)
+            self._journal(job)
+            return True
+        return False
+    
+    def schedule_pending(
+        self,
+        resource_manager: ResourceManager,
+        scan_limit: int = 1000,
+        pool_types: Optional[Set[str]] = None
+    ) -> List[ComputeJob]:
+        """
+        Place and start pending jobs in priority order.
+        
+        Gang jobs (gang_size > 1) are placed all-or-nothing. A job that does
+        not fit is left in the queue without holding any capacity and the scan
+        moves on, so a large gang cannot deadlock smaller jobs behind it.
+        With a backfill planner, blocked jobs instead reserve their earliest
+        start and later jobs only run where they do not delay it (see
+        BackfillPlanner). Jobs that would cut into an advance reservation
+        are skipped (see ReservationCalendar). Capacity only shrinks during a pass, so once a
+        request fails to fit, later jobs asking for at least as much of the
+        same kind of resource are skipped without a placement call. With a
+        preemption engine attached, urgent jobs still waiting at the end of
+        the pass may then evict lower-priority ones (see PreemptionEngine).
+        
+        Args:
+            resource_manager: Manager to allocate from
+            scan_limit: Maximum number of queued jobs to consider
+            pool_types: Only place jobs in these pools (e.g. the pools
+                where capacity was just released)
+            
+        Returns:
+            Jobs started in this pass
+        """
+        began = perf_counter() if self.metrics is not None else 0.0
+        started = []
+        failed: Dict[tuple, List[tuple]] = {}  # resource kind -> [(size, reservations applied)]
+        window = self.backfill.begin(self.clock()) if self.backfill is not None else None
+        applied = frozenset()
+        for job in self.job_queue.head(scan_limit):
+            if pool_types is not None and job.pool_type not in pool_types:
+                continue
+            if window is not None:
+                if not window.admits(job):
+                    continue
+                applied = window.applied(job)
+            if self.reservations is not None and not self.reservations.admits(job):
+                continue
+            kind, size = self._shape(job)
+            # Reservations only add up, so a failure under fewer of them
+            # rules out jobs constrained by at least those
+            if any(
+                all(a >= b for a, b in zip(size, f)) and applied >= held
+                for f, held in failed.get(kind, ())
+            ):
+                if window is not None:
+                    window.blocked(job)
+                continue
+            if window is None:
+                placed = self.place_job(job.job_id, resource_manager)
+            else:
+                with window.holding(job):
+                    placed = self.place_job(job.job_id, resource_manager)
+            if placed:
+                started.append(job)
+                if window is not None:
+                    window.started(job)
+            else:
+                failed.setdefault(kind, []).append((size, applied))
+                if window is not None:
+                    window.blocked(job)
+        if self.preemption is not None:
+            started.extend(self.preemption.preempt_waiting(scan_limit, pool_types))
+        if self.metrics is not None:
+            self.metrics.pass_finished(perf_counter() - began)
+        return started
+    
+    @staticmethod
+    def _shape(job: ComputeJob) -> tuple:
+        """Split a job's request into (resource kind, comparable size)"""
+        spec = job.resource_spec
+        if spec is None:
+            return (job.pool_type, None), (0, 0, 0, job.gang_size)
+        return (
+            (job.pool_type, spec.resource_type, spec.accelerator_model),
+            (spec.count, spec.memory_gb or 0, spec.bandwidth_gbps or 0, job.gang_size)
+        )
+    
+    def place_job(self, job_id: str, resource_manager: ResourceManager) -> bool:
+        """
+        Allocate resources for a pending job and start it, unless that
+        would cut into an advance reservation.
+        
+        Args:
+            job_id: ID of a queued job with pool_type and resource_spec set
+            resource_manager: Manager to allocate from
+            
+        Returns:
+            True if the job was placed and started
+        """
+        job = self.job_queue.get(job_id)
+        if job is None or job.resource_spec is None or job.pool_type is None:
+            return False
+        if self.reservations is not None and not self.reservations.admits(job):
+            return False
+        began = perf_counter() if self.metrics is not None else 0.0
+        if job.gang_size > 1:
+            allocations = resource_manager.allocate_gang(
+                job.pool_type, job.resource_spec, job.gang_size, job_id=job.job_id
+            )
+            allocation_id = allocations[0].gang_id if allocations else None
+        else:
+            allocation = resource_manager.allocate_resource(
+                job.pool_type, job.resource_spec, job_id=job.job_id
+            )
+            allocation_id = allocation.allocation_id if allocation else None
+        if self.metrics is not None:
+            self.metrics.allocation_attempted(job.pool_type, perf_counter() - began, bool(allocation_id))
+        return bool(allocation_id) and self.start_job(job.job_id, allocation_id)
+    
+    def get_job(self, job_id: str) -> Optional[ComputeJob]:
+        """Get a pending, running or finished job by ID"""
+        return (
+            self.running_jobs.get(job_id)
+            or self.job_queue.get(job_id)
+            or self.blocked_jobs.get(job_id)
+            or self.completed_jobs.get(job_id)
+        )
+    
+    def next_job(self) -> Optional[ComputeJob]:
+        """Get the highest priority pending job without dequeuing it"""
+        return self.job_queue.peek()
+    
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancel a pending or blocked job; jobs depending on it fail.
+        
+        Args:
+            job_id: ID of job to cancel
+            
+        Returns:
+            True if job was removed from the queue
+        """
+        job = self.job_queue.remove(job_id) or self.blocked_jobs.pop(job_id, None)
+        if job:
+            job.status = JobStatus.CANCELLED
+            job.completed_at = self.clock()
+            self.completed_jobs[job_id] = job
+            self._journal(job)
+            self._resolve_dependents(job, success=False)
             return True
         return False
     
@@ -125,9 +400,19 @@ class JobScheduler:
         if job_id in self.running_jobs:
             job = self.running_jobs[job_id]
             job.status = JobStatus.COMPLETED if success else JobStatus.FAILED
-            job.completed_at = datetime.now()
+            job.completed_at = self.clock()
             del self.running_jobs[job_id]
             self.completed_jobs[job_id] = job
+            if self.fair_share is not None:
+                self.fair_share.job_stopped(job)
+            if self.reservations is not None:
+                self.reservations.job_stopped(job)
+            if self.backfill is not None:
+                self.backfill.job_stopped(job)
+            if self.executor is not None:
+                self.executor.job_stopped(job)
+            self._journal(job)
+            self._resolve_dependents(job, success)
             return True
         return False
     
@@ -141,19 +426,94 @@ class JobScheduler:
         Returns:
             True if job was preempted
         """
-        if job_id in self.running_jobs:
-            job = self.running_jobs[job_id]
-            if job.preemptible:
-                job.status = JobStatus.PREEMPTED
-                del self.running_jobs[job_id]
-                self.job_queue.insert(0, job)  # Re-queue at front
-                return True
+        job = self.running_jobs.get(job_id)
+        if job is not None and job.preemptible:
+            if self.metrics is not None:
+                self.metrics.job_preempted(job)
+            return self.requeue_job(job_id)
+        return False
+    
+    def requeue_job(self, job_id: str) -> bool:
+        """
+        Stop a running job and put it back at the front of the queue,
+        whether or not it is preemptible (e.g. after its node failed).
+        The caller releases its allocation.
+        
+        Args:
+            job_id: ID of job to requeue
+            
+        Returns:
+            True if the job was running
+        """
+        job = self.running_jobs.pop(job_id, None)
+        if job is None:
+            return False
+        job.status = JobStatus.PREEMPTED
+        job.queued_at = self.clock()
+        if self.fair_share is not None:
+            self.fair_share.job_stopped(job)
+        if self.reservations is not None:
+            self.reservations.job_stopped(job)
+        if self.backfill is not None:
+            self.backfill.job_stopped(job)
+        if self.executor is not None:
+            self.executor.job_stopped(job)
+        if self.metrics is not None:
+            self.metrics.job_requeued(job)
+        self.job_queue.push(job, front=True)  # Re-queue at front
+        self._journal(job)
+        return True
+    
+    def record_checkpoint(self, job_id: str) -> bool:
+        """
+        Record that a running job has saved a checkpoint.
+        
+        Args:
+            job_id: ID of the checkpointed job
+            
+        Returns:
+            True if the job is running
+        """
+        job = self.running_jobs.get(job_id)
+        if job:
+            job.last_checkpoint_at = self.clock()
+            self._journal(job)
+            return True
         return False
     
+    def _resolve_dependents(self, job: ComputeJob, success: bool):
+        """Queue dependents that became ready, or fail them transitively"""
+        released, failed, changed = self.dependencies.finished(job.job_id, success)
+        self._reprioritize(changed)
+        now = self.clock()
+        for child in released:
+            if self.blocked_jobs.pop(child.job_id, None) is not None:
+                child.status = JobStatus.PENDING
+                child.queued_at = now
+                self.job_queue.push(child)
+                self._journal(child)
+        for child in failed:
+            self.job_queue.remove(child.job_id)
+            self.blocked_jobs.pop(child.job_id, None)
+            child.status = JobStatus.UPSTREAM_FAILED
+            child.completed_at = now
+            self.completed_jobs[child.job_id] = child
+            self._journal(child)
+    
+    def _reprioritize(self, jobs: List[ComputeJob]):
+        """Re-rank queued jobs whose critical path changed"""
+        for job in jobs:
+            self.job_queue.update(job)
+    
+    def _journal(self, job: ComputeJob):
+        if self.journal is not None:
+            self.journal.record_job(job)
+    
     def get_queue_status(self) -> Dict:
         """Get current queue statistics"""
-        return {
+        status = {
             "pending_jobs": len(self.job_queue),
+            "blocked_jobs": len(self.blocked_jobs),
             "running_jobs": len(self.running_jobs),
             "completed_jobs": len(self.completed_jobs),
             "queue": [
@@ -163,6 +523,15 @@ class JobScheduler:
                     "priority": j.priority,
                     "status": j.status
                 }
-                for j in self.job_queue[:10]  # Show first 10
+                for j in self.job_queue.head(10)  # Show first 10
             ]
         }
+        if self.fair_share is not None:
+            status["tenants"] = self.fair_share.get_status()
+        if self.backfill is not None:
+            status["backfill"] = self.backfill.get_status()
+        if self.reservations is not None:
+            status["reservations"] = self.reservations.get_status()
+        if self.executor is not None:
+            status["executor"] = self.executor.get_status()
+        return status
@@ -0,0 +1,229 @@
+"""
+Scheduling Loop for Compute Factory
+Single-writer actor that owns ResourceManager/JobScheduler state.
+"""
+
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import concurrent.futures
+
+from .resource_manager import ResourceManager, ResourceAllocation, ResourceSpec, PoolType
+from .scheduler import JobScheduler
+
+
+class SchedulerOverloadedError(Exception):
+    """Raised when the scheduling loop's request queue is full"""
+
+
+class SchedulingLoop:
+    """
+    Serializes all scheduler mutations through one asyncio task.
+
+    Callers enqueue commands on a bounded queue and await a future; only the
+    loop task touches ResourceManager and JobScheduler, so no locks are needed
+    around their dicts and arrays. The loop drains whatever has queued up
+    (up to max_batch) in one go: consecutive allocation requests are placed
+    together, largest first, and pending jobs are scheduled once per batch
+    instead of once per request. A full queue rejects new work immediately
+    with SchedulerOverloadedError rather than letting latency grow unbounded.
+
+    A failing command fails only its own future, and a failing scheduling
+    pass is logged; neither stops the loop.
+    """
+
+    def __init__(
+        self,
+        resource_manager: ResourceManager,
+        scheduler: JobScheduler,
+        max_pending: int = 10000,
+        max_batch: int = 512
+    ):
+        """
+        Args:
+            resource_manager: Manager owned by the loop
+            scheduler: Scheduler owned by the loop
+            max_pending: Queue capacity before requests are rejected
+            max_batch: Maximum commands processed per batch
+        """
+        self.resource_manager = resource_manager
+        self.scheduler = scheduler
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.batches = 0
+        self.commands = 0
+        self.rejected = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the loop task on the running event loop"""
+        if self.running:
+            return
+        # Keep a queue that still holds commands: the new task drains it
+        if self._queue is None or self._queue.empty():
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._event_loop = asyncio.get_running_loop()
+        self._task = self._event_loop.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the loop task, failing any queued commands"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Scheduling loop stopped"))
+
+    async def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn on the loop task and return its result.
+
+        Args:
+            fn: Callable that reads or mutates scheduler state
+
+        Returns:
+            fn's return value (its exception is re-raised here)
+        """
+        return await self._enqueue("call", fn)
+
+    def call_threadsafe(self, fn: Callable[[], Any]) -> concurrent.futures.Future:
+        """
+        Run a state change on the loop task from another thread (e.g. a
+        process reaper). Pending jobs are scheduled after the batch, as
+        capacity may have been released.
+
+        Args:
+            fn: Callable that mutates scheduler state
+
+        Returns:
+            Future resolved with fn's return value
+        """
+        if self._event_loop is None:
+            raise RuntimeError("Scheduling loop not started")
+        return asyncio.run_coroutine_threadsafe(self._enqueue("update", fn), self._event_loop)
+
+    async def allocate(
+        self,
+        pool_type: PoolType,
+        resource_spec: ResourceSpec,
+        job_id: Optional[str] = None
+    ) -> Optional[ResourceAllocation]:
+        """
+        Allocate resources through the batched placement pass.
+
+        Returns:
+            ResourceAllocation, or None if no node has capacity
+        """
+        return await self._enqueue("allocate", (pool_type, resource_spec, job_id))
+
+    async def release(self, allocation_id: str) -> bool:
+        """Release an allocation and let queued jobs use the capacity"""
+        return await self._enqueue("release", allocation_id)
+
+    async def submit_job(self, **kwargs) -> Any:
+        """Submit a job (JobScheduler.submit_job arguments); it is placed with the batch"""
+        return await self._enqueue("submit", kwargs)
+
+    def get_status(self) -> dict:
+        """Loop statistics"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_pending": self.max_pending,
+            "batches": self.batches,
+            "commands": self.commands,
+            "rejected": self.rejected,
+            "avg_batch_size": round(self.commands / self.batches, 2) if self.batches else 0.0
+        }
+
+    async def _enqueue(self, kind: str, payload: Any) -> Any:
+        if not self.running:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((kind, payload, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise SchedulerOverloadedError(
+                f"Scheduling queue full ({self.max_pending} pending requests)"
+            )
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                self._process(batch)
+            except Exception as e:
+                print(f"⚠️  Scheduling batch failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.batches += 1
+            self.commands += len(batch)
+            # Let callers resume before the next batch
+            await asyncio.sleep(0)
+
+    def _process(self, batch: List[Tuple[str, Any, asyncio.Future]]):
+        """Execute a batch in arrival order, grouping consecutive allocations"""
+        needs_schedule = False
+        allocations: List[Tuple[Any, asyncio.Future]] = []
+        for kind, payload, future in batch:
+            if kind == "allocate":
+                allocations.append((payload, future))
+                continue
+            if allocations:
+                self._place(allocations)
+                allocations = []
+            if kind == "release":
+                self._resolve(future, self.resource_manager.release_resource, payload)
+                needs_schedule = True
+            elif kind == "submit":
+                self._resolve(future, lambda: self.scheduler.submit_job(**payload))
+                needs_schedule = True
+            elif kind == "update":
+                self._resolve(future, payload)
+                needs_schedule = True
+            else:
+                self._resolve(future, payload)
+        if allocations:
+            self._place(allocations)
+        if needs_schedule:
+            # The batch's commands are done; a failed pass only delays queued jobs
+            try:
+                self.scheduler.schedule_pending(self.resource_manager)
+            except Exception as e:
+                print(f"⚠️  Scheduling pass failed: {e}")
+
+    def _place(self, requests: List[Tuple[Any, asyncio.Future]]):
+        """One placement pass for a group of allocation requests, largest first"""
+        def size(request):
+            _, spec, _ = request[0]
+            try:
+                return float(self.resource_manager.demand_vector(spec).sum())
+            except Exception:
+                return 0.0  # allocate_resource fails this request on its own
+
+        for (pool_type, spec, job_id), future in sorted(requests, key=size, reverse=True):
+            self._resolve(future, self.resource_manager.allocate_resource, pool_type, spec, job_id)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, fn: Callable, *args):
+        if future.done():  # Caller went away
+            return
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
@@ -0,0 +1,482 @@
+"""
+Scheduling Simulator for Compute Factory
+Trace-driven discrete-event replay of the scheduler in virtual time.
+"""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, asdict, fields
+from pydantic import BaseModel
+from datetime import datetime
+import csv
+import heapq
+import json
+import time
+import numpy as np
+
+from .placement import PlacementPolicy, RESOURCE_DIMS, CPU, ACCELERATORS
+from .resource_manager import ResourceManager, ResourceSpec, ResourceType, PoolType, NodeSpec
+from .scheduler import JobScheduler, JobPriority, ComputeJob
+from .preemption import PreemptionEngine
+from .fair_share import FairShareQueue, TenantQuota, DEFAULT_TENANT
+from .backfill import BackfillPlanner, BackfillMode
+
+
+# Virtual time of trace offset 0 (2024-01-01T00:00:00Z)
+SIMULATION_EPOCH = 1704067200.0
+
+WAIT_PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class TraceJob:
+    """One job in a trace; times are seconds from the start of the trace"""
+    arrival: float
+    runtime: float
+    pool_type: str
+    resource_type: str
+    count: int
+    priority: str = JobPriority.NORMAL.value
+    preemptible: bool = False
+    gang_size: int = 1
+    memory_gb: Optional[int] = None
+    accelerator_model: Optional[str] = None
+    name: str = ""
+    tenant: str = DEFAULT_TENANT
+    runtime_estimate: Optional[float] = None
+
+    def resource_spec(self) -> ResourceSpec:
+        return ResourceSpec(
+            resource_type=self.resource_type,
+            count=self.count,
+            memory_gb=self.memory_gb,
+            accelerator_model=self.accelerator_model
+        )
+
+
+def load_trace(path: str) -> List[TraceJob]:
+    """
+    Load a recorded trace from JSON Lines or CSV (chosen by extension).
+
+    Each record has TraceJob's fields; unknown fields are ignored.
+
+    Args:
+        path: Trace file path
+
+    Returns:
+        Jobs sorted by arrival
+    """
+    names = {f.name: f.type for f in fields(TraceJob)}
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            records = list(csv.DictReader(f))
+        else:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    trace = []
+    for record in records:
+        values = {k: v for k, v in record.items() if k in names and v not in ("", None)}
+        for key in ("arrival", "runtime", "runtime_estimate"):
+            if key in values:
+                values[key] = float(values[key])
+        for key in ("count", "gang_size", "memory_gb"):
+            if key in values:
+                values[key] = int(values[key])
+        if isinstance(values.get("preemptible"), str):
+            values["preemptible"] = values["preemptible"].lower() in ("1", "true", "yes")
+        trace.append(TraceJob(**values))
+    trace.sort(key=lambda j: j.arrival)
+    return trace
+
+
+def save_trace(trace: Sequence[TraceJob], path: str):
+    """Write a trace as JSON Lines"""
+    with open(path, "w") as f:
+        for job in trace:
+            f.write(json.dumps(asdict(job)) + "\n")
+
+
+# Synthetic workload classes: jobs/hour, pool, resource, count choices,
+# median runtime (s), runtime spread (lognormal sigma), priority weights,
+# preemptible probability, gang sizes and optionally tenant weights.
+DEFAULT_WORKLOAD = (
+    {
+        "name": "train", "rate": 40.0, "pool_type": "training", "resource_type": "gpu",
+        "counts": (1, 2, 4, 8), "median_runtime": 5400.0, "sigma": 1.0,
+        "priorities": {"low": 0.3, "normal": 0.6, "high": 0.1},
+        "preemptible": 0.8, "gang_sizes": {1: 0.85, 2: 0.1, 4: 0.05}
+    },
+    {
+        "name": "serve", "rate": 120.0, "pool_type": "inference", "resource_type": "gpu",
+        "counts": (1, 1, 2, 4), "median_runtime": 1800.0, "sigma": 0.8,
+        "priorities": {"normal": 0.4, "high": 0.5, "critical": 0.1},
+        "preemptible": 0.2, "gang_sizes": {1: 1.0}
+    },
+    {
+        "name": "env", "rate": 250.0, "pool_type": "environment", "resource_type": "cpu",
+        "counts": (2, 4, 8, 16), "median_runtime": 1800.0, "sigma": 1.0,
+        "priorities": {"low": 0.2, "normal": 0.7, "high": 0.1},
+        "preemptible": 0.5, "gang_sizes": {1: 1.0}
+    },
+)
+
+
+def synthetic_trace(
+    duration: float = 7 * 86400,
+    seed: int = 0,
+    workload: Sequence[Dict] = DEFAULT_WORKLOAD,
+    load: float = 1.0,
+    diurnal_amplitude: float = 0.4,
+    estimate_spread: float = 2.0
+) -> List[TraceJob]:
+    """
+    Generate a trace with diurnal Poisson arrivals and lognormal runtimes.
+
+    Runtime estimates overstate the runtime by a uniform factor between 1
+    and estimate_spread, as user estimates usually do. They are drawn from a
+    separate stream, so the jobs themselves do not depend on the spread.
+
+    Args:
+        duration: Trace length in seconds
+        seed: Random seed
+        workload: Job classes (see DEFAULT_WORKLOAD)
+        load: Multiplier on every class's arrival rate
+        diurnal_amplitude: Relative day/night swing of arrival rates
+        estimate_spread: Largest ratio of runtime estimate to runtime
+
+    Returns:
+        Jobs sorted by arrival
+    """
+    rng = np.random.default_rng(seed)
+    estimate_rng = np.random.default_rng([seed, 1])
+    trace = []
+    for cls in workload:
+        peak = cls["rate"] * load * (1 + diurnal_amplitude) / 3600
+        # Thinning: draw at the peak rate, keep with probability rate(t) / peak
+        n = rng.poisson(peak * duration)
+        arrivals = np.sort(rng.uniform(0, duration, n))
+        rate = 1 + diurnal_amplitude * np.sin(2 * np.pi * arrivals / 86400)
+        arrivals = arrivals[rng.uniform(0, 1 + diurnal_amplitude, n) < rate]
+        m = len(arrivals)
+
+        runtimes = cls["median_runtime"] * rng.lognormal(0.0, cls["sigma"], m)
+        counts = rng.choice(cls["counts"], m)
+        priorities = rng.choice(
+            list(cls["priorities"]), m, p=list(cls["priorities"].values())
+        )
+        preemptible = rng.uniform(0, 1, m) < cls["preemptible"]
+        gangs = rng.choice(list(cls["gang_sizes"]), m, p=list(cls["gang_sizes"].values()))
+        tenant_weights = cls.get("tenants", {DEFAULT_TENANT: 1.0})
+        tenants = rng.choice(list(tenant_weights), m, p=list(tenant_weights.values()))
+        overestimate = estimate_rng.uniform(1.0, max(estimate_spread, 1.0), m)
+        for i in range(m):
+            runtime = float(max(runtimes[i], 1.0))
+            trace.append(TraceJob(
+                arrival=float(arrivals[i]),
+                runtime=runtime,
+                pool_type=cls["pool_type"],
+                resource_type=cls["resource_type"],
+                count=int(counts[i]),
+                priority=str(priorities[i]),
+                preemptible=bool(preemptible[i]),
+                gang_size=int(gangs[i]),
+                name=f"{cls['name']}-{i}",
+                tenant=str(tenants[i]),
+                runtime_estimate=round(runtime * float(overestimate[i]), 1)
+            ))
+    trace.sort(key=lambda j: j.arrival)
+    return trace
+
+
+def default_cluster() -> List[Tuple[PoolType, NodeSpec]]:
+    """64 x 8-GPU training nodes, 32 x 8-GPU inference nodes, 32 x 64-core CPU nodes"""
+    nodes = []
+    for i in range(64):
+        nodes.append((PoolType.TRAINING, NodeSpec(
+            node_id=f"train-{i}", cpu_cores=96, memory_gb=1024,
+            accelerator_type=ResourceType.GPU, accelerator_count=8,
+            bandwidth_gbps=400.0 if i < 32 else 200.0
+        )))
+    for i in range(32):
+        nodes.append((PoolType.INFERENCE, NodeSpec(
+            node_id=f"infer-{i}", cpu_cores=64, memory_gb=512,
+            accelerator_type=ResourceType.GPU, accelerator_count=8
+        )))
+    for i in range(32):
+        nodes.append((PoolType.ENVIRONMENT, NodeSpec(
+            node_id=f"env-{i}", cpu_cores=64, memory_gb=256
+        )))
+    return nodes
+
+
+class VirtualClock:
+    """Settable time source passed to the scheduler, manager and meter"""
+
+    def __init__(self, start: float = SIMULATION_EPOCH):
+        self.now = start
+
+    def __call__(self) -> datetime:
+        return datetime.fromtimestamp(self.now)
+
+
+class SimulationReport(BaseModel):
+    """Results of a simulation run"""
+    simulated_seconds: float
+    wall_seconds: float
+    events: int
+    jobs_submitted: int
+    jobs_completed: int
+    jobs_unfinished: int
+    throughput_per_hour: float
+    utilization: Dict[str, float]
+    wait_seconds: Dict[str, Dict[str, float]]
+    wait_seconds_by_tenant: Dict[str, Dict[str, float]]
+    preemptions: int
+    preemptions_by_priority: Dict[str, int]
+    lost_work_hours: float
+    backfilled_jobs: int
+
+
+class SchedulingSimulator:
+    """
+    Replays a trace through JobScheduler and ResourceManager in virtual time.
+
+    Arrivals and completions are processed as discrete events; all events at
+    the same instant are applied before one scheduling pass (with the
+    PreemptionEngine when preemption is enabled). Jobs run for their trace
+    runtime once started (backfill only sees their runtime estimate); a preempted job is re-queued by the scheduler and
+    restarts from scratch, so its pending completion event is discarded.
+    Nothing sleeps, so a week of activity replays in seconds.
+    """
+
+    def __init__(
+        self,
+        trace: Sequence[TraceJob],
+        nodes: Optional[Sequence[Tuple[PoolType, NodeSpec]]] = None,
+        placement_policy: PlacementPolicy = PlacementPolicy.BEST_FIT,
+        preemption: bool = True,
+        min_preempt_priority: JobPriority = JobPriority.HIGH,
+        scan_limit: int = 1000,
+        quotas: Optional[Dict[str, TenantQuota]] = None,
+        backfill: Optional[BackfillMode] = None
+    ):
+        """
+        Args:
+            trace: Jobs to replay, sorted by arrival
+            nodes: (pool_type, node) pairs making up the cluster
+            placement_policy: Node selection policy under test
+            preemption: Whether urgent jobs may preempt lower-priority ones
+            min_preempt_priority: Lowest priority allowed to trigger preemption
+            scan_limit: Queued jobs considered per scheduling pass
+            quotas: Tenant quotas; when given, jobs are ordered by dominant
+                resource fairness across tenants
+            backfill: Backfill mode using the trace's runtime estimates
+                (default: skip jobs that do not fit without reserving)
+        """
+        self.trace = trace
+        self.scan_limit = scan_limit
+        self.clock = VirtualClock()
+        self.resource_manager = ResourceManager(placement_policy, clock=self.clock)
+        fair_share = (
+            FairShareQueue(self.resource_manager, quotas) if quotas is not None else None
+        )
+        self.backfill = (
+            BackfillPlanner(self.resource_manager, backfill) if backfill is not None else None
+        )
+        self.scheduler = JobScheduler(
+            clock=self.clock, fair_share=fair_share, backfill=self.backfill
+        )
+        self.engine = PreemptionEngine(
+            self.scheduler,
+            self.resource_manager,
+            checkpoint_hook=self._on_preempt,
+            min_priority=min_preempt_priority
+        ) if preemption else None
+        for pool_type, node in (nodes if nodes is not None else default_cluster()):
+            self.resource_manager.add_node(pool_type, node)
+
+        self._runtimes: Dict[str, float] = {}
+        self._attempts: Dict[str, int] = {}
+        self._completions: List[Tuple[float, int, str, int]] = []
+        self._sequence = 0
+        self._waits: Dict[str, List[float]] = {}
+        self._tenant_waits: Dict[str, List[float]] = {}
+        self._preemptions: Dict[str, int] = {}
+        self._lost_work = 0.0
+
+    def run(self, until: Optional[float] = None) -> SimulationReport:
+        """
+        Replay the trace.
+
+        Args:
+            until: Stop after this many simulated seconds (default: run until
+                every job has finished or can never be placed)
+
+        Returns:
+            SimulationReport
+        """
+        wall_start = time.perf_counter()
+        end = SIMULATION_EPOCH + until if until is not None else np.inf
+        arrivals = iter(self.trace)
+        next_job = next(arrivals, None)
+        events = 0
+        completed = 0
+        now = SIMULATION_EPOCH
+
+        while next_job is not None or self._completions:
+            now = min(
+                SIMULATION_EPOCH + next_job.arrival if next_job is not None else np.inf,
+                self._completions[0][0] if self._completions else np.inf
+            )
+            if now > end:
+                break
+            self.clock.now = now
+
+            released = set()
+            while self._completions and self._completions[0][0] <= now:
+                _, _, job_id, attempt = heapq.heappop(self._completions)
+                events += 1
+                pool_type = self._complete(job_id, attempt)
+                if pool_type is not None:
+                    released.add(pool_type)
+                    completed += 1
+            arrived = []
+            while next_job is not None and SIMULATION_EPOCH + next_job.arrival <= now:
+                events += 1
+                job = self.scheduler.submit_job(
+                    name=next_job.name,
+                    priority=next_job.priority,
+                    preemptible=next_job.preemptible,
+                    pool_type=next_job.pool_type,
+                    resource_spec=next_job.resource_spec(),
+                    gang_size=next_job.gang_size,
+                    tenant=next_job.tenant,
+                    runtime_estimate=next_job.runtime_estimate
+                )
+                self._runtimes[job.job_id] = next_job.runtime
+                arrived.append(job)
+                next_job = next(arrivals, None)
+
+            # Queued jobs can only fit where capacity was freed; elsewhere
+            # just the new arrivals have to be tried (with backfill, against
+            # the reservations of a full pass over their pools)
+            if self.backfill is not None:
+                released.update(j.pool_type for j in arrived)
+                arrived = []
+            if released:
+                self._schedule(pool_types=released)
+            if arrived:
+                self._schedule(jobs=[j for j in arrived if j.job_id in self.scheduler.job_queue])
+
+        simulated = self.clock.now - SIMULATION_EPOCH
+        if until is not None and now > end:
+            simulated = until
+        return SimulationReport(
+            simulated_seconds=simulated,
+            wall_seconds=round(time.perf_counter() - wall_start, 3),
+            events=events,
+            jobs_submitted=len(self._runtimes),
+            jobs_completed=completed,
+            jobs_unfinished=len(self._runtimes) - completed,
+            throughput_per_hour=round(completed / simulated * 3600, 2) if simulated > 0 else 0.0,
+            utilization=self._utilization(simulated),
+            wait_seconds=self._wait_stats(self._waits, [p.value for p in JobPriority]),
+            wait_seconds_by_tenant=self._wait_stats(self._tenant_waits, sorted(self._tenant_waits)),
+            preemptions=self.engine.preemption_count if self.engine else 0,
+            preemptions_by_priority=dict(self._preemptions),
+            lost_work_hours=round(self._lost_work / 3600, 2),
+            backfilled_jobs=self.backfill.backfilled if self.backfill else 0
+        )
+
+    def _schedule(
+        self,
+        pool_types: Optional[Set[str]] = None,
+        jobs: Optional[List[ComputeJob]] = None
+    ):
+        """
+        Scheduling pass over the queued jobs of pool_types, or over just
+        `jobs`; queue a completion for every job started.
+        """
+        if jobs is not None:
+            started = [job for job in jobs if self._place(job)]
+        elif self.engine:
+            started = self.engine.schedule(self.scan_limit, pool_types)
+        else:
+            started = self.scheduler.schedule_pending(
+                self.resource_manager, self.scan_limit, pool_types
+            )
+        now = self.clock.now
+        for job in started:
+            attempt = self._attempts.get(job.job_id, 0) + 1
+            self._attempts[job.job_id] = attempt
+            if attempt == 1:
+                wait = (job.started_at - job.created_at).total_seconds()
+                self._waits.setdefault(job.priority, []).append(wait)
+                self._tenant_waits.setdefault(job.tenant, []).append(wait)
+            self._sequence += 1
+            heapq.heappush(
+                self._completions,
+                (now + self._runtimes[job.job_id], self._sequence, job.job_id, attempt)
+            )
+
+    def _place(self, job: ComputeJob) -> bool:
+        if self.engine and self.engine.preempt_for(job.job_id) is not None:
+            return True
+        return self.scheduler.place_job(job.job_id, self.resource_manager)
+
+    def _complete(self, job_id: str, attempt: int) -> Optional[str]:
+        """
+        Finish a job's run unless it was preempted since it started.
+
+        Returns:
+            Pool the job ran in, or None for a stale completion
+        """
+        job = self.scheduler.running_jobs.get(job_id)
+        if job is None or self._attempts.get(job_id) != attempt:
+            return None
+        self.resource_manager.release_resource(job.allocation_id)
+        self.scheduler.complete_job(job_id)
+        return job.pool_type
+
+    def _on_preempt(self, job: ComputeJob):
+        self._preemptions[job.priority] = self._preemptions.get(job.priority, 0) + 1
+        if job.started_at is not None:
+            self._lost_work += (
+                (self.clock.now - job.started_at.timestamp()) * job.gang_size
+            )
+
+    def _utilization(self, simulated: float) -> Dict[str, float]:
+        """Metered unit-seconds over capacity-seconds, per pool"""
+        if simulated <= 0:
+            return {}
+        start = datetime.fromtimestamp(SIMULATION_EPOCH)
+        usage = self.resource_manager.meter.usage_by_key(start, self.clock())
+        result = {}
+        for pool_type, inventory in self.resource_manager.pools.items():
+            stats = inventory.stats()
+            # Accelerator pools are measured in accelerators, CPU pools in cores
+            accelerators = stats[RESOURCE_DIMS[ACCELERATORS]]["total"]
+            capacity = accelerators or stats[RESOURCE_DIMS[CPU]]["total"]
+            if capacity <= 0:
+                continue
+            used = sum(
+                seconds for (pool, rtype), seconds in usage.items()
+                if pool == pool_type.value
+                and (rtype != ResourceType.CPU.value) == bool(accelerators)
+            )
+            result[pool_type.value] = round(used / (capacity * simulated), 4)
+        return result
+
+    @staticmethod
+    def _wait_stats(waits_by: Dict[str, List[float]], keys: List[str]) -> Dict[str, Dict[str, float]]:
+        """Queue-wait percentiles per priority or tenant (first start only)"""
+        result = {}
+        for key in keys:
+            waits = waits_by.get(key)
+            if not waits:
+                continue
+            values = np.array(waits)
+            stats = {"count": float(len(values)), "mean": round(float(values.mean()), 2)}
+            for p, v in zip(WAIT_PERCENTILES, np.percentile(values, WAIT_PERCENTILES)):
+                stats[f"p{p}"] = round(float(v), 2)
+            result[key] = stats
+        return result
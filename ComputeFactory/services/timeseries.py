@@ -0,0 +1,257 @@
+"""
+Time-Series Store for Compute Factory
+Fixed-memory columnar ring buffers with automatic 1s/1m/1h rollups.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import numpy as np
+
+
+# Stored metric fields, in column order
+METRIC_FIELDS = ("cpu_percent", "memory_percent", "gpu_utilization", "gpu_memory_used")
+
+# (bucket width in seconds, number of buckets kept): 1h of 1s, 1d of 1m, 30d of 1h
+DEFAULT_RESOLUTIONS: Tuple[Tuple[int, int], ...] = ((1, 3600), (60, 1440), (3600, 720))
+
+
+class RollupRing:
+    """
+    Ring of fixed-width time buckets holding count/sum/min/max per field.
+
+    Bucket ``b`` (``timestamp // resolution``) lives in slot ``b % size``; a
+    slot is reset when a newer bucket claims it, so memory is fixed at
+    ``size`` buckets and samples older than the ring are dropped.
+    """
+
+    def __init__(self, resolution: int, size: int, num_fields: int = len(METRIC_FIELDS)):
+        self.resolution = resolution
+        self.size = size
+        self.bucket_ids = np.full(size, -1, dtype=np.int64)
+        self.count = np.zeros((size, num_fields), dtype=np.int64)
+        self.sum = np.zeros((size, num_fields))
+        self.min = np.full((size, num_fields), np.inf)
+        self.max = np.full((size, num_fields), -np.inf)
+
+    @property
+    def span_seconds(self) -> int:
+        """Time covered by the ring"""
+        return self.resolution * self.size
+
+    def add(self, timestamp: float, values: np.ndarray, present: np.ndarray):
+        """
+        Fold one sample into its bucket.
+
+        Args:
+            timestamp: Sample time (epoch seconds)
+            values: Field values (NaN where missing)
+            present: Mask of fields that have a value
+        """
+        bucket = int(timestamp // self.resolution)
+        slot = bucket % self.size
+        current = self.bucket_ids[slot]
+        if current != bucket:
+            if current > bucket:
+                return  # Older than the ring's retention
+            self.bucket_ids[slot] = bucket
+            self.count[slot] = 0
+            self.sum[slot] = 0.0
+            self.min[slot] = np.inf
+            self.max[slot] = -np.inf
+        self.count[slot] += present
+        self.sum[slot] += np.where(present, values, 0.0)
+        np.fmin(self.min[slot], values, out=self.min[slot])
+        np.fmax(self.max[slot], values, out=self.max[slot])
+
+    def _mask(self, start: float, end: float) -> np.ndarray:
+        return (
+            (self.bucket_ids >= int(start // self.resolution))
+            & (self.bucket_ids <= int(end // self.resolution))
+        )
+
+    def aggregate(self, start: float, end: float) -> Tuple[np.ndarray, ...]:
+        """
+        Combine all buckets overlapping [start, end].
+
+        Returns:
+            (count, sum, min, max) arrays over fields
+        """
+        mask = self._mask(start, end)
+        return (
+            self.count[mask].sum(axis=0),
+            self.sum[mask].sum(axis=0),
+            self.min[mask].min(axis=0, initial=np.inf),
+            self.max[mask].max(axis=0, initial=-np.inf)
+        )
+
+    def buckets(self, start: float, end: float) -> List[Dict]:
+        """Per-bucket aggregates overlapping [start, end], oldest first"""
+        slots = np.flatnonzero(self._mask(start, end))
+        slots = slots[np.argsort(self.bucket_ids[slots])]
+        result = []
+        for slot in slots:
+            entry = {
+                "timestamp": datetime.fromtimestamp(int(self.bucket_ids[slot]) * self.resolution).isoformat()
+            }
+            for i, name in enumerate(METRIC_FIELDS):
+                count = int(self.count[slot, i])
+                if count:
+                    entry[name] = {
+                        "count": count,
+                        "avg": float(self.sum[slot, i] / count),
+                        "min": float(self.min[slot, i]),
+                        "max": float(self.max[slot, i])
+                    }
+            result.append(entry)
+        return result
+
+
+class MetricSeries:
+    """All rollup rings and lifetime totals for one resource"""
+
+    def __init__(self, resolutions: Sequence[Tuple[int, int]] = DEFAULT_RESOLUTIONS):
+        self.rings = [RollupRing(res, size) for res, size in sorted(resolutions)]
+        self.total_count = np.zeros(len(METRIC_FIELDS), dtype=np.int64)
+        self.total_sum = np.zeros(len(METRIC_FIELDS))
+        self.total_min = np.full(len(METRIC_FIELDS), np.inf)
+        self.total_max = np.full(len(METRIC_FIELDS), -np.inf)
+        self.latest_timestamp: Optional[float] = None
+
+    def add(self, timestamp: float, values: np.ndarray):
+        present = ~np.isnan(values)
+        for ring in self.rings:
+            ring.add(timestamp, values, present)
+        self.total_count += present
+        self.total_sum += np.where(present, values, 0.0)
+        np.fmin(self.total_min, values, out=self.total_min)
+        np.fmax(self.total_max, values, out=self.total_max)
+        if self.latest_timestamp is None or timestamp > self.latest_timestamp:
+            self.latest_timestamp = timestamp
+
+    def ring_for(self, seconds: float, resolution: Optional[int] = None) -> RollupRing:
+        """Finest ring covering `seconds`, or the ring with the given resolution"""
+        if resolution is not None:
+            for ring in self.rings:
+                if ring.resolution == resolution:
+                    return ring
+            raise ValueError(f"Unknown resolution: {resolution}s")
+        for ring in self.rings:
+            if ring.span_seconds >= seconds:
+                return ring
+        return self.rings[-1]
+
+
+class TimeSeriesStore:
+    """
+    Bounded per-resource metric storage.
+
+    Each resource_id gets one MetricSeries, so memory is fixed per resource
+    regardless of uptime, and summaries cost O(buckets) instead of a scan
+    over every sample.
+    """
+
+    def __init__(self, resolutions: Sequence[Tuple[int, int]] = DEFAULT_RESOLUTIONS):
+        self.resolutions = tuple(resolutions)
+        self.series: Dict[str, MetricSeries] = {}
+
+    def record(self, resource_id: str, timestamp: datetime, **values: Optional[float]):
+        """
+        Record one sample.
+
+        Args:
+            resource_id: Resource the sample belongs to
+            timestamp: Sample time
+            values: Field values keyed by METRIC_FIELDS (None for missing)
+        """
+        series = self.series.get(resource_id)
+        if series is None:
+            series = self.series[resource_id] = MetricSeries(self.resolutions)
+        row = np.array(
+            [np.nan if values.get(name) is None else values[name] for name in METRIC_FIELDS],
+            dtype=float
+        )
+        series.add(timestamp.timestamp(), row)
+
+    def summary(
+        self,
+        resource_id: Optional[str] = None,
+        window_seconds: Optional[float] = None
+    ) -> Dict:
+        """
+        Summarize samples for one or all resources.
+
+        Args:
+            resource_id: Resource to summarize, or None for all
+            window_seconds: Only include the trailing window (bucket-aligned);
+                None summarizes every sample ever recorded
+
+        Returns:
+            Dictionary with sample count, averages and extremes per field
+        """
+        if resource_id is not None:
+            series_list = [self.series[resource_id]] if resource_id in self.series else []
+        else:
+            series_list = list(self.series.values())
+        series_list = [s for s in series_list if s.latest_timestamp is not None]
+        if not series_list:
+            return {}
+
+        latest = max(s.latest_timestamp for s in series_list)
+        count = np.zeros(len(METRIC_FIELDS), dtype=np.int64)
+        total = np.zeros(len(METRIC_FIELDS))
+        low = np.full(len(METRIC_FIELDS), np.inf)
+        high = np.full(len(METRIC_FIELDS), -np.inf)
+        samples = 0
+        for series in series_list:
+            if window_seconds is None:
+                count += series.total_count
+                total += series.total_sum
+                samples += int(series.total_count.max())
+                low = np.minimum(low, series.total_min)
+                high = np.maximum(high, series.total_max)
+            else:
+                ring = series.ring_for(window_seconds)
+                c, s, ring_min, ring_max = ring.aggregate(latest - window_seconds, latest)
+                count += c
+                total += s
+                samples += int(c.max())
+                low = np.minimum(low, ring_min)
+                high = np.maximum(high, ring_max)
+
+        result = {
+            "total_samples": samples,
+            "latest_timestamp": datetime.fromtimestamp(latest).isoformat()
+        }
+        for i, name in enumerate(METRIC_FIELDS):
+            if count[i]:
+                result[f"avg_{name}"] = round(float(total[i] / count[i]), 2)
+                result[f"min_{name}"] = round(float(low[i]), 2)
+                result[f"max_{name}"] = round(float(high[i]), 2)
+        return result
+
+    def window(
+        self,
+        resource_id: str,
+        start: datetime,
+        end: datetime,
+        resolution: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Bucketed series for one resource.
+
+        Args:
+            resource_id: Resource to query
+            start: Window start
+            end: Window end
+            resolution: Bucket width in seconds; defaults to the finest
+                resolution whose retention covers the window
+
+        Returns:
+            Per-bucket aggregates, oldest first
+        """
+        series = self.series.get(resource_id)
+        if series is None:
+            return []
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        ring = series.ring_for(end_ts - start_ts, resolution)
+        return ring.buckets(start_ts, end_ts)
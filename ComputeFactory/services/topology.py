@@ -0,0 +1,224 @@
+"""
+CPU Topology for Compute Factory
+Host NUMA/L3 topology from sysfs and locality-aware core selection.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel
+import glob
+import os
+
+
+SYSFS_ROOT = "/sys/devices/system"
+
+
+class NumaNode(BaseModel):
+    """CPUs and memory of one NUMA node"""
+    node: int
+    cpus: List[int]
+    memory_gb: float = 0.0
+    l3_groups: List[List[int]] = []  # CPUs sharing one L3 cache
+
+
+class HostTopology(BaseModel):
+    """NUMA layout of a host"""
+    numa_nodes: List[NumaNode]
+
+    def cpus(self) -> List[int]:
+        """All CPUs of the host"""
+        return sorted(cpu for numa in self.numa_nodes for cpu in numa.cpus)
+
+    @classmethod
+    def uniform(cls, cores: int, numa_nodes: int = 1, l3_per_numa: int = 1) -> "HostTopology":
+        """
+        Evenly split topology, for describing remote or simulated hosts.
+
+        Args:
+            cores: Total cores
+            numa_nodes: NUMA nodes the cores are split across
+            l3_per_numa: L3 cache domains per NUMA node
+        """
+        per_numa = max(1, cores // numa_nodes)
+        per_l3 = max(1, per_numa // l3_per_numa)
+        nodes = []
+        for n in range(numa_nodes):
+            cpus = list(range(n * per_numa, min((n + 1) * per_numa, cores)))
+            groups = [cpus[i:i + per_l3] for i in range(0, len(cpus), per_l3)]
+            nodes.append(NumaNode(node=n, cpus=cpus, l3_groups=groups))
+        return cls(numa_nodes=nodes)
+
+
+def parse_cpulist(text: str) -> List[int]:
+    """Parse a sysfs CPU list such as "0-3,8,10-11" """
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_host_topology(root: str = SYSFS_ROOT, cpus: Optional[List[int]] = None) -> HostTopology:
+    """
+    Read this host's NUMA nodes and L3 cache domains from sysfs.
+
+    NUMA nodes come from node/node*/cpulist and meminfo, L3 domains from the
+    level-3 entry of cpu/cpu*/cache/index*/shared_cpu_list. Without a node
+    directory (no NUMA support) all CPUs form one node; CPUs without cache
+    information form one L3 domain per NUMA node.
+
+    Args:
+        root: sysfs system directory
+        cpus: Restrict to these CPUs (e.g. this process's affinity)
+
+    Returns:
+        HostTopology
+    """
+    online = parse_cpulist(_read(os.path.join(root, "cpu", "online")) or "")
+    if not online:
+        online = list(range(os.cpu_count() or 1))
+    allowed = set(cpus) if cpus is not None else set(online)
+
+    l3_of: Dict[int, Tuple[int, ...]] = {}
+    for cpu in online:
+        for index in sorted(glob.glob(os.path.join(root, "cpu", f"cpu{cpu}", "cache", "index*"))):
+            if (_read(os.path.join(index, "level")) or "").strip() == "3":
+                shared = parse_cpulist(_read(os.path.join(index, "shared_cpu_list")) or "")
+                l3_of[cpu] = tuple(sorted(shared))
+                break
+
+    numa_nodes = []
+    for path in sorted(glob.glob(os.path.join(root, "node", "node[0-9]*"))):
+        node_cpus = parse_cpulist(_read(os.path.join(path, "cpulist")) or "")
+        memory_gb = 0.0
+        for line in (_read(os.path.join(path, "meminfo")) or "").splitlines():
+            if "MemTotal:" in line:
+                memory_gb = int(line.split()[-2]) / 1024**2  # kB
+        numa_nodes.append((int(os.path.basename(path)[4:]), node_cpus, memory_gb))
+    if not numa_nodes:
+        numa_nodes = [(0, online, 0.0)]
+
+    result = []
+    for node, node_cpus, memory_gb in sorted(numa_nodes):
+        node_cpus = [cpu for cpu in node_cpus if cpu in allowed]
+        if not node_cpus:
+            continue
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for cpu in node_cpus:
+            groups.setdefault(l3_of.get(cpu, ()), []).append(cpu)
+        result.append(NumaNode(
+            node=node, cpus=node_cpus, memory_gb=round(memory_gb, 2),
+            l3_groups=sorted(groups.values())
+        ))
+    return HostTopology(numa_nodes=result)
+
+
+class CoreTracker:
+    """
+    Free cores of one host and locality-aware selection among them.
+
+    select() prefers, in order: a single L3 domain (smallest that fits),
+    a single NUMA node (smallest that fits, filling its fullest L3 domains
+    first), and otherwise the fewest NUMA nodes with the most free cores.
+    """
+
+    def __init__(self, topology: HostTopology):
+        self.topology = topology
+        self._numa_of: Dict[int, int] = {}
+        self._l3_of: Dict[int, int] = {}
+        self._l3_numa: List[int] = []  # L3 domain -> NUMA position
+        for position, numa in enumerate(topology.numa_nodes):
+            groups = numa.l3_groups or [numa.cpus]
+            for group in groups:
+                l3 = len(self._l3_numa)
+                self._l3_numa.append(position)
+                for cpu in group:
+                    self._l3_of[cpu] = l3
+            for cpu in numa.cpus:
+                self._numa_of[cpu] = position
+                if cpu not in self._l3_of:  # CPU missing from the L3 groups
+                    self._l3_of[cpu] = len(self._l3_numa)
+                    self._l3_numa.append(position)
+        self.free_by_l3: List[Set[int]] = [set() for _ in self._l3_numa]
+        for cpu in self._numa_of:
+            self.free_by_l3[self._l3_of[cpu]].add(cpu)
+
+    @property
+    def free_count(self) -> int:
+        return sum(len(free) for free in self.free_by_l3)
+
+    def largest_free(self) -> Tuple[int, int]:
+        """(most free cores in one NUMA node, most free cores in one L3 domain)"""
+        numa = [0] * len(self.topology.numa_nodes)
+        l3 = 0
+        for domain, free in enumerate(self.free_by_l3):
+            numa[self._l3_numa[domain]] += len(free)
+            l3 = max(l3, len(free))
+        return max(numa, default=0), l3
+
+    def select(self, count: int) -> Optional[List[int]]:
+        """
+        Choose free cores for an allocation without taking them.
+
+        Args:
+            count: Number of cores
+
+        Returns:
+            Sorted core IDs, or None if fewer are free
+        """
+        if count <= 0:
+            return []
+        if count > self.free_count:
+            return None
+        fitting = [d for d, free in enumerate(self.free_by_l3) if len(free) >= count]
+        if fitting:
+            domain = min(fitting, key=lambda d: (len(self.free_by_l3[d]), d))
+            return sorted(self.free_by_l3[domain])[:count]
+
+        by_numa: Dict[int, List[int]] = {}
+        for domain in range(len(self.free_by_l3)):
+            by_numa.setdefault(self._l3_numa[domain], []).append(domain)
+        numa_free = {n: sum(len(self.free_by_l3[d]) for d in ds) for n, ds in by_numa.items()}
+        fitting = [n for n, free in numa_free.items() if free >= count]
+        if fitting:
+            order = [min(fitting, key=lambda n: (numa_free[n], n))]
+        else:
+            order = sorted(numa_free, key=lambda n: (-numa_free[n], n))
+
+        cores: List[int] = []
+        for numa in order:
+            for domain in sorted(by_numa[numa], key=lambda d: (-len(self.free_by_l3[d]), d)):
+                cores.extend(sorted(self.free_by_l3[domain])[:count - len(cores)])
+                if len(cores) == count:
+                    return sorted(cores)
+        return None
+
+    def take(self, cpus: List[int]):
+        """Mark cores as used"""
+        for cpu in cpus:
+            domain = self._l3_of.get(cpu)
+            if domain is not None:
+                self.free_by_l3[domain].discard(cpu)
+
+    def give(self, cpus: List[int]):
+        """Return cores to the free set"""
+        for cpu in cpus:
+            domain = self._l3_of.get(cpu)
+            if domain is not None:
+                self.free_by_l3[domain].add(cpu)
+
+    def span(self, cpus: List[int]) -> Tuple[int, int]:
+        """(NUMA nodes, L3 domains) a set of cores spans"""
+        return (
+            len({self._numa_of[c] for c in cpus if c in self._numa_of}),
+            len({self._l3_of[c] for c in cpus if c in self._l3_of})
+        )
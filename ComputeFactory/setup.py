@@ -20,6 +20,7 @@ setup(
         "uvicorn[standard]>=0.24.0",
         "pydantic>=2.0.0",
         "sqlalchemy>=2.0.0",
+        "numpy>=1.24.0",
         "prometheus-client>=0.18.0",
         "psutil>=5.9.0"
     ],
@@ -0,0 +1,126 @@
+"""
+Autoscaler tests
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.autoscaler import Autoscaler, ScalingPolicy, SimulatedNodeProvider
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceSpec, ResourceType
+from services.scheduler import JobPriority, JobScheduler
+
+GPU_NODE = NodeSpec(node_id="shape", cpu_cores=8, memory_gb=64, accelerator_type=ResourceType.GPU, accelerator_count=4)
+POOL = PoolType.TRAINING
+
+
+class Cluster:
+    """Scheduler, pools and autoscaler on one virtual clock"""
+
+    def __init__(self, **policy):
+        self.now = 0.0
+        self.resource_manager = ResourceManager()
+        self.scheduler = JobScheduler(clock=lambda: datetime.fromtimestamp(self.now))
+        self.provider = SimulatedNodeProvider({POOL: GPU_NODE}, boot_latency=60.0, clock=lambda: self.now)
+        policy.setdefault("target_wait_seconds", {JobPriority.NORMAL: 1e9})
+        self.autoscaler = Autoscaler(
+            self.scheduler, self.resource_manager, self.provider,
+            {POOL: ScalingPolicy(**policy)}, clock=lambda: self.now
+        )
+
+    def submit(self, gpus: int = 4):
+        return self.scheduler.submit_job(
+            "train", pool_type=POOL, resource_spec=ResourceSpec(resource_type=ResourceType.GPU, count=gpus)
+        )
+
+    def step_at(self, now: float):
+        self.now = now
+        return [(e.action, e.node_count) for e in self.autoscaler.step()]
+
+
+def test_scale_up_waits_for_stabilization_and_counts_booting_nodes():
+    cluster = Cluster(scale_up_stabilization=30.0, scale_up_cooldown=60.0)
+    job = cluster.submit()
+    assert cluster.step_at(0) == []
+    assert cluster.step_at(20) == []  # Shortfall has not persisted yet
+    assert cluster.step_at(30) == [("scale_up", 1)]
+    assert cluster.provider.pending_count(POOL) == 1
+
+    # The booting node covers the demand: no second request while it boots
+    for now in (40, 70, 89):
+        assert cluster.step_at(now) == []
+    assert len(cluster.resource_manager.pools[POOL]) == 0
+
+    assert cluster.step_at(90) == []  # Ready after the boot latency
+    assert len(cluster.resource_manager.pools[POOL]) == 1
+    cluster.scheduler.schedule_pending(cluster.resource_manager)
+    assert job.job_id in cluster.scheduler.running_jobs
+    assert cluster.provider.provisioned == 1
+
+
+def test_transient_shortfall_does_not_scale():
+    cluster = Cluster(scale_up_stabilization=30.0, arrival_smoothing=0.0)
+    job = cluster.submit()
+    assert cluster.step_at(0) == []
+    cluster.scheduler.cancel_job(job.job_id)
+    assert cluster.step_at(20) == []
+    cluster.submit()
+    assert cluster.step_at(40) == []  # The stabilization period restarted
+    assert cluster.step_at(70) == [("scale_up", 1)]
+
+
+def test_scale_down_after_idle_period_and_cooldown():
+    cluster = Cluster(scale_down_idle_seconds=600.0, scale_down_cooldown=300.0, max_step=1)
+    cluster.provider.provision(POOL, 2)
+    cluster.step_at(60)
+    assert len(cluster.resource_manager.pools[POOL]) == 2
+    jobs = [cluster.submit(), cluster.submit()]
+    cluster.scheduler.schedule_pending(cluster.resource_manager)
+    assert cluster.step_at(80) == []  # Busy
+    for job in jobs:
+        cluster.resource_manager.release_resource(job.allocation_id)
+        cluster.scheduler.complete_job(job.job_id)
+
+    assert cluster.step_at(100) == []
+    assert cluster.step_at(699) == []  # Idle for less than 600 s
+    assert cluster.step_at(700) == [("scale_down", 1)]
+    assert cluster.step_at(800) == []  # Cooldown
+    assert cluster.step_at(1000) == [("scale_down", 1)]
+    assert len(cluster.resource_manager.pools[POOL]) == 0
+    assert cluster.provider.terminated == 2
+
+
+def test_wait_counts_from_requeue():
+    cluster = Cluster(scale_up_stabilization=300.0, target_wait_seconds={JobPriority.NORMAL: 10.0})
+    cluster.resource_manager.add_node(POOL, GPU_NODE.model_copy(update={"node_id": "static"}))
+    job = cluster.submit()
+    cluster.scheduler.schedule_pending(cluster.resource_manager)
+    assert cluster.step_at(0) == []
+
+    # The static node fails long after submission and the job is requeued
+    cluster.now = 1000.0
+    cluster.resource_manager.release_resource(job.allocation_id)
+    cluster.resource_manager.remove_node(POOL, "static")
+    cluster.scheduler.requeue_job(job.job_id)
+    assert cluster.step_at(1005) == []  # Waited 5 s, not 1005 s
+    assert cluster.step_at(1011) == [("scale_up", 1)]
+    assert "wait" in cluster.autoscaler.events[-1].reason
+
+
+def test_background_steps_run_through_dispatch():
+    cluster = Cluster()
+    dispatched = threading.Event()
+
+    def dispatch(fn):
+        fn()
+        dispatched.set()
+
+    cluster.autoscaler.dispatch = dispatch
+    cluster.autoscaler.start(interval=0.01)
+    try:
+        assert dispatched.wait(timeout=5)
+    finally:
+        cluster.autoscaler.stop()
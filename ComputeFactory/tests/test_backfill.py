@@ -0,0 +1,42 @@
+"""
+Backfill planner tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.backfill import BackfillMode, BackfillPlanner
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceSpec, ResourceType
+from services.scheduler import JobScheduler
+
+
+def gpus(count: int) -> ResourceSpec:
+    return ResourceSpec(resource_type=ResourceType.GPU, count=count)
+
+
+def make_scheduler():
+    resource_manager = ResourceManager()
+    scheduler = JobScheduler(backfill=BackfillPlanner(resource_manager, BackfillMode.EASY))
+    return resource_manager, scheduler
+
+
+def test_blocked_job_without_expected_releases():
+    """Running jobs without runtime estimates release nothing the planner can reserve"""
+    resource_manager, scheduler = make_scheduler()
+    resource_manager.add_node(PoolType.TRAINING, NodeSpec(
+        node_id="n1", cpu_cores=32, memory_gb=256, accelerator_type=ResourceType.GPU, accelerator_count=4
+    ))
+    running = scheduler.submit_job("running", pool_type=PoolType.TRAINING, resource_spec=gpus(2))
+    assert [job.job_id for job in scheduler.schedule_pending(resource_manager)] == [running.job_id]
+
+    blocked = scheduler.submit_job("blocked", pool_type=PoolType.TRAINING, resource_spec=gpus(4))
+    assert scheduler.schedule_pending(resource_manager) == []
+    assert blocked.job_id not in scheduler.running_jobs
+
+
+def test_blocked_job_in_empty_pool():
+    resource_manager, scheduler = make_scheduler()
+    scheduler.submit_job("blocked", pool_type=PoolType.TRAINING, resource_spec=gpus(1))
+    assert scheduler.schedule_pending(resource_manager) == []
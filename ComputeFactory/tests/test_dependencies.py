@@ -0,0 +1,30 @@
+"""
+Job dependency tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.fair_share import FairShareQueue
+from services.resource_manager import ResourceManager
+from services.scheduler import JobScheduler, JobStatus
+
+
+@pytest.mark.parametrize("fair_share", [False, True])
+def test_cancel_reranks_upstream_job(fair_share):
+    scheduler = JobScheduler(fair_share=FairShareQueue(ResourceManager()) if fair_share else None)
+    first = scheduler.submit_job("first")
+    middle = scheduler.submit_job("middle", depends_on=[first.job_id])
+    last = scheduler.submit_job("last", depends_on=[middle.job_id])
+    gated = first.critical_path
+
+    assert scheduler.cancel_job(middle.job_id)
+    assert last.status == JobStatus.UPSTREAM_FAILED
+    assert first.critical_path < gated
+
+    assert scheduler.job_queue.pop() is first
+    assert scheduler.job_queue.pop() is None
@@ -0,0 +1,60 @@
+"""
+Local executor tests
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.executor import LocalExecutor
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceSpec, ResourceType
+from services.scheduler import JobScheduler, JobStatus
+
+
+def run_one_job(executor: LocalExecutor, scheduler: JobScheduler, resource_manager: ResourceManager):
+    executor.start()
+    try:
+        job = scheduler.submit_job(
+            "job", pool_type=PoolType.INFERENCE,
+            resource_spec=ResourceSpec(resource_type=ResourceType.CPU, count=1),
+            command=[sys.executable, "-c", "pass"]
+        )
+        scheduler.schedule_pending(resource_manager)
+        deadline = time.monotonic() + 10
+        while job.job_id not in scheduler.completed_jobs and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        executor.stop()
+    return job
+
+
+def make_executor(cores):
+    resource_manager = ResourceManager()
+    resource_manager.add_node(PoolType.INFERENCE, NodeSpec(node_id="local", cpu_cores=1, memory_gb=1))
+    scheduler = JobScheduler()
+    executor = LocalExecutor(resource_manager, scheduler, node_id="local", cores=cores, cgroup_root=None)
+    return executor, scheduler, resource_manager
+
+
+def test_failing_preexec_fn_fails_the_job():
+    # Pinning to a core the host does not have fails in the child before exec
+    executor, scheduler, resource_manager = make_executor([4095])
+    job = run_one_job(executor, scheduler, resource_manager)
+    assert job.status == JobStatus.FAILED
+    assert executor.launch_failures == 1
+    assert executor.get_status()["free_cores"] == 1
+
+
+def test_unexpected_launch_error_fails_the_job():
+    executor, scheduler, resource_manager = make_executor([0])
+
+    def broken(*args):
+        raise ValueError("broken cgroup setup")
+
+    executor._create_cgroup = broken
+    job = run_one_job(executor, scheduler, resource_manager)
+    assert job.status == JobStatus.FAILED
+    assert executor.launch_failures == 1
+    assert executor.get_status()["free_cores"] == 1
@@ -0,0 +1,77 @@
+"""
+ID generator tests
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.ids import ENCODED_LENGTH, IdGenerator, id_floor, id_time, new_id
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+COPIES = {
+    factory: os.path.join(ROOT, factory, "services", "ids.py")
+    for factory in ("ComputeFactory", "DataFactory", "RuntimeFactory")
+}
+
+
+def _code(path: str) -> str:
+    """Module source after its docstring, which names the factory"""
+    with open(path) as f:
+        source = f.read()
+    return source[source.index('"""', 3) + 3:]
+
+
+def test_factory_copies_are_identical():
+    assert len({_code(path) for path in COPIES.values()}) == 1
+
+
+def test_ids_are_monotonic_and_sortable_in_every_copy():
+    for factory, path in COPIES.items():
+        spec = importlib.util.spec_from_file_location(f"{factory}_ids", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        ids = [module.new_id("job_") for _ in range(10000)]
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        assert all(len(i) == len("job_") + module.ENCODED_LENGTH for i in ids)
+
+
+def test_explicit_times_sort_by_time():
+    generator = IdGenerator()
+    base = datetime(2026, 10, 1, 12, 0)
+    times = [base + timedelta(milliseconds=ms) for ms in (5, 0, 3, 3, 1000, 2)]
+    ids = [generator.new_id("x_", at) for at in times]
+    assert len(set(ids)) == len(ids)
+    assert [id_time(i) for i in sorted(ids)] == sorted(times)
+    # Same millisecond: creation order
+    assert ids[2] < ids[3]
+
+
+def test_floor_bounds_a_time_range():
+    generator = IdGenerator()
+    base = datetime(2026, 10, 1, 12, 0)
+    before = generator.new_id("x_", base - timedelta(milliseconds=1))
+    at = generator.new_id("x_", base)
+    assert before < id_floor(base, "x_") <= at
+    assert len(id_floor(base)) == ENCODED_LENGTH
+
+
+def test_threads_never_collide():
+    results = []
+
+    def make():
+        results.append([new_id() for _ in range(2000)])
+
+    threads = [threading.Thread(target=make) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [i for batch in results for i in batch]
+    assert len(set(ids)) == len(ids)
+    assert all(batch == sorted(batch) for batch in results)
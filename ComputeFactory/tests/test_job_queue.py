@@ -0,0 +1,67 @@
+"""
+Job queue tests
+"""
+
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.job_queue import JobQueue
+
+
+def job(job_id: str, priority: str = "normal", critical_path: float = 0.0):
+    return SimpleNamespace(job_id=job_id, priority=priority, critical_path=critical_path)
+
+
+def ids(jobs):
+    return [j.job_id for j in jobs]
+
+
+def test_fifo_within_priority():
+    queue = JobQueue()
+    for job_id, priority in [("a", "normal"), ("b", "low"), ("c", "normal"), ("d", "critical"), ("e", "normal")]:
+        queue.push(job(job_id, priority))
+    assert ids(queue.head(10)) == ["d", "a", "c", "e", "b"]
+    assert ids(iter(queue.pop, None)) == ["d", "a", "c", "e", "b"]
+
+
+def test_front_requeue_goes_first_within_its_priority():
+    queue = JobQueue()
+    for job_id in "abc":
+        queue.push(job(job_id))
+    queue.push(job("urgent", "high"))
+    queue.push(job("x"), front=True)
+    queue.push(job("y"), front=True)
+    assert ids(queue.head(10)) == ["urgent", "y", "x", "a", "b", "c"]
+
+
+def test_remove_and_replace():
+    queue = JobQueue()
+    for job_id in "abcd":
+        queue.push(job(job_id))
+    assert queue.remove("b").job_id == "b"
+    assert queue.remove("b") is None
+    assert "b" not in queue and len(queue) == 3
+    queue.push(job("a", "high"))  # Replaces the pending "a"
+    assert len(queue) == 3
+    assert ids(queue.head(10)) == ["a", "c", "d"]
+    assert queue.peek().job_id == "a"
+
+
+def test_head_matches_full_order():
+    rng = random.Random(0)
+    queue = JobQueue()
+    for i in range(2000):
+        queue.push(job(f"j{i}", rng.choice(["critical", "high", "normal", "low"]), rng.choice([0.0, 5.0])),
+                   front=rng.random() < 0.1)
+        if rng.random() < 0.3:
+            queue.remove(f"j{rng.randrange(i + 1)}")
+        if rng.random() < 0.1:
+            queue.update(job(f"j{rng.randrange(i + 1)}", "high", 9.0))
+    order = ids(queue)
+    assert len(order) == len(queue)
+    for n in (0, 1, 10, 500, len(queue) + 5):
+        assert ids(queue.head(n)) == order[:n]
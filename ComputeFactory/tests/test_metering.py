@@ -0,0 +1,33 @@
+"""
+Usage meter tests
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.metering import UsageMeter
+from services.resource_manager import ResourceSpec, ResourceType
+
+
+def test_timezone_aware_period():
+    now = datetime(2026, 10, 16, 12, 0)
+    meter = UsageMeter(clock=lambda: now)
+    meter.record_allocation(SimpleNamespace(
+        allocation_id="a1", job_id="j1", pool_type="training",
+        resource_spec=ResourceSpec(resource_type=ResourceType.GPU, count=2),
+        allocated_at=now - timedelta(hours=2), released_at=None
+    ))
+    start = (now - timedelta(hours=1)).astimezone(timezone.utc)
+    end = (now + timedelta(hours=1)).astimezone(timezone.utc)  # Clamped to now
+
+    assert meter.usage_seconds(start, end) == pytest.approx(7200.0)
+    assert meter.usage_by_key(start, end) == {("training", "gpu"): pytest.approx(7200.0)}
+    assert meter.job_usage("j1", start, end) == {"gpu": pytest.approx(7200.0)}
+    assert meter.top_jobs(start, end) == [("j1", pytest.approx(7200.0))]
+    assert meter.cumulative_by_key(end) == {("training", "gpu"): pytest.approx(14400.0)}
@@ -0,0 +1,88 @@
+"""
+Node registry tests
+"""
+
+import concurrent.futures
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.node_registry import NodeHealth, NodeRegistry
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceType
+from services.scheduler import JobScheduler
+
+
+class FlakyDispatch:
+    """Runs fn directly, failing the first `failures` calls like an overloaded loop"""
+
+    def __init__(self, failures: int, raise_directly: bool):
+        self.failures = failures
+        self.raise_directly = raise_directly
+
+    def __call__(self, fn):
+        future = concurrent.futures.Future()
+        if self.failures:
+            self.failures -= 1
+            if self.raise_directly:
+                raise RuntimeError("Scheduling loop not started")
+            future.set_exception(RuntimeError("Scheduling queue full"))
+            return future
+        future.set_result(fn())
+        return future
+
+
+def make_registry(dispatch):
+    now = [0.0]
+    resource_manager = ResourceManager()
+    resource_manager.add_node(PoolType.TRAINING, NodeSpec(
+        node_id="n1", cpu_cores=32, memory_gb=256,
+        accelerator_type=ResourceType.GPU, accelerator_count=4
+    ))
+    registry = NodeRegistry(resource_manager, JobScheduler(), dispatch=dispatch, clock=lambda: now[0])
+    for _ in range(5):
+        registry.heartbeat("n1")
+        now[0] += 1.0
+    return registry, resource_manager, now
+
+
+def test_failed_failover_is_retried():
+    for raise_directly in (True, False):
+        registry, resource_manager, now = make_registry(FlakyDispatch(1, raise_directly))
+        now[0] += 30.0
+        assert registry.check() == ["n1"]
+        assert "n1" in resource_manager.pools[PoolType.TRAINING]
+        assert registry.get_status()["nodes"]["n1"]["pending"] == "offline"
+
+        registry.check()
+        assert "n1" not in resource_manager.pools[PoolType.TRAINING]
+        assert registry.get_status()["nodes"]["n1"]["pending"] is None
+        assert registry.failovers == 1
+
+
+def test_failed_recovery_is_retried():
+    registry, resource_manager, now = make_registry(FlakyDispatch(0, True))
+    now[0] += 30.0
+    registry.check()
+    assert "n1" not in resource_manager.pools[PoolType.TRAINING]
+
+    registry.dispatch = FlakyDispatch(1, True)
+    assert registry.heartbeat("n1") == NodeHealth.ACTIVE
+    assert "n1" not in resource_manager.pools[PoolType.TRAINING]
+
+    registry.check()
+    assert "n1" in resource_manager.pools[PoolType.TRAINING]
+    assert registry.get_status()["nodes"]["n1"]["pending"] is None
+
+
+def test_heartbeat_cancels_failover_that_never_ran():
+    registry, resource_manager, now = make_registry(FlakyDispatch(1, True))
+    now[0] += 30.0
+    registry.check()
+    registry.dispatch = FlakyDispatch(5, True)  # Nothing may be dispatched any more
+
+    assert registry.heartbeat("n1") == NodeHealth.ACTIVE
+    registry.check()
+    assert "n1" in resource_manager.pools[PoolType.TRAINING]
+    assert registry.get_status()["nodes"]["n1"]["pending"] is None
+    assert registry.dispatch.failures == 5
@@ -0,0 +1,161 @@
+"""
+Preemption engine tests
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.preemption import PreemptionEngine
+from services.reservations import ReservationCalendar
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceSpec, ResourceType
+from services.scheduler import JobPriority, JobScheduler
+
+POOL = PoolType.TRAINING
+
+
+class Cluster:
+    """GPU nodes, a scheduler and a preemption engine on one virtual clock"""
+
+    def __init__(self, nodes: int = 1, reservations: bool = False):
+        self.now = datetime(2026, 1, 1)
+        self.resource_manager = ResourceManager()
+        for i in range(nodes):
+            self.resource_manager.add_node(POOL, NodeSpec(
+                node_id=f"n{i}", cpu_cores=32, memory_gb=256,
+                accelerator_type=ResourceType.GPU, accelerator_count=4
+            ))
+        self.calendar = ReservationCalendar(self.resource_manager, clock=lambda: self.now) if reservations else None
+        self.scheduler = JobScheduler(clock=lambda: self.now, reservations=self.calendar)
+        self.checkpointed = []
+        self.engine = PreemptionEngine(self.scheduler, self.resource_manager, checkpoint_hook=self.checkpointed.append)
+
+    def run(self, gpus: int, priority=JobPriority.LOW, preemptible: bool = True, **kwargs):
+        """Submit a job and start it now"""
+        job = self.submit(gpus, priority, preemptible, **kwargs)
+        assert self.scheduler.place_job(job.job_id, self.resource_manager)
+        return job
+
+    def submit(self, gpus: int, priority=JobPriority.CRITICAL, preemptible: bool = False, **kwargs):
+        return self.scheduler.submit_job(
+            "job", priority=priority, preemptible=preemptible, pool_type=POOL,
+            resource_spec=ResourceSpec(resource_type=ResourceType.GPU, count=gpus), **kwargs
+        )
+
+    def advance(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+def test_fewest_victims_before_least_lost_work():
+    cluster = Cluster(nodes=2)
+    whole = cluster.run(4)  # Fills n0 with one old job
+    cluster.advance(600)
+    halves = [cluster.run(2) for _ in range(2)]  # Fill n1 with two recent ones
+    cluster.advance(60)
+
+    # Two victims would lose less work, but one victim wins
+    victims = cluster.engine.select_victims(cluster.submit(4))
+    assert [v.job.job_id for v in victims] == [whole.job_id]
+    assert victims[0].lost_work == 660.0
+    assert all(job.job_id in cluster.scheduler.running_jobs for job in halves)
+
+
+def test_ties_broken_by_lost_work():
+    cluster = Cluster(nodes=2)
+    older = cluster.run(4)
+    cluster.advance(600)
+    newer = cluster.run(4)
+    cluster.advance(60)
+
+    victims = cluster.engine.select_victims(cluster.submit(4))
+    assert [v.job.job_id for v in victims] == [newer.job_id]
+    assert older.job_id in cluster.scheduler.running_jobs
+
+
+def test_only_lower_priority_preemptible_jobs_are_victims():
+    cluster = Cluster()
+    cluster.run(2, priority=JobPriority.CRITICAL, preemptible=True)
+    cluster.run(2, priority=JobPriority.LOW, preemptible=False)
+    assert cluster.engine.select_victims(cluster.submit(4)) is None
+    assert cluster.engine.preempt_for(cluster.submit(4).job_id) is None
+    assert len(cluster.scheduler.running_jobs) == 2
+
+
+def test_preempt_for_evicts_and_requeues_victims():
+    cluster = Cluster()
+    victim = cluster.run(4)
+    cluster.advance(60)
+    urgent = cluster.submit(4)
+
+    assert cluster.engine.preempt_for(urgent.job_id) == [victim]
+    assert urgent.job_id in cluster.scheduler.running_jobs
+    assert cluster.scheduler.job_queue.get(victim.job_id) is victim
+    assert cluster.checkpointed == [victim]
+    assert cluster.engine.preemption_count == 1
+
+
+def test_no_eviction_when_reservation_blocks_the_job():
+    cluster = Cluster(reservations=True)
+    victim = cluster.run(4, runtime_estimate=1800.0)
+    spec = ResourceSpec(resource_type=ResourceType.GPU, count=4)
+    start = cluster.now + timedelta(hours=1)
+    assert cluster.calendar.reserve(POOL, spec, start, start + timedelta(hours=1)) is not None
+
+    # Without a runtime estimate the urgent job would run into the window
+    urgent = cluster.submit(4)
+    assert cluster.engine.preempt_for(urgent.job_id) is None
+    assert victim.job_id in cluster.scheduler.running_jobs
+    assert cluster.checkpointed == []
+    assert cluster.engine.preemption_count == 0
+
+
+def test_no_eviction_when_victims_do_not_free_enough():
+    class StaleEngine(PreemptionEngine):
+        def select_victims(self, job, now=None):
+            return super().select_victims(job, now)[:1]
+
+    cluster = Cluster()
+    first = cluster.run(2)
+    second = cluster.run(2)
+    engine = StaleEngine(cluster.scheduler, cluster.resource_manager)
+    assert engine.preempt_for(cluster.submit(4).job_id) is None
+    assert first.job_id in cluster.scheduler.running_jobs
+    assert second.job_id in cluster.scheduler.running_jobs
+    assert engine.preemption_count == 0
+
+
+def test_gang_evicts_the_cheapest_nodes():
+    cluster = Cluster(nodes=3)
+    jobs = []
+    for _ in range(3):
+        jobs.append(cluster.run(4))
+        cluster.advance(300)
+
+    gang = cluster.submit(4, gang_size=2)
+    assert cluster.engine.preempt_for(gang.job_id) == [jobs[2], jobs[1]]
+    assert gang.job_id in cluster.scheduler.running_jobs
+    assert jobs[0].job_id in cluster.scheduler.running_jobs
+
+    # A gang bigger than the pool evicts nothing
+    running = set(cluster.scheduler.running_jobs)
+    assert cluster.engine.preempt_for(cluster.submit(4, gang_size=4).job_id) is None
+    assert set(cluster.scheduler.running_jobs) == running
+
+
+def test_attached_engine_preempts_during_scheduling_pass():
+    cluster = Cluster()
+    victim = cluster.run(4)
+    cluster.advance(60)
+    normal = cluster.submit(4, priority=JobPriority.NORMAL)
+    urgent = cluster.submit(4, priority=JobPriority.HIGH)
+
+    cluster.engine.attach()
+    assert cluster.scheduler.schedule_pending(cluster.resource_manager) == [urgent]
+    assert urgent.job_id in cluster.scheduler.running_jobs
+    assert cluster.scheduler.job_queue.get(victim.job_id) is victim
+    assert cluster.scheduler.job_queue.get(normal.job_id) is normal  # Not urgent enough to preempt
+
+    cluster.engine.detach()
+    assert cluster.scheduler.preemption is None
@@ -0,0 +1,38 @@
+"""
+Reservation calendar tests
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.reservations import ReservationCalendar
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceSpec, ResourceType
+
+
+def make_calendar():
+    resource_manager = ResourceManager()
+    resource_manager.add_node(PoolType.TRAINING, NodeSpec(
+        node_id="n1", cpu_cores=32, memory_gb=256,
+        accelerator_type=ResourceType.GPU, accelerator_count=4
+    ))
+    return ReservationCalendar(resource_manager)
+
+
+def test_timezone_aware_window():
+    calendar = make_calendar()
+    spec = ResourceSpec(resource_type=ResourceType.GPU, count=4)
+    start = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    reservation = calendar.reserve(PoolType.TRAINING, spec, start, start + timedelta(hours=2))
+    assert reservation is not None
+    assert reservation.start.tzinfo is None
+    assert abs(reservation.start.timestamp() - start.timestamp()) < 1e-6
+
+    # The window is taken, so the next one starts when it ends
+    assert calendar.reserve(PoolType.TRAINING, spec, start, start + timedelta(hours=1)) is None
+    earliest = calendar.earliest_start(PoolType.TRAINING, spec, 3600.0, not_before=start)
+    assert earliest.tzinfo is None
+    assert abs(earliest.timestamp() - (start + timedelta(hours=2)).timestamp()) < 1e-6
@@ -0,0 +1,59 @@
+"""
+Resource manager tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.resource_manager import NodeSpec, PoolType, ResourceManager, ResourceSpec, ResourceType
+from services.topology import HostTopology, NumaNode
+
+
+def gpu_node(accelerators: int = 4) -> NodeSpec:
+    return NodeSpec(
+        node_id="n1", cpu_cores=32, memory_gb=256,
+        accelerator_type=ResourceType.GPU, accelerator_count=accelerators
+    )
+
+
+def cpu_node(cpus: int = 8) -> NodeSpec:
+    topology = HostTopology(numa_nodes=[NumaNode(node=0, cpus=list(range(cpus)))])
+    return NodeSpec(node_id="c1", cpu_cores=cpus, memory_gb=64, topology=topology)
+
+
+def test_reregistration_keeps_live_allocations():
+    resource_manager = ResourceManager()
+    resource_manager.add_node(PoolType.TRAINING, gpu_node())
+    spec = ResourceSpec(resource_type=ResourceType.GPU, count=4)
+    first = resource_manager.allocate_resource(PoolType.TRAINING, spec)
+    assert first is not None
+
+    resource_manager.add_node(PoolType.TRAINING, gpu_node())
+    assert resource_manager.allocate_resource(PoolType.TRAINING, spec) is None
+
+    resource_manager.release_resource(first.allocation_id)
+    assert resource_manager.allocate_resource(PoolType.TRAINING, spec) is not None
+
+
+def test_reregistration_keeps_pinned_cores():
+    resource_manager = ResourceManager()
+    resource_manager.add_node(PoolType.ENVIRONMENT, cpu_node())
+    spec = ResourceSpec(resource_type=ResourceType.CPU, count=4)
+    first = resource_manager.allocate_resource(PoolType.ENVIRONMENT, spec)
+
+    resource_manager.add_node(PoolType.ENVIRONMENT, cpu_node())
+    second = resource_manager.allocate_resource(PoolType.ENVIRONMENT, spec)
+    assert not set(first.cpu_ids) & set(second.cpu_ids)
+
+
+def test_reregistration_rejects_topology_without_pinned_cores():
+    resource_manager = ResourceManager()
+    resource_manager.add_node(PoolType.ENVIRONMENT, cpu_node(8))
+    spec = ResourceSpec(resource_type=ResourceType.CPU, count=8)
+    assert resource_manager.allocate_resource(PoolType.ENVIRONMENT, spec).cpu_ids
+    with pytest.raises(ValueError):
+        resource_manager.add_node(PoolType.ENVIRONMENT, cpu_node(4))
@@ -0,0 +1,62 @@
+"""
+Scheduling loop tests
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.resource_manager import ResourceManager
+from services.scheduler import JobScheduler
+from services.scheduling_loop import SchedulingLoop
+
+
+def test_failing_scheduling_pass_keeps_loop_running():
+    scheduler = JobScheduler()
+    loop = SchedulingLoop(ResourceManager(), scheduler)
+
+    def broken_pass(resource_manager):
+        raise RuntimeError("broken pass")
+
+    scheduler.schedule_pending = broken_pass
+
+    async def main():
+        job = await loop.submit_job(name="first")
+        assert loop.running
+        assert await loop.call(lambda: job.job_id) == job.job_id
+        await loop.stop()
+
+    asyncio.run(main())
+
+
+def test_failing_command_fails_only_its_future():
+    loop = SchedulingLoop(ResourceManager(), JobScheduler())
+
+    def fail():
+        raise ValueError("bad command")
+
+    async def main():
+        results = await asyncio.gather(loop.call(fail), loop.call(lambda: 42), return_exceptions=True)
+        assert isinstance(results[0], ValueError) and results[1] == 42
+        assert loop.running
+        await loop.stop()
+
+    asyncio.run(main())
+
+
+def test_restart_keeps_queued_commands():
+    loop = SchedulingLoop(ResourceManager(), JobScheduler())
+
+    async def main():
+        loop.start()
+        loop._task.cancel()  # Loop task died with a command still queued
+        await asyncio.sleep(0)
+        future = asyncio.get_running_loop().create_future()
+        loop._queue.put_nowait(("call", lambda: "queued", future))
+        assert await loop.call(lambda: "next") == "next"
+        assert await future == "queued"
+        await loop.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+DataCleaner redaction benchmark
+Measures PII + custom-rule redaction throughput (MB/s) on synthetic agent transcripts.
+
+Usage:
+    python DataFactory/benchmarks/bench_cleaner.py [--transcripts 2000] [--rules 3] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.cleaner import CleaningRule, DataCleaner
+
+
+# Secrets agents tend to echo back from tool output
+CUSTOM_RULES = [
+    ("api_key", r"\bsk-[A-Za-z0-9]{32,}\b", "[API_KEY]"),
+    ("aws_key", r"\bAKIA[0-9A-Z]{16}\b", "[AWS_KEY]"),
+    ("bearer", r"(?i)\bbearer\s+[A-Za-z0-9._~+/-]+=*", "Bearer [TOKEN]"),
+    ("password", r"(?i)\b(password|passwd|pwd)\s*[:=]\s*\S+", r"\1=[REDACTED]"),
+    ("jwt", r"\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+", "[JWT]"),
+]
+
+WORDS = (
+    "the agent should check whether file config yaml returns error while running tests "
+    "please update function handler request response timeout retry deploy service cluster "
+    "I will now look at logs output build failed because missing dependency install version"
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20))).capitalize() + "."
+
+
+def pii(rng: random.Random) -> str:
+    kind = rng.randrange(8)
+    if kind == 0:
+        return f"user{rng.randint(1, 999)}@example.com"
+    if kind == 1:
+        return f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+    if kind == 2:
+        return f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}"
+    if kind == 3:
+        return " ".join(str(rng.randint(1000, 9999)) for _ in range(4))
+    if kind == 4:
+        return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+    if kind == 5:
+        return "sk-" + "".join(rng.choice("abcdefghijklmnopqrstuvwxyzABCDEF0123456789") for _ in range(40))
+    if kind == 6:
+        return "Authorization: Bearer " + "".join(rng.choice("abcdef0123456789") for _ in range(32))
+    return f"password={rng.randint(10**7, 10**8)}"
+
+
+def tool_output(rng: random.Random) -> str:
+    lines = [f"$ pytest -q tests/test_{rng.choice(WORDS)}.py"]
+    for i in range(rng.randint(3, 15)):
+        lines.append(f"  File \"/srv/app/{rng.choice(WORDS)}.py\", line {rng.randint(1, 900)}, in {rng.choice(WORDS)}")
+    lines.append(f'{{"status": {rng.choice([200, 404, 500])}, "elapsed_ms": {rng.random() * 100:.3f}}}')
+    return "\n".join(lines)
+
+
+def transcript(rng: random.Random) -> str:
+    """A multi-turn exchange with prose, tool output and occasional PII/secrets"""
+    turns = []
+    for _ in range(rng.randint(4, 16)):
+        role = rng.choice(["User", "Assistant", "Tool"])
+        if role == "Tool":
+            body = tool_output(rng)
+        else:
+            body = " ".join(sentence(rng) for _ in range(rng.randint(1, 5)))
+        if rng.random() < 0.3:
+            body += f" {pii(rng)} {sentence(rng)}"
+        turns.append(f"{role}: {body}")
+    return "\n\n".join(turns)
+
+
+def sequential(cleaner: DataCleaner, text: str) -> str:
+    """The previous implementation: one re.sub pass per pattern, patterns as strings"""
+    for pii_type, pattern in cleaner.pii_patterns.items():
+        text = re.sub(pattern, f"[{pii_type.upper()}]", text)
+    for rule in cleaner.custom_rules:
+        if rule.enabled:
+            text = re.sub(rule.pattern, rule.replacement, text)
+    return text
+
+
+def measure(label: str, clean, texts, megabytes: float, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            clean(text)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<36} {megabytes / best:>8.2f} MB/s  ({best * 1e6 / len(texts):.1f} µs/transcript)")
+    return best
+
+
+def run(num_transcripts: int, num_rules: int, seed: int):
+    rng = random.Random(seed)
+    texts = [transcript(rng) for _ in range(num_transcripts)]
+    megabytes = sum(len(t.encode()) for t in texts) / 1e6
+
+    cleaner = DataCleaner()
+    for rule_id, pattern, replacement in CUSTOM_RULES[:num_rules]:
+        cleaner.add_custom_rule(CleaningRule(rule_id=rule_id, name=rule_id, pattern=pattern, replacement=replacement))
+
+    print("=" * 72)
+    print(f"DataCleaner redaction: {num_transcripts:,} transcripts, {megabytes:.1f} MB, "
+          f"{len(cleaner.pii_patterns)} PII patterns + {num_rules} custom rules")
+    print("=" * 72)
+
+    scanner = cleaner.scanner()
+    before = measure("sequential re.sub passes", lambda t: sequential(cleaner, t), texts, megabytes)
+    after = measure("single-pass scanner", scanner.sub, texts, megabytes)
+    print(f"  speedup {before / after:.2f}x")
+
+    redactions = sum(scanner.subn(t)[1] for t in texts)
+    differing = sum(1 for t in texts if scanner.sub(t) != sequential(cleaner, t))
+    print(f"\n  redactions={redactions:,} transcripts differing from sequential={differing:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", type=int, default=2000)
+    parser.add_argument("--rules", type=int, default=3, choices=range(len(CUSTOM_RULES) + 1))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.transcripts, args.rules, args.seed)
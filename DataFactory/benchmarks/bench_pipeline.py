@@ -0,0 +1,87 @@
+"""
+CleaningPipeline benchmark
+Measures streaming cleaning throughput over synthetic agent transcripts by worker count.
+
+Usage:
+    python DataFactory/benchmarks/bench_pipeline.py [--events 20000] [--workers 0,1,2,4] [--chunk-size 256]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_cleaner import CUSTOM_RULES, transcript
+from services.cleaner import CleaningRule, DataCleaner
+from services.cleaning_pipeline import CleaningPipeline
+from services.collector import DataEvent, EventType
+
+
+def make_events(count: int, seed: int):
+    rng = random.Random(seed)
+    now = datetime.now()
+    events = []
+    for i in range(count):
+        text = transcript(rng)
+        split = rng.randrange(len(text))
+        events.append(DataEvent(
+            event_id=f"evt_{i}",
+            event_type=EventType.INTERACTION,
+            timestamp=now,
+            agent_id=f"agent_{i % 20}",
+            prompt=text[:split] if rng.random() > 0.05 else "ok",  # Some garbage
+            response=text[split:]
+        ))
+    return events
+
+
+def run(num_events: int, worker_counts, chunk_size: int, seed: int):
+    cleaner = DataCleaner()
+    for rule_id, pattern, replacement in CUSTOM_RULES[:3]:
+        cleaner.add_custom_rule(CleaningRule(rule_id=rule_id, name=rule_id, pattern=pattern, replacement=replacement))
+    # Built up front so that only the pipeline is timed, not generating its input
+    events = make_events(num_events, seed)
+    megabytes = sum(len((e.prompt + e.response).encode()) for e in events) / 1e6
+
+    print("=" * 72)
+    print(f"CleaningPipeline: {num_events:,} events, {megabytes:.1f} MB, {os.cpu_count()} CPUs, "
+          f"chunks of {chunk_size}")
+    print("=" * 72)
+
+    baseline = None
+    reference = None
+    for workers in worker_counts:
+        pipeline = CleaningPipeline(cleaner, workers=workers, chunk_size=chunk_size)
+        start = time.perf_counter()
+        checksum = 0
+        for event in pipeline.run(iter(events)):
+            checksum = hash((checksum, event.event_id, event.prompt, event.response))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        label = "calling thread" if workers == 0 else f"{workers} worker{'s' * (workers > 1)}"
+        print(f"  {label:<16} {num_events / elapsed:>10,.0f} events/s {megabytes / elapsed:>8.2f} MB/s"
+              f"  ({baseline / elapsed:.2f}x)")
+        if reference is None:
+            reference = checksum
+        elif checksum != reference:
+            print("  !! output differs from the first run")
+
+    stats = pipeline.stats
+    print(f"\n  in={stats.events_in:,} filtered={stats.filtered:,} redacted={stats.redacted:,} "
+          f"redactions={stats.redactions:,} out={stats.events_out:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--workers", default=",".join(
+        str(n) for n in sorted({0, 1, 2, 4, os.cpu_count() or 1})
+    ))
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.events, [int(n) for n in args.workers.split(",")], args.chunk_size, args.seed)
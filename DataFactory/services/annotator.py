@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
+from .ids import new_id
 
 
 class AnnotationType(str, Enum):
@@ -58,7 +59,7 @@ class DataAnnotator:
         Returns:
             Created Annotation
         """
-        annotation_id = f"anno_{datetime.now().timestamp()}"
+        annotation_id = new_id("anno_")
         annotation = Annotation(
             annotation_id=annotation_id,
             event_id=event_id,
@@ -94,7 +95,7 @@ class DataAnnotator:
         Returns:
             Created Annotation
         """
-        annotation_id = f"anno_{datetime.now().timestamp()}"
+        annotation_id = new_id("anno_")
         annotation = Annotation(
             annotation_id=annotation_id,
             event_id=f"{response_a_id}_{response_b_id}",
@@ -137,7 +138,7 @@ class DataAnnotator:
         # Mock LLM scoring - in real implementation, call actual LLM API
         mock_score = 0.75  # Score between 0-1
         
-        annotation_id = f"anno_{datetime.now().timestamp()}"
+        annotation_id = new_id("anno_")
         annotation = Annotation(
             annotation_id=annotation_id,
             event_id=event_id,
@@ -184,7 +185,7 @@ class DataAnnotator:
             "reasoning": "Mock LLM judgment reasoning"
         }
         
-        annotation_id = f"anno_{datetime.now().timestamp()}"
+        annotation_id = new_id("anno_")
         annotation = Annotation(
             annotation_id=annotation_id,
             event_id=event_id,
@@ -3,10 +3,12 @@ Data Cleaner for Data Factory
 Handles PII removal, garbage filtering, and anomaly detection.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pydantic import BaseModel
 import re
 
+from .redaction import RedactionScanner
+
 
 class CleaningRule(BaseModel):
     """Data cleaning rule definition"""
@@ -18,7 +20,15 @@ class CleaningRule(BaseModel):
 
 
 class DataCleaner:
-    """Cleans and preprocesses data"""
+    """
+    Cleans and preprocesses data.
+    
+    PII patterns and enabled custom rules are compiled into RedactionScanners
+    that redact in one pass, PII patterns first (in definition order) and
+    then custom rules (in the order they were added). Scanners are rebuilt
+    only when pii_patterns or a rule's pattern, replacement or enabled flag
+    changes.
+    """
     
     def __init__(self):
         # Default PII detection patterns
@@ -30,6 +40,8 @@ class DataCleaner:
             "ip_address": r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b'
         }
         self.custom_rules: List[CleaningRule] = []
+        # (include PII, include custom rules) -> (rules it was built from, scanner)
+        self._scanners: Dict[Tuple[bool, bool], Tuple[list, RedactionScanner]] = {}
     
     def remove_pii(self, text: str) -> str:
         """
@@ -41,10 +53,7 @@ class DataCleaner:
         Returns:
             Sanitized text
         """
-        cleaned = text
-        for pii_type, pattern in self.pii_patterns.items():
-            cleaned = re.sub(pattern, f"[{pii_type.upper()}]", cleaned)
-        return cleaned
+        return self.scanner(pii=True, custom=False).sub(text)
     
     def filter_garbage(self, text: str, min_length: int = 10) -> bool:
         """
@@ -120,7 +129,13 @@ class DataCleaner:
         return clusters
     
     def add_custom_rule(self, rule: CleaningRule):
-        """Add a custom cleaning rule"""
+        """
+        Add a custom cleaning rule.
+        
+        Raises:
+            re.error: If the rule's pattern does not compile
+        """
+        re.compile(rule.pattern)
         self.custom_rules.append(rule)
     
     def apply_custom_rules(self, text: str) -> str:
@@ -133,11 +148,7 @@ class DataCleaner:
         Returns:
             Cleaned text
         """
-        cleaned = text
-        for rule in self.custom_rules:
-            if rule.enabled:
-                cleaned = re.sub(rule.pattern, rule.replacement, cleaned)
-        return cleaned
+        return self.scanner(pii=False, custom=True).sub(text)
     
     def clean_text(self, text: str, remove_pii: bool = True) -> Optional[str]:
         """
@@ -154,12 +165,26 @@ class DataCleaner:
         if self.filter_garbage(text):
             return None
         
-        # Remove PII
-        cleaned = text
-        if remove_pii:
-            cleaned = self.remove_pii(cleaned)
-        
-        # Apply custom rules
-        cleaned = self.apply_custom_rules(cleaned)
+        # Remove PII and apply custom rules in one pass
+        return self.scanner(pii=remove_pii, custom=True).sub(text)
+    
+    def scanner(self, pii: bool = True, custom: bool = True) -> RedactionScanner:
+        """
+        Scanner for the current PII patterns and/or enabled custom rules.
         
-        return cleaned
+        Args:
+            pii: Include PII patterns
+            custom: Include enabled custom rules
+            
+        Returns:
+            Cached RedactionScanner, rebuilt if the rules changed
+        """
+        rules = []
+        if pii:
+            rules.extend((pattern, f"[{pii_type.upper()}]") for pii_type, pattern in self.pii_patterns.items())
+        if custom:
+            rules.extend((rule.pattern, rule.replacement) for rule in self.custom_rules if rule.enabled)
+        cached = self._scanners.get((pii, custom))
+        if cached is None or cached[0] != rules:
+            cached = self._scanners[(pii, custom)] = (rules, RedactionScanner(rules))
+        return cached[1]
@@ -0,0 +1,179 @@
+"""
+Cleaning Pipeline for Data Factory
+Streams events through DataCleaner on a process pool, in order and with bounded memory.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pydantic import BaseModel
+import os
+
+from .cleaner import CleaningRule, DataCleaner
+
+
+# Text fields of a DataEvent that are filtered and redacted
+TEXT_FIELDS = ("prompt", "response")
+
+# Cleaner of the current worker process, built by _init_worker
+_worker_cleaner: Optional[DataCleaner] = None
+
+
+class PipelineStats(BaseModel):
+    """Per-stage counters, updated as cleaned events are yielded"""
+    events_in: int = 0
+    filtered: int = 0  # Dropped as garbage
+    redacted: int = 0  # Kept events with at least one redaction
+    redactions: int = 0  # Replacements across all kept events
+    events_out: int = 0
+
+
+def _init_worker(pii_patterns: Dict[str, str], rules: List[Dict]):
+    global _worker_cleaner
+    _worker_cleaner = DataCleaner()
+    _worker_cleaner.pii_patterns = pii_patterns
+    for rule in rules:
+        _worker_cleaner.add_custom_rule(CleaningRule(**rule))
+
+
+def _clean_chunk(
+    texts: List[Tuple[Optional[str], ...]],
+    remove_pii: bool,
+    min_length: int,
+    cleaner: Optional[DataCleaner] = None
+) -> List[Optional[Tuple[Tuple[Optional[str], ...], int]]]:
+    """
+    Clean the text fields of a chunk of events.
+
+    Returns:
+        Per event: None if filtered out, else (cleaned fields, redactions)
+    """
+    cleaner = cleaner or _worker_cleaner
+    scanner = cleaner.scanner(pii=remove_pii, custom=True)
+    results = []
+    for fields in texts:
+        if any(text is not None and cleaner.filter_garbage(text, min_length) for text in fields):
+            results.append(None)
+            continue
+        cleaned, count = [], 0
+        for text in fields:
+            if text is not None:
+                text, n = scanner.subn(text)
+                count += n
+            cleaned.append(text)
+        results.append((tuple(cleaned), count))
+    return results
+
+
+class CleaningPipeline:
+    """
+    Cleans a stream of DataEvents on a pool of worker processes.
+
+    Events are read from the input iterator lazily and sent to the workers
+    in chunks of `chunk_size`, as their prompt and response texts only;
+    each worker filters garbage and redacts PII and custom rules with its
+    own copy of the cleaner's rules, taken when run() starts. At most
+    `max_in_flight` chunks are read ahead of the consumer, which bounds
+    memory however long the input is, and cleaned events are yielded in
+    input order (events filtered as garbage are left out). Events without
+    text pass through unchanged.
+
+    Workers share nothing, so throughput scales with cores until reading
+    the input or rebuilding events in the calling process saturates it.
+    """
+
+    def __init__(
+        self,
+        cleaner: DataCleaner,
+        workers: Optional[int] = None,
+        chunk_size: int = 256,
+        max_in_flight: Optional[int] = None,
+        remove_pii: bool = True,
+        min_length: int = 10
+    ):
+        """
+        Args:
+            cleaner: Cleaner whose PII patterns and custom rules to apply
+            workers: Worker processes (default: one per CPU; 0 cleans on
+                the calling thread)
+            chunk_size: Events per task sent to a worker
+            max_in_flight: Chunks read ahead of the consumer (default:
+                twice the number of workers)
+            remove_pii: Redact PII patterns (custom rules always apply)
+            min_length: Shortest text kept by the garbage filter
+        """
+        self.cleaner = cleaner
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or 2 * max(self.workers, 1)
+        self.remove_pii = remove_pii
+        self.min_length = min_length
+        self.stats = PipelineStats()
+
+    def run(self, events: Iterable[Any]) -> Iterator[Any]:
+        """
+        Clean events, yielding them in input order.
+
+        Args:
+            events: DataEvents (any iterable, e.g. DataCollector.iter_events())
+
+        Yields:
+            Cleaned copies of the events that were not filtered out
+        """
+        self.stats = PipelineStats()
+        chunks = self._chunks(events)
+        if self.workers == 0:
+            for chunk in chunks:
+                texts = [self._texts(event) for event in chunk]
+                results = _clean_chunk(texts, self.remove_pii, self.min_length, self.cleaner)
+                yield from self._rebuild(chunk, results)
+            return
+
+        rules = [rule.model_dump() for rule in self.cleaner.custom_rules]
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(dict(self.cleaner.pii_patterns), rules)
+        )
+        in_flight: deque = deque()  # (chunk, future), oldest first
+        try:
+            for chunk in chunks:
+                if len(in_flight) >= self.max_in_flight:
+                    done, future = in_flight.popleft()
+                    yield from self._rebuild(done, future.result())
+                texts = [self._texts(event) for event in chunk]
+                in_flight.append((chunk, pool.submit(_clean_chunk, texts, self.remove_pii, self.min_length)))
+            while in_flight:
+                done, future = in_flight.popleft()
+                yield from self._rebuild(done, future.result())
+        finally:
+            # Also reached when the consumer stops early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _chunks(self, events: Iterable[Any]) -> Iterator[List[Any]]:
+        iterator = iter(events)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            self.stats.events_in += len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _texts(event: Any) -> Tuple[Optional[str], ...]:
+        return tuple(getattr(event, field, None) for field in TEXT_FIELDS)
+
+    def _rebuild(self, chunk: List[Any], results: List) -> Iterator[Any]:
+        stats = self.stats
+        for event, result in zip(chunk, results):
+            if result is None:
+                stats.filtered += 1
+                continue
+            cleaned, count = result
+            if count:
+                stats.redacted += 1
+                stats.redactions += count
+                event = event.model_copy(update=dict(zip(TEXT_FIELDS, cleaned)))
+            stats.events_out += 1
+            yield event
@@ -3,10 +3,14 @@ Data Collector for Data Factory
 Collects Agent interaction logs, environment rollouts, and user data.
 """
 
-from typing import Dict, List, Optional
-from pydantic import BaseModel
+from typing import Dict, Iterable, Iterator, List, Optional
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
 from enum import Enum
+from .ids import new_id
+from .event_log import EventLog
+from .event_store import EventStore, EventPage
+from .ingest import BatchResult, NumberedLine
 
 
 class EventType(str, Enum):
@@ -33,11 +37,64 @@ class DataEvent(BaseModel):
         use_enum_values = True
 
 
+class InteractionRecord(BaseModel):
+    """One line of a batch of interactions"""
+    agent_id: str
+    session_id: str
+    prompt: str
+    response: str
+    metadata: Optional[Dict] = None
+    idempotency_key: Optional[str] = None
+
+
+def _describe(error: ValidationError) -> str:
+    """First validation error as 'field: message'"""
+    detail = error.errors()[0]
+    location = ".".join(str(part) for part in detail["loc"])
+    return f"{location}: {detail['msg']}" if location else detail["msg"]
+
+
 class DataCollector:
-    """Collects data from various sources"""
+    """
+    Collects data from various sources.
+    
+    Given a directory, events are persisted in a segmented EventLog there
+    and decoded only when read; collecting into an existing directory
+    resumes from the events already in it.
+    """
     
-    def __init__(self):
-        self.events: List[DataEvent] = []
+    def __init__(self, directory: Optional[str] = None, segment_bytes: int = 64 * 1024**2):
+        """
+        Args:
+            directory: Directory of the event log (default: keep events in memory)
+            segment_bytes: Size at which log segments are rotated
+        """
+        if directory is None:
+            self.store = EventStore()
+        else:
+            log = EventLog(directory, segment_bytes=segment_bytes)
+            self.store = EventStore(log, decode=DataEvent.model_validate_json)
+    
+    @property
+    def events(self) -> List[DataEvent]:
+        """All events, oldest first (prefer iter_events for large logs)"""
+        return self.store.all()
+    
+    def iter_events(
+        self,
+        event_type: Optional[EventType] = None,
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Iterator[DataEvent]:
+        """
+        Iterate matching events oldest first, decoding a page at a time.
+        
+        Args:
+            event_type: Filter by event type
+            agent_id: Filter by agent ID
+            session_id: Filter by session ID
+        """
+        return self.store.scan({"event_type": event_type, "agent_id": agent_id, "session_id": session_id})
     
     def collect_interaction(
         self,
@@ -60,7 +117,7 @@ class DataCollector:
         Returns:
             Created DataEvent
         """
-        event_id = f"evt_{datetime.now().timestamp()}"
+        event_id = new_id("evt_")
         event = DataEvent(
             event_id=event_id,
             event_type=EventType.INTERACTION,
@@ -71,7 +128,7 @@ class DataCollector:
             response=response,
             metadata=metadata
         )
-        self.events.append(event)
+        self.store.add(event)
         return event
     
     def collect_rollout(
@@ -91,7 +148,7 @@ class DataCollector:
         Returns:
             Created DataEvent
         """
-        event_id = f"evt_{datetime.now().timestamp()}"
+        event_id = new_id("evt_")
         event = DataEvent(
             event_id=event_id,
             event_type=EventType.ROLLOUT,
@@ -100,9 +157,58 @@ class DataCollector:
             trace=trace,
             metadata=metadata
         )
-        self.events.append(event)
+        self.store.add(event)
         return event
     
+    def collect_batch(
+        self,
+        lines: Iterable[NumberedLine],
+        result: Optional[BatchResult] = None
+    ) -> BatchResult:
+        """
+        Collect a chunk of NDJSON interaction records.
+        
+        Each line is validated on its own; invalid lines are reported in
+        the result and the rest are stored under one store lock. A record
+        whose idempotency_key was already collected is counted as a
+        duplicate and not stored again.
+        
+        Args:
+            lines: (line number, JSON InteractionRecord) pairs, e.g. from
+                NDJSONReader; a None line is reported as oversized
+            result: Result of the batch's previous chunks to add to
+            
+        Returns:
+            The updated result
+        """
+        result = result if result is not None else BatchResult()
+        pending = []
+        for number, line in lines:
+            if line is None:
+                result.add_error(number, "Line too long")
+                continue
+            try:
+                record = InteractionRecord.model_validate_json(line)
+            except ValidationError as e:
+                result.add_error(number, _describe(e))
+                continue
+            event = DataEvent(
+                event_id=new_id("evt_"),
+                event_type=EventType.INTERACTION,
+                timestamp=datetime.now(),
+                agent_id=record.agent_id,
+                session_id=record.session_id,
+                prompt=record.prompt,
+                response=record.response,
+                metadata=record.metadata
+            )
+            pending.append((event, record.idempotency_key))
+        outcomes = self.store.add_batch(pending)
+        duplicates = sum(1 for existing in outcomes if existing is not None)
+        result.duplicates += duplicates
+        result.accepted += len(outcomes) - duplicates
+        return result
+    
     def collect_feedback(
         self,
         event_id: str,
@@ -118,51 +224,84 @@ class DataCollector:
         Returns:
             Created DataEvent
         """
-        fb_event_id = f"evt_fb_{datetime.now().timestamp()}"
+        fb_event_id = new_id("evt_fb_")
         event = DataEvent(
             event_id=fb_event_id,
             event_type=EventType.FEEDBACK,
             timestamp=datetime.now(),
             metadata={"original_event_id": event_id, **feedback}
         )
-        self.events.append(event)
+        self.store.add(event)
         return event
     
+    def get_event(self, event_id: str) -> Optional[DataEvent]:
+        """Look up an event by ID"""
+        return self.store.get(event_id)
+    
     def get_events(
         self,
         event_type: Optional[EventType] = None,
         agent_id: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        session_id: Optional[str] = None
     ) -> List[DataEvent]:
         """
-        Retrieve collected events with filters.
+        Retrieve the latest collected events with filters.
         
         Args:
             event_type: Filter by event type
             agent_id: Filter by agent ID
             limit: Maximum number of events to return
+            session_id: Filter by session ID
             
         Returns:
-            List of matching events
+            Up to limit most recent matching events, oldest first
         """
-        filtered = self.events
-        
-        if event_type:
-            filtered = [e for e in filtered if e.event_type == event_type]
-        
-        if agent_id:
-            filtered = [e for e in filtered if e.agent_id == agent_id]
+        page = self.query_events(event_type, agent_id, session_id, limit=limit)
+        return page.events[::-1]
+    
+    def query_events(
+        self,
+        event_type: Optional[EventType] = None,
+        agent_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        newest_first: bool = True
+    ) -> EventPage:
+        """
+        Page through events with filters, served from indexes.
         
-        return filtered[-limit:]
+        Args:
+            event_type: Filter by event type
+            agent_id: Filter by agent ID
+            session_id: Filter by session ID
+            limit: Maximum number of events per page
+            cursor: next_cursor of the previous page
+            newest_first: Page back from the newest event, or forward
+                from the oldest
+            
+        Returns:
+            EventPage of events and the cursor of the next page
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        return self.store.query(
+            {"event_type": event_type, "agent_id": agent_id, "session_id": session_id},
+            limit=limit,
+            cursor=cursor,
+            newest_first=newest_first
+        )
     
     def get_statistics(self) -> Dict:
         """Get collection statistics"""
-        by_type = {}
-        for event in self.events:
-            by_type[event.event_type] = by_type.get(event.event_type, 0) + 1
-        
-        return {
-            "total_events": len(self.events),
-            "by_type": by_type,
-            "latest_event": self.events[-1].timestamp.isoformat() if self.events else None
-        }
+        return self.store.get_statistics()
+    
+    def flush(self, sync: bool = False):
+        """Write buffered events to the log (fsync them if sync)"""
+        self.store.flush(sync)
+    
+    def close(self):
+        """Flush and close the event log"""
+        self.store.close()
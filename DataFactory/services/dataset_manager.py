@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
+from .ids import new_id
 
 
 class DatasetType(str, Enum):
@@ -72,7 +73,7 @@ class DatasetManager:
         self.version_counter[name] += 1
         version = f"v{self.version_counter[name]}"
         
-        dataset_id = f"ds_{name}_{version}_{datetime.now().timestamp()}"
+        dataset_id = new_id(f"ds_{name}_{version}_")
         dataset = Dataset(
             dataset_id=dataset_id,
             name=name,
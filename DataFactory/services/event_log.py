@@ -0,0 +1,312 @@
+"""
+Event Log for Data Factory
+Segmented append-only log on local disk with per-segment offset indexes and mmap reads.
+"""
+
+from typing import Iterator, List, Optional, Tuple
+from array import array
+import glob
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+
+SEGMENT_SUFFIX = ".log"
+INDEX_SUFFIX = ".idx"
+
+# Record header: key length, value length, CRC32 of key + value
+_RECORD = struct.Struct("<III")
+
+
+class _Segment:
+    """One log file: records [base, base + len(positions))"""
+
+    def __init__(self, directory: str, base: int):
+        self.base = base
+        self.path = os.path.join(directory, f"{base:020d}{SEGMENT_SUFFIX}")
+        self.index_path = os.path.join(directory, f"{base:020d}{INDEX_SUFFIX}")
+        self.positions = array("Q")  # Record number -> byte position
+        self.size = 0  # Bytes of complete records
+        self.sealed = False
+        self._map: Optional[mmap.mmap] = None
+
+    def view(self, end: int) -> mmap.mmap:
+        """Map the file, remapping if it grew past the current mapping"""
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class EventLog:
+    """
+    Append-only record log split into size-rotated segment files.
+
+    A record is a (key, value) pair of bytes framed by its lengths and a
+    CRC32, and is addressed by its offset: its position in the whole log.
+    Appends go through one buffered sequential writer; once the active
+    segment would exceed `segment_bytes`, it is sealed, its offset index
+    (the byte position of every record, as packed uint64) is written
+    next to it, and a new segment starts at the next offset. Reads map a
+    segment with mmap and slice out one record; a read of a record still
+    in the write buffer flushes it first.
+
+    Keys are meant to be small (the fields needed to rebuild in-memory
+    indexes), so reopening a log scans keys only. A segment whose index
+    file is missing or stale is re-indexed by walking its records, and a
+    torn or corrupt tail of the last segment from a crash is truncated.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024**2,
+        buffer_bytes: int = 1024**2,
+        flush_interval: float = 1.0
+    ):
+        """
+        Args:
+            directory: Directory holding the segments
+            segment_bytes: Size at which the active segment is rotated
+            buffer_bytes: Write buffer size
+            flush_interval: Seconds after which an append flushes the
+                buffer to the OS
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.segments: List[_Segment] = []
+        self._writer = None
+        self._flushed = 0  # Bytes of the active segment handed to the OS
+        self._flushed_at = time.monotonic()
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    def __len__(self) -> int:
+        if not self.segments:
+            return 0
+        last = self.segments[-1]
+        return last.base + len(last.positions)
+
+    # Writing
+
+    def append(self, key: bytes, value: bytes) -> int:
+        """
+        Append a record.
+
+        Returns:
+            Offset of the record
+        """
+        record = _RECORD.pack(len(key), len(value), zlib.crc32(value, zlib.crc32(key))) + key + value
+        with self._lock:
+            segment = self.segments[-1]
+            if segment.size and segment.size + len(record) > self.segment_bytes:
+                segment = self._rotate()
+            offset = segment.base + len(segment.positions)
+            segment.positions.append(segment.size)
+            self._writer.write(record)
+            segment.size += len(record)
+            now = time.monotonic()
+            if now - self._flushed_at >= self.flush_interval:
+                self._flush(now)
+            return offset
+
+    def flush(self, sync: bool = False):
+        """
+        Hand buffered records to the OS.
+
+        Args:
+            sync: Also fsync the active segment
+        """
+        with self._lock:
+            self._flush(time.monotonic())
+            if sync:
+                os.fsync(self._writer.fileno())
+
+    def close(self):
+        """Flush, write the active segment's index and release mappings"""
+        with self._lock:
+            if self._writer is None:
+                return
+            self._flush(time.monotonic())
+            self._writer.close()
+            self._writer = None
+            self._write_index(self.segments[-1])
+            for segment in self.segments:
+                segment.close()
+
+    # Reading
+
+    def read(self, offset: int) -> bytes:
+        """
+        Value of the record at an offset.
+
+        Raises:
+            IndexError: If no record has this offset
+        """
+        return self._read(offset)[1]
+
+    def read_key(self, offset: int) -> bytes:
+        """Key of the record at an offset"""
+        return self._read(offset)[0]
+
+    def scan(self, start: int = 0, keys_only: bool = False) -> Iterator[Tuple[int, bytes, Optional[bytes]]]:
+        """
+        Iterate records from an offset, one at a time.
+
+        Args:
+            start: First offset
+            keys_only: Skip copying values (yields None instead)
+
+        Yields:
+            (offset, key, value)
+        """
+        offset = start
+        while True:
+            with self._lock:
+                if offset >= len(self):
+                    return
+                segment = self._segment_of(offset)
+                stop = segment.base + len(segment.positions)
+                if not segment.sealed:
+                    self._flush(time.monotonic())
+                view = segment.view(segment.size)
+                records = []
+                for number in range(offset - segment.base, min(stop - segment.base, offset - segment.base + 1024)):
+                    key, value = self._slice(view, segment.positions[number], keys_only)
+                    records.append((segment.base + number, key, value))
+            # Yield outside the lock, a batch at a time
+            yield from records
+            offset = records[-1][0] + 1
+
+    # Internals
+
+    def _read(self, offset: int) -> Tuple[bytes, bytes]:
+        with self._lock:
+            if offset < 0 or offset >= len(self):
+                raise IndexError(f"No record at offset {offset}")
+            segment = self._segment_of(offset)
+            position = segment.positions[offset - segment.base]
+            if not segment.sealed and position >= self._flushed:
+                self._flush(time.monotonic())
+            return self._slice(segment.view(segment.size), position, False)
+
+    @staticmethod
+    def _slice(view: mmap.mmap, position: int, keys_only: bool) -> Tuple[bytes, Optional[bytes]]:
+        key_length, value_length, _ = _RECORD.unpack_from(view, position)
+        start = position + _RECORD.size
+        key = view[start:start + key_length]
+        if keys_only:
+            return key, None
+        return key, view[start + key_length:start + key_length + value_length]
+
+    def _segment_of(self, offset: int) -> _Segment:
+        segments = self.segments
+        if offset >= segments[-1].base:
+            return segments[-1]
+        lo, hi = 0, len(segments) - 1
+        while lo < hi:  # Last segment with base <= offset
+            mid = (lo + hi + 1) // 2
+            if segments[mid].base <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return segments[lo]
+
+    def _flush(self, now: float):
+        if self._writer is not None:
+            self._writer.flush()
+            self._flushed = self.segments[-1].size
+        self._flushed_at = now
+
+    def _rotate(self) -> _Segment:
+        """Seal the active segment and start the next one"""
+        current = self.segments[-1]
+        self._flush(time.monotonic())
+        self._writer.close()
+        self._write_index(current)
+        current.sealed = True
+        segment = _Segment(self.directory, current.base + len(current.positions))
+        self.segments.append(segment)
+        self._writer = open(segment.path, "ab", buffering=self.buffer_bytes)
+        self._flushed = 0
+        return segment
+
+    @staticmethod
+    def _write_index(segment: _Segment):
+        tmp = segment.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack("<Q", segment.size))
+            segment.positions.tofile(f)
+        os.replace(tmp, segment.index_path)
+
+    def _open(self):
+        paths = sorted(glob.glob(os.path.join(self.directory, "*" + SEGMENT_SUFFIX)))
+        for path in paths:
+            base = int(os.path.basename(path)[:-len(SEGMENT_SUFFIX)])
+            segment = _Segment(self.directory, base)
+            if not self._load_index(segment):
+                self._reindex(segment)
+            segment.sealed = True
+            self.segments.append(segment)
+        if not self.segments:
+            self.segments.append(_Segment(self.directory, 0))
+        active = self.segments[-1]
+        active.sealed = False
+        with open(active.path, "ab") as f:
+            f.truncate(active.size)  # Drop a torn tail before appending
+        self._writer = open(active.path, "ab", buffering=self.buffer_bytes)
+        self._flushed = active.size
+
+    @staticmethod
+    def _load_index(segment: _Segment) -> bool:
+        """Use the index file if it matches the segment's size"""
+        try:
+            with open(segment.index_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < 8 or (len(data) - 8) % 8:
+            return False
+        (size,) = struct.unpack_from("<Q", data)
+        if size != os.path.getsize(segment.path):
+            return False
+        segment.positions.frombytes(data[8:])
+        segment.size = size
+        return True
+
+    @staticmethod
+    def _reindex(segment: _Segment):
+        """Walk the records of a segment, stopping at the first bad one"""
+        length = os.path.getsize(segment.path)
+        if length == 0:
+            return
+        with open(segment.path, "rb") as f:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            position = 0
+            while position + _RECORD.size <= length:
+                key_length, value_length, crc = _RECORD.unpack_from(view, position)
+                end = position + _RECORD.size + key_length + value_length
+                if end > length:
+                    break  # Torn write
+                body = view[position + _RECORD.size:end]
+                if zlib.crc32(body) != crc:
+                    break
+                segment.positions.append(position)
+                position = end
+            segment.size = position
+        finally:
+            view.close()
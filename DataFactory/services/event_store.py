@@ -0,0 +1,289 @@
+"""
+Event Store for Data Factory
+Time-ordered event storage with secondary indexes and cursor pagination.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+import base64
+import json
+import sys
+import threading
+
+from .event_log import EventLog
+
+
+# Fields with a secondary index, in the order they follow the reference in a record
+INDEXED_FIELDS = ("agent_id", "session_id", "event_type")
+_FIELD_POSITION = {field: i + 1 for i, field in enumerate(INDEXED_FIELDS)}
+
+# (timestamp in seconds, event_id): unique, and ordered like the primary index
+EventKey = Tuple[float, str]
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that was not produced by EventStore"""
+
+
+class EventPage(NamedTuple):
+    """One page of a query"""
+    events: List[Any]
+    next_cursor: Optional[str]  # None on the last page
+
+
+def encode_cursor(key: EventKey) -> str:
+    raw = f"{key[0]!r}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> EventKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, event_id = raw.split("|", 1)
+        return float(timestamp), event_id
+    except ValueError as e:  # Also covers binascii.Error and UnicodeDecodeError
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}") from e
+
+
+class EventStore:
+    """
+    Store of DataEvents, ordered by time.
+
+    The primary index is a sorted list of (timestamp, event_id) keys; each
+    indexed field maps every value to its own sorted key list. Events
+    usually arrive in time order, so inserts are appends (late events are
+    placed with one bisect). A query walks the shortest key list among its
+    filters from the cursor position, found by bisect, and checks the other
+    filters against the indexed fields kept per event, so its cost depends
+    on the page size and the selectivity of the filters, not on the total
+    number of events.
+
+    With an EventLog, events are appended to it as JSON and only the
+    indexes, the indexed fields and the log offset of each event stay in
+    memory; an event is read back and decoded only when a query returns
+    it. The indexes are rebuilt from the log's record keys on start.
+    Without a log, events are kept in memory.
+
+    Cursors are opaque and name the last event of a page; they stay valid
+    while events are added, including out of order.
+
+    An event may carry an idempotency key chosen by its sender: a second
+    event with a key already seen is not stored, and the first event's ID
+    is reported instead. Keys are logged with their events, so retries
+    are recognised across restarts.
+    """
+
+    def __init__(self, log: Optional[EventLog] = None, decode: Optional[Callable[[bytes], Any]] = None):
+        """
+        Args:
+            log: Log to persist events in (default: keep them in memory)
+            decode: Turns a logged event's JSON back into an event
+                (required with a log)
+        """
+        if log is not None and decode is None:
+            raise ValueError("A logged store needs decode")
+        self.log = log
+        self.decode = decode
+        # event_id -> (event or log offset, agent_id, session_id, event_type)
+        self._records: Dict[str, tuple] = {}
+        self._keys: List[EventKey] = []
+        self._indexes: Dict[str, Dict[Any, List[EventKey]]] = {field: {} for field in INDEXED_FIELDS}
+        self._counts_by_type: Dict[Any, int] = {}
+        self._latest: Optional[float] = None
+        self._idempotency: Dict[str, str] = {}  # idempotency key -> event_id
+        self._lock = threading.Lock()
+        if log is not None:
+            for offset, key, _ in log.scan(keys_only=True):
+                fields = json.loads(key)
+                if len(fields) > 5 and fields[5] is not None:  # Logs may predate idempotency keys
+                    self._idempotency[fields[5]] = fields[1]
+                self._index(offset, *fields[:5])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, event: Any) -> bool:
+        """
+        Store an event.
+
+        Args:
+            event: DataEvent
+
+        Returns:
+            False if an event with the same event_id is already stored
+        """
+        with self._lock:
+            return self._add(event, None) is None
+
+    def add_batch(self, events: List[Tuple[Any, Optional[str]]]) -> List[Optional[str]]:
+        """
+        Store events under one lock acquisition.
+
+        Args:
+            events: (DataEvent, idempotency key or None) pairs
+
+        Returns:
+            Per event: None if stored, else the ID of the event already
+            stored with the same event_id or idempotency key
+        """
+        with self._lock:
+            return [self._add(event, key) for event, key in events]
+
+    def get(self, event_id: str) -> Optional[Any]:
+        """Look up an event by ID"""
+        record = self._records.get(event_id)
+        return self._load(record[0]) if record is not None else None
+
+    def query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        newest_first: bool = True
+    ) -> EventPage:
+        """
+        One page of events matching all filters.
+
+        Args:
+            filters: Indexed field -> required value (None values are ignored)
+            limit: Maximum number of events
+            cursor: next_cursor of the previous page
+            newest_first: Walk back in time from the newest event (default)
+                or forward from the oldest
+
+        Returns:
+            EventPage with events in walk order
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+            ValueError: If a filter is on a field without an index
+        """
+        # Enum members hash by name, so look up by their stored values
+        filters = {f: getattr(v, "value", v) for f, v in (filters or {}).items() if v is not None}
+        for field in filters:
+            if field not in self._indexes:
+                raise ValueError(f"No index on {field}")
+        after = decode_cursor(cursor) if cursor else None
+        limit = max(0, limit)
+
+        with self._lock:
+            keys = self._keys
+            for field, value in filters.items():
+                candidates = self._indexes[field].get(value)
+                if candidates is None:
+                    return EventPage([], None)
+                if len(candidates) < len(keys):
+                    keys = candidates
+            others = [(_FIELD_POSITION[f], v) for f, v in filters.items() if self._indexes[f].get(v) is not keys]
+
+            if newest_first:
+                position = bisect_left(keys, after) if after else len(keys)
+                step, stop = -1, -1
+                position -= 1
+            else:
+                position = bisect_right(keys, after) if after else 0
+                step, stop = 1, len(keys)
+
+            found = []
+            while position != stop and len(found) < limit:
+                key = keys[position]
+                record = self._records[key[1]]
+                if all(record[i] == v for i, v in others):
+                    found.append((key, record[0]))
+                position += step
+            more = position != stop
+        events = [self._load(ref) for _, ref in found]
+        if not found or not more:
+            return EventPage(events, None)
+        return EventPage(events, encode_cursor(found[-1][0]))
+
+    def scan(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        newest_first: bool = False,
+        batch: int = 1000
+    ) -> Iterator[Any]:
+        """
+        Iterate matching events a page at a time, without holding them all.
+
+        Args:
+            filters: Indexed field -> required value
+            newest_first: Walk back from the newest event
+            batch: Events decoded per page
+        """
+        cursor = None
+        while True:
+            page = self.query(filters, limit=batch, cursor=cursor, newest_first=newest_first)
+            yield from page.events
+            cursor = page.next_cursor
+            if cursor is None:
+                return
+
+    def all(self) -> List[Any]:
+        """Every event, oldest first (decodes all of them; prefer scan)"""
+        return list(self.scan())
+
+    def flush(self, sync: bool = False):
+        """Hand logged events to the OS (and fsync them if sync)"""
+        if self.log is not None:
+            self.log.flush(sync)
+
+    def close(self):
+        """Flush and close the log"""
+        if self.log is not None:
+            self.log.close()
+
+    def get_statistics(self) -> Dict:
+        """Counts maintained on insert"""
+        with self._lock:
+            return {
+                "total_events": len(self._keys),
+                "by_type": dict(self._counts_by_type),
+                "agents": len(self._indexes["agent_id"]),
+                "sessions": len(self._indexes["session_id"]),
+                "latest_event": datetime.fromtimestamp(self._latest).isoformat() if self._latest else None
+            }
+
+    def _add(self, event: Any, idempotency_key: Optional[str]) -> Optional[str]:
+        if event.event_id in self._records:
+            return event.event_id
+        if idempotency_key is not None:
+            existing = self._idempotency.get(idempotency_key)
+            if existing is not None:
+                return existing
+            self._idempotency[idempotency_key] = event.event_id
+        timestamp = event.timestamp.timestamp()
+        fields = (event.event_id, event.agent_id, event.session_id, event.event_type)
+        ref = event
+        if self.log is not None:
+            key = json.dumps((timestamp,) + fields + (idempotency_key,), separators=(",", ":")).encode()
+            ref = self.log.append(key, event.model_dump_json().encode())
+        self._index(ref, timestamp, *fields)
+        return None
+
+    def _index(self, ref: Any, timestamp: float, event_id: str, agent_id, session_id, event_type):
+        """Add an event to the primary and secondary indexes"""
+        key = (timestamp, event_id)
+        if self.log is not None:  # Share one copy of repeated values
+            agent_id = sys.intern(agent_id) if agent_id is not None else None
+            session_id = sys.intern(session_id) if session_id is not None else None
+            event_type = sys.intern(event_type)
+        self._records[event_id] = (ref, agent_id, session_id, event_type)
+        self._insert(self._keys, key)
+        for field, value in zip(INDEXED_FIELDS, (agent_id, session_id, event_type)):
+            if value is not None:
+                self._insert(self._indexes[field].setdefault(value, []), key)
+        self._counts_by_type[event_type] = self._counts_by_type.get(event_type, 0) + 1
+        if self._latest is None or timestamp > self._latest:
+            self._latest = timestamp
+
+    def _load(self, ref: Any) -> Any:
+        return ref if self.log is None else self.decode(self.log.read(ref))
+
+    @staticmethod
+    def _insert(keys: List[EventKey], key: EventKey):
+        if not keys or key > keys[-1]:
+            keys.append(key)
+        else:
+            insort(keys, key)
@@ -0,0 +1,99 @@
+"""
+Batch Ingestion for Data Factory
+Incremental NDJSON (optionally gzip) line reader and per-batch results.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+import zlib
+
+# (line number, raw line, or None for a line over the size limit)
+NumberedLine = Tuple[int, Optional[bytes]]
+
+# Bytes inflated per step, so a small gzip chunk never expands all at once
+INFLATE_STEP = 1024**2
+
+
+class IngestError(ValueError):
+    """Raised when the body as a whole cannot be read (e.g. a corrupt gzip stream)"""
+
+
+class BatchResult(BaseModel):
+    """Outcome of a batch, accumulated over its chunks"""
+    accepted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: List[Dict] = []  # {"line", "error"}, the first max_errors only
+    max_errors: int = 1000
+
+    def add_error(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+
+class NDJSONReader:
+    """
+    Splits a streamed body into numbered NDJSON lines.
+
+    feed() takes body chunks as they arrive and returns the lines they
+    complete, so a body is never held in full. Blank lines are skipped but
+    counted. A line longer than max_line_bytes is dropped without being
+    buffered and returned as (number, None). A gzip body may consist of
+    several concatenated members (cat a.gz b.gz, pigz).
+    """
+
+    def __init__(self, gzip: bool = False, max_line_bytes: int = 1024**2):
+        """
+        Args:
+            gzip: The body is gzip-compressed
+            max_line_bytes: Longest line accepted
+        """
+        self.max_line_bytes = max_line_bytes
+        self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+        self._partial = b""
+        self._skipping = False  # Inside an oversized line
+        self._line = 0  # Number of the last completed line
+
+    def feed(self, chunk: bytes) -> List[NumberedLine]:
+        """Lines completed by a chunk of the body"""
+        if self._inflater is None:
+            return self._split(chunk, final=False)
+        lines = []
+        try:
+            while chunk:
+                if self._inflater.eof:  # The previous member ended; the next one starts here
+                    self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                lines.extend(self._split(self._inflater.decompress(chunk, INFLATE_STEP), final=False))
+                chunk = self._inflater.unconsumed_tail or self._inflater.unused_data
+        except zlib.error as e:
+            raise IngestError(f"Invalid gzip body: {e}") from e
+        return lines
+
+    def close(self) -> List[NumberedLine]:
+        """The last line, if the body does not end with a newline"""
+        chunk = b""
+        if self._inflater is not None:
+            try:
+                chunk = self._inflater.flush()
+            except zlib.error as e:
+                raise IngestError(f"Invalid gzip body: {e}") from e
+            if not self._inflater.eof:
+                raise IngestError("Truncated gzip body")
+        return self._split(chunk, final=True)
+
+    def _split(self, chunk: bytes, final: bool) -> List[NumberedLine]:
+        parts = (self._partial + chunk).split(b"\n")
+        self._partial = b"" if final else parts.pop()
+        lines = []
+        for part in parts:
+            self._line += 1
+            if self._skipping or len(part) > self.max_line_bytes:
+                self._skipping = False
+                lines.append((self._line, None))
+            elif part.strip():
+                lines.append((self._line, part))
+        if len(self._partial) > self.max_line_bytes:
+            self._partial = b""
+            self._skipping = True
+        return lines
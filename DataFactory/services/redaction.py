@@ -0,0 +1,157 @@
+"""
+Redaction Scanner for Data Factory
+Many substitution patterns compiled into one regex and applied in a single pass.
+"""
+
+from typing import List, Optional, Tuple
+import re
+
+
+# A leading global inline flag group such as (?i), which must become scoped
+# once the pattern is nested in an alternation
+_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+# Numbered backreferences inside a pattern shift once patterns are combined
+_NUMBERED_BACKREF = re.compile(r"(?<!\\)\\[1-9]")
+# Flags that change what \b means
+_BOUNDARY_FLAGS = set("aLux")
+
+
+def _top_level_alternation(pattern: str) -> bool:
+    """Whether a pattern has a | outside any group or character class"""
+    depth = 0
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            i += 1
+        elif c == "[":
+            i += 1
+            if i < n and pattern[i] == "^":
+                i += 1
+            if i < n and pattern[i] == "]":  # A leading ] is literal
+                i += 1
+            while i < n and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+class RedactionScanner:
+    """
+    Substitutes several (pattern, replacement) rules in one pass over a text.
+
+    The rules are joined into a single alternation, so the regex engine
+    walks the text once however many rules there are. Matches are taken
+    left to right without overlapping; where several rules match at the
+    same position the earlier rule wins, and text consumed by one match is
+    not seen by the others. Replacements follow re.sub: a replacement with
+    backslashes is a template that may refer to the rule's own groups.
+
+    The engine tries the alternatives at every position of the text, so
+    the alternation is shaped to fail fast on clean text. The rules are
+    not wrapped in capturing groups, which would make the engine save and
+    restore group state at every position. Instead, the rule behind a
+    match is found by re-matching the rules in priority order at its
+    position; matches are rare compared to positions, so this costs
+    little. A leading \b shared by consecutive rules is tested once for
+    all of them, and is kept outside scoped flags such as (?i:...), which
+    would otherwise hide the rule's first character from the engine's
+    quick per-alternative check.
+
+    A rule that cannot be nested safely (numbered backreferences, a group
+    name already used by an earlier rule, or flags that cannot be scoped)
+    is applied in a separate pass after the combined one.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str]]):
+        """
+        Args:
+            rules: (pattern, replacement) pairs, highest priority first
+
+        Raises:
+            re.error: If a pattern does not compile
+        """
+        self.rules = list(rules)
+        alternatives = []  # Runs of consecutive rules: (after a leading \b, [nested patterns])
+        self._nested: List[Tuple[re.Pattern, str, bool]] = []  # (rule regex, replacement, is template)
+        self._separate: List[Tuple[re.Pattern, str]] = []
+        names = set()
+        for pattern, replacement in self.rules:
+            compiled = re.compile(pattern)
+            nested = self._nest(pattern, compiled, names)
+            if nested is None:
+                self._separate.append((compiled, replacement))
+                continue
+            names.update(compiled.groupindex)
+            boundary, body = nested
+            if alternatives and alternatives[-1][0] == boundary:
+                alternatives[-1][1].append(body)
+            else:
+                alternatives.append((boundary, [body]))
+            self._nested.append((compiled, replacement, "\\" in replacement))
+        self._combined: Optional[re.Pattern] = None
+        if alternatives:
+            self._combined = re.compile("|".join(
+                "\\b(?:" + "|".join(bodies) + ")" if boundary else "|".join(bodies)
+                for boundary, bodies in alternatives
+            ))
+
+    def sub(self, text: str) -> str:
+        """Text with every match replaced"""
+        return self.subn(text)[0]
+
+    def subn(self, text: str) -> Tuple[str, int]:
+        """
+        Text with every match replaced, and the number of replacements.
+        """
+        count = 0
+        if self._combined is not None:
+            text, count = self._combined.subn(self._replace, text)
+        for compiled, replacement in self._separate:
+            text, n = compiled.subn(replacement, text)
+            count += n
+        return text, count
+
+    def _replace(self, match: re.Match) -> str:
+        # The alternation took the first rule that matches here
+        start, end = match.span()
+        for compiled, replacement, is_template in self._nested:
+            own = compiled.match(match.string, start)
+            if own is not None and own.end() == end:
+                return own.expand(replacement) if is_template else replacement
+        return match.group()
+
+    @staticmethod
+    def _nest(pattern: str, compiled: re.Pattern, names: set) -> Optional[Tuple[bool, str]]:
+        """
+        The pattern in a form that can sit inside the alternation, if any.
+
+        Returns:
+            (whether a leading \b was taken off, pattern as one group)
+        """
+        if compiled.groups and _NUMBERED_BACKREF.search(pattern):
+            return None
+        if names.intersection(compiled.groupindex):
+            return None
+        match = _GLOBAL_FLAGS.match(pattern)
+        flags, body = (match.group(1), pattern[match.end():]) if match else ("", pattern)
+        # A newline ends a trailing comment in verbose patterns
+        end = "\n" if "x" in flags else ""
+        candidates = []
+        if body.startswith("\\b") and not _BOUNDARY_FLAGS.intersection(flags) and not _top_level_alternation(body):
+            candidates.append((True, body[2:]))
+        candidates.append((False, body))
+        for boundary, rest in candidates:
+            nested = f"(?{flags}:{rest}{end})" if flags else f"(?:{rest})"
+            try:
+                re.compile(nested)
+            except re.error:
+                continue
+            return boundary, nested
+        return None
@@ -0,0 +1,76 @@
+"""
+Cleaning pipeline tests
+"""
+
+import multiprocessing
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.cleaner import CleaningRule, DataCleaner
+from services.cleaning_pipeline import CleaningPipeline
+from services.collector import DataEvent, EventType
+
+
+def make_cleaner() -> DataCleaner:
+    cleaner = DataCleaner()
+    cleaner.add_custom_rule(CleaningRule(rule_id="key", name="key", pattern=r"\bsk-[a-z0-9]{8,}\b", replacement="[KEY]"))
+    return cleaner
+
+
+def make_events(count: int):
+    events = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            prompt, response = "ok", "too short to keep"  # Garbage
+        elif kind == 1:
+            prompt, response = f"mail user{i}@example.com please", f"key sk-abcdef{i:04d} and 10.0.0.{i % 200}"
+        elif kind == 2:
+            prompt, response = None, None  # No text: passes through
+        else:
+            prompt, response = f"question number {i} about the build", f"answer number {i}, all good"
+        events.append(DataEvent(
+            event_id=f"evt_{i}", event_type=EventType.INTERACTION, timestamp=datetime(2026, 10, 1),
+            agent_id="agent", prompt=prompt, response=response
+        ))
+    return events
+
+
+def test_pool_output_matches_calling_thread():
+    events = make_events(203)
+    reference = CleaningPipeline(make_cleaner(), workers=0, chunk_size=8)
+    expected = [e.model_dump() for e in reference.run(iter(events))]
+    for workers, chunk_size, max_in_flight in ((1, 8, None), (2, 5, 1), (3, 64, None)):
+        pipeline = CleaningPipeline(make_cleaner(), workers=workers, chunk_size=chunk_size, max_in_flight=max_in_flight)
+        assert [e.model_dump() for e in pipeline.run(iter(events))] == expected
+        assert pipeline.stats == reference.stats
+
+
+def test_order_and_stats():
+    events = make_events(50)
+    pipeline = CleaningPipeline(make_cleaner(), workers=2, chunk_size=4)
+    cleaned = list(pipeline.run(events))
+
+    kept = [e for i, e in enumerate(events) if i % 5 != 0]
+    assert [e.event_id for e in cleaned] == [e.event_id for e in kept]
+    redacted = [e for e in cleaned if int(e.event_id[4:]) % 5 == 1]
+    assert all("[EMAIL]" in e.prompt and "[KEY]" in e.response and "[IP_ADDRESS]" in e.response for e in redacted)
+    untouched = [e for e in cleaned if int(e.event_id[4:]) % 5 in (2, 3, 4)]
+    assert untouched == [e for e in kept if int(e.event_id[4:]) % 5 in (2, 3, 4)]
+
+    stats = pipeline.stats
+    assert (stats.events_in, stats.filtered, stats.events_out) == (50, 10, 40)
+    assert (stats.redacted, stats.redactions) == (10, 30)
+
+
+def test_early_exit_shuts_down_the_pool():
+    pipeline = CleaningPipeline(make_cleaner(), workers=2, chunk_size=4)
+    output = pipeline.run(make_events(1000))
+    first = [next(output) for _ in range(3)]
+    assert [e.event_id for e in first] == ["evt_1", "evt_2", "evt_3"]
+    output.close()
+    assert multiprocessing.active_children() == []
+    assert pipeline.stats.events_in < 1000  # Input is read lazily
@@ -0,0 +1,74 @@
+"""
+Event store tests
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.collector import DataEvent, EventType
+from services.event_store import EventStore
+
+BASE = datetime(2026, 10, 1)
+
+
+def event(event_id: str, seconds: float, agent_id: str = "a", session_id: str = "s1") -> DataEvent:
+    return DataEvent(
+        event_id=event_id, event_type=EventType.INTERACTION, timestamp=BASE + timedelta(seconds=seconds),
+        agent_id=agent_id, session_id=session_id
+    )
+
+
+def ids(events):
+    return [e.event_id for e in events]
+
+
+def walk(store: EventStore, limit: int, newest_first: bool, filters=None, between_pages=None):
+    pages, cursor = [], None
+    while True:
+        page = store.query(filters, limit=limit, cursor=cursor, newest_first=newest_first)
+        pages.append(ids(page.events))
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+        if between_pages:
+            between_pages(len(pages))
+
+
+def test_cursor_stable_under_out_of_order_inserts():
+    for newest_first in (True, False):
+        store = EventStore()
+        for i in range(10):
+            store.add(event(f"e{i}", i))
+
+        def insert_late(page: int):
+            if page == 1:
+                store.add(event("late_old", 4.5))  # Not yet walked past
+                store.add(event("late_new", 8.5))  # Behind the cursor when walking back
+                store.add(event("late_first", 0.5))  # Behind the cursor when walking forward
+
+        pages = walk(store, 3, newest_first, between_pages=insert_late)
+        seen = [event_id for page in pages for event_id in page]
+        assert len(seen) == len(set(seen))
+        if newest_first:
+            assert pages[0] == ["e9", "e8", "e7"]
+            assert seen == ["e9", "e8", "e7", "e6", "e5", "late_old", "e4", "e3", "e2", "e1", "late_first", "e0"]
+        else:
+            assert pages[0] == ["e0", "e1", "e2"]
+            assert seen == ["e0", "e1", "e2", "e3", "e4", "late_old", "e5", "e6", "e7", "e8", "late_new", "e9"]
+
+
+def test_filters_intersect():
+    store = EventStore()
+    for i in range(40):
+        store.add(event(f"e{i}", i, agent_id=f"a{i % 2}", session_id=f"s{i % 5}"))
+
+    expected = [f"e{i}" for i in range(40) if i % 2 == 0 and i % 5 == 1]
+    pages = walk(store, 1, False, {"agent_id": "a0", "session_id": "s1"})
+    assert [event_id for page in pages for event_id in page] == expected
+    page = store.query({"agent_id": "a0", "session_id": "s1", "event_type": EventType.INTERACTION})
+    assert ids(page.events) == expected[::-1]
+    assert store.query({"agent_id": "a0", "session_id": "missing"}).events == []
+    assert store.query({"agent_id": "a1", "session_id": "s1", "event_type": EventType.ERROR}).events == []
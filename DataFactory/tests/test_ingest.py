@@ -0,0 +1,80 @@
+"""
+Batch ingestion tests
+"""
+
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.collector import DataCollector
+from services.ingest import IngestError, NDJSONReader
+
+
+def record(i: int, key=None) -> bytes:
+    return json.dumps({
+        "agent_id": "agent", "session_id": "s1", "prompt": f"prompt {i}",
+        "response": f"response {i}", "idempotency_key": key
+    }).encode()
+
+
+def read(reader: NDJSONReader, body: bytes, chunk_size: int = 7):
+    lines = []
+    for i in range(0, len(body), chunk_size):
+        lines.extend(reader.feed(body[i:i + chunk_size]))
+    return lines + reader.close()
+
+
+def test_line_numbers_count_blank_lines():
+    lines = read(NDJSONReader(), b"a\n\n  \nb\r\nc")
+    assert lines == [(1, b"a"), (4, b"b\r"), (5, b"c")]
+
+
+def test_oversized_lines_are_reported_not_buffered():
+    body = b"short\n" + b"x" * 100 + b"\nok\n" + b"y" * 50
+    assert read(NDJSONReader(max_line_bytes=20), body) == [(1, b"short"), (2, None), (3, b"ok"), (4, None)]
+
+
+def test_concatenated_gzip_members():
+    first = b"".join(record(i) + b"\n" for i in range(5))
+    second = b"".join(record(i) + b"\n" for i in range(5, 10))
+    body = gzip.compress(first) + gzip.compress(second)
+    for chunk_size in (1, 13, len(gzip.compress(first)), len(body)):
+        lines = read(NDJSONReader(gzip=True), body, chunk_size)
+        assert [number for number, _ in lines] == list(range(1, 11))
+        assert b"\n".join(line for _, line in lines) + b"\n" == first + second
+
+
+def test_truncated_gzip_is_an_error():
+    body = gzip.compress(b"".join(record(i) + b"\n" for i in range(100)))
+    reader = NDJSONReader(gzip=True)
+    reader.feed(body[:len(body) // 2])
+    with pytest.raises(IngestError):
+        reader.close()
+    with pytest.raises(IngestError):
+        NDJSONReader(gzip=True).feed(b"not gzip at all")
+
+
+def test_collect_batch_results():
+    collector = DataCollector()
+    lines = [
+        (1, record(1, key="k1")),
+        (2, b"{not json"),
+        (3, record(2, key="k1")),  # Same key in the same chunk
+        (4, None),
+        (5, json.dumps({"agent_id": "agent"}).encode()),
+        (6, record(3)),
+    ]
+    result = collector.collect_batch(lines)
+    assert (result.accepted, result.duplicates, result.rejected) == (2, 1, 3)
+    assert [error["line"] for error in result.errors] == [2, 4, 5]
+    assert result.errors[1]["error"] == "Line too long"
+
+    # A later chunk of the same batch adds to its result
+    result = collector.collect_batch([(7, record(4, key="k1")), (8, record(5, key="k2"))], result)
+    assert (result.accepted, result.duplicates, result.rejected) == (3, 2, 3)
+    assert len(collector.events) == 3
@@ -0,0 +1,98 @@
+"""
+Redaction scanner tests
+"""
+
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.cleaner import DataCleaner
+from services.redaction import RedactionScanner
+
+
+def sequential(rules, text: str) -> str:
+    """One re.sub pass per rule, in priority order"""
+    for pattern, replacement in rules:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+def assert_same_as_sequential(rules, texts):
+    scanner = RedactionScanner(rules)
+    for text in texts:
+        assert scanner.sub(text) == sequential(rules, text), text
+
+
+def test_pii_and_custom_rules_at_the_same_position():
+    rules = [(pattern, f"[{name.upper()}]") for name, pattern in DataCleaner().pii_patterns.items()]
+    rules += [(r"\b\d{3}-\d{2}\b", "[PREFIX]"), (r"\b\d{3}\b", "[NUM]"), (r"\bkey-\w+", "[KEY]")]
+    assert_same_as_sequential(rules, [
+        "ssn 123-45-6789 and prefix 123-45 and 123",
+        "call 555-123-4567 or mail a.b@example.com from 10.1.2.3",
+        "card 1234 5678 9012 3456, key-abc123",
+        "nothing to see here",
+    ])
+
+
+def test_earlier_rule_wins_and_consumes_the_text():
+    scanner = RedactionScanner([("abc", "[A]"), ("abcdef", "[B]"), ("def", "[D]")])
+    assert scanner.subn("abcdef abc-def") == ("[A][D] [A]-[D]", 4)
+    # Unlike sequential passes, a replacement is never matched again
+    assert RedactionScanner([("foo", "bar"), ("bar", "X")]).sub("foo bar") == "bar X"
+    assert sequential([("foo", "bar"), ("bar", "X")], "foo bar") == "X X"
+
+
+def test_template_replacements():
+    rules = [
+        (r"(?i)\b(?P<field>password|pwd)\s*[:=]\s*\S+", r"\g<field>=[REDACTED]"),
+        (r"\b(user)(\d+)@example\.com\b", r"\1-[\2]@[DOMAIN]"),
+        (r"\btoken=(?P<t>\w{4})\w*", r"token=\g<t>…"),
+    ]
+    scanner = RedactionScanner(rules)
+    assert not scanner._separate
+    assert_same_as_sequential(rules, [
+        "PASSWORD: hunter2, pwd=abc and user42@example.com token=abcdefgh",
+        "password=1 password=2",
+    ])
+
+
+def test_colliding_group_names_use_a_separate_pass():
+    rules = [
+        (r"\bid=(?P<v>\d+)", r"id=<\g<v>>"),
+        (r"\bref=(?P<v>\d+)", r"ref=<\g<v>>"),
+    ]
+    scanner = RedactionScanner(rules)
+    assert len(scanner._separate) == 1
+    assert_same_as_sequential(rules, ["id=1 ref=2 id=3"])
+
+
+def test_numbered_backreferences_use_a_separate_pass():
+    rules = [(r"\b(\w+) \1\b", "[DUP]"), (r"\bsecret\b", "[S]")]
+    scanner = RedactionScanner(rules)
+    assert len(scanner._separate) == 1
+    assert_same_as_sequential(rules, ["the the secret is is out", "no repeats"])
+    assert scanner.subn("the the secret")[1] == 2
+
+
+def test_verbose_and_scoped_flags():
+    rules = [
+        (r"(?x) \b \d{3} - \d{4} \b  # local phone number", "[PHONE]"),
+        (r"(?i)\bbearer\s+\S+", "Bearer [TOKEN]"),
+        (r"(?a)\bapi\w+", "[API]"),
+        (r"\bsk-\w+", "[KEY]"),
+    ]
+    scanner = RedactionScanner(rules)
+    assert not scanner._separate
+    assert_same_as_sequential(rules, [
+        "dial 555-1234, BEARER abc.def and apiKey_é sk-xyz",
+        "bearer\ttok sk-1 ápiX",
+    ])
+
+
+def test_invalid_pattern():
+    with pytest.raises(re.error):
+        RedactionScanner([("(unclosed", "x")])
@@ -37,6 +37,7 @@ class MetricsCollector:
         self._counters: Dict[str, float] = defaultdict(float)
         self._gauges: Dict[str, float] = {}
         self._histograms: Dict[str, List[float]] = defaultdict(list)
+        self._collectors: List[Any] = []
     
     def record_agent_call(
         self,
@@ -121,6 +122,15 @@ class MetricsCollector:
         """观测直方图"""
         self._histograms[name].append(value)
     
+    def register_collector(self, collector: Any):
+        """
+        注册外部指标源，导出时一并输出
+        
+        Args:
+            collector: 提供export_prometheus_format()的对象（如ComputeFactory的SchedulerMetrics）
+        """
+        self._collectors.append(collector)
+    
     def get_stats(
         self,
         agent_id: Optional[str] = None,
@@ -258,6 +268,12 @@ class MetricsCollector:
             lines.append(f"{metric_name}{{quantile=\"0.95\"}} {stats['p95']}")
             lines.append(f"{metric_name}{{quantile=\"0.99\"}} {stats['p99']}")
         
+        # 外部指标源
+        for collector in self._collectors:
+            text = collector.export_prometheus_format()
+            if text:
+                lines.append(text)
+        
         return "\n".join(lines)
     
     def print_summary(self):
@@ -7,9 +7,9 @@ from typing import Dict, Optional, List
 from enum import Enum
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-import uuid
 import json
 import os
+from .ids import new_id
 
 
 class IsolationLevel(str, Enum):
@@ -69,7 +69,7 @@ class AgentSandbox:
         template_name: Optional[str] = "default",
         isolation_level: IsolationLevel = IsolationLevel.PROCESS
     ):
-        self.sandbox_id = sandbox_id or f"sandbox-{uuid.uuid4().hex[:8]}"
+        self.sandbox_id = sandbox_id or new_id("sandbox-")
         self.agent_id = agent_id
         self.template_name = template_name
         self.isolation_level = isolation_level
@@ -290,7 +290,7 @@ class AgentSandbox:
     
     def _create_snapshot(self):
         """Create a snapshot of current state"""
-        snapshot_id = f"snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        snapshot_id = new_id("snapshot_")
         snapshot_dir = os.path.join(self.storage.storage_path, "snapshots", snapshot_id)
         os.makedirs(snapshot_dir, exist_ok=True)
         
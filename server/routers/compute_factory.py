@@ -1,20 +1,126 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timedelta
+import os
+import threading
 
 # Import compute factory modules
 from ..factories.compute import ResourceManager, JobScheduler, ResourceMonitor
-from ..factories.compute.resource_manager import ResourceSpec, ResourceType, PoolType
+from ..factories.compute.resource_manager import ResourceSpec, ResourceType, PoolType, NodeSpec
 from ..factories.compute.scheduler import JobPriority
+from ..factories.compute.dependencies import DependencyError
+from ..factories.compute.reservations import ReservationCalendar, ReservationError
+from ..factories.compute.scheduling_loop import SchedulingLoop, SchedulerOverloadedError
+from ..factories.compute.journal import SchedulerJournal
+from ..factories.compute.fair_share import FairShareQueue, TenantQuota, DEFAULT_TENANT
+from ..factories.compute.backfill import BackfillPlanner, BackfillMode
+from ..factories.compute.executor import LocalExecutor
+from ..factories.compute.node_registry import NodeRegistry
+from ..factories.compute.instrumentation import SchedulerMetrics
+from ..factories.compute.preemption import PreemptionEngine
+from ..database import models, database
 
 router = APIRouter(prefix="/compute", tags=["Compute Factory"])
 
 # Initialize singletons
 resource_manager = ResourceManager()
-job_scheduler = JobScheduler()
-resource_monitor = ResourceMonitor()
+# Jobs are ordered by dominant resource fairness across tenants; jobs that
+# cannot start yet reserve capacity and shorter jobs backfill around them,
+# never into capacity booked by advance reservations
+reservation_calendar = ReservationCalendar(resource_manager)
+job_scheduler = JobScheduler(
+    fair_share=FairShareQueue(resource_manager),
+    backfill=BackfillPlanner(resource_manager, BackfillMode.EASY),
+    reservations=reservation_calendar
+)
+scheduler_metrics = SchedulerMetrics(resource_manager, job_scheduler)
+scheduler_metrics.attach()
+# HIGH and CRITICAL jobs that a scheduling pass leaves waiting evict
+# lower-priority preemptible jobs, which are re-queued
+preemption_engine = PreemptionEngine(job_scheduler, resource_manager)
+preemption_engine.attach()
+# Restore allocations and jobs from the last run, then journal every mutation
+scheduler_journal = SchedulerJournal(os.path.join("Demo", "compute_state"))
+scheduler_journal.open(resource_manager, job_scheduler)
+resource_monitor = ResourceMonitor(meter=resource_manager.meter)
+resource_monitor.start_sampling()
+# Single writer for resource_manager/job_scheduler state; handlers await it
+scheduling_loop = SchedulingLoop(resource_manager, job_scheduler)
+# Run jobs that carry a command on this host. Opt-in, since the commands
+# come from API callers; exits are reported back through the scheduling loop
+local_executor = None
+if os.environ.get("COMPUTE_LOCAL_EXECUTOR") == "1":
+    local_executor = LocalExecutor(
+        resource_manager,
+        job_scheduler,
+        log_dir=os.path.join("Demo", "compute_logs"),
+        dispatch=scheduling_loop.call_threadsafe
+    )
+    local_executor.start(PoolType.ENVIRONMENT)
+
+
+def _write_node_statuses(records: List[dict]):
+    """Upsert a batch of node statuses into compute_nodes"""
+    db = database.SessionLocal()
+    try:
+        names = [r["name"] for r in records]
+        existing = {
+            n.name: n for n in
+            db.query(models.ComputeNode).filter(models.ComputeNode.name.in_(names))
+        }
+        for record in records:
+            row = existing.get(record["name"])
+            if row is None:
+                db.add(models.ComputeNode(**record))
+            else:
+                row.type, row.status, row.specs = record["type"], record["status"], record["specs"]
+        db.commit()
+    finally:
+        db.close()
+
+
+# Nodes that heartbeat are failed over within seconds of going silent
+node_registry = NodeRegistry(
+    resource_manager,
+    job_scheduler,
+    status_sink=_write_node_statuses,
+    dispatch=scheduling_loop.call_threadsafe
+)
+node_registry.start()
+
+
+def _run_reservation_boundaries():
+    """Schedule pending jobs whenever a reservation window opens or closes"""
+    while True:
+        try:
+            future = scheduling_loop.call_threadsafe(reservation_calendar.next_boundary)
+        except RuntimeError:  # Scheduling loop not started yet
+            future = None
+        delay = 60.0
+        if future is not None:
+            try:
+                boundary = future.result(timeout=10.0)
+                if boundary is not None:
+                    delay = (boundary - datetime.now()).total_seconds()
+            except Exception as e:  # Overloaded, stopped or stuck loop: retry shortly
+                future.cancel()
+                print(f"⚠️  Reservation boundary lookup failed: {e!r}")
+                delay = 1.0
+        threading.Event().wait(min(60.0, max(0.0, delay)) + 0.01)
+
+
+threading.Thread(target=_run_reservation_boundaries, name="reservation-boundaries", daemon=True).start()
+
+
+async def _scheduled(coro):
+    """Await a scheduling loop request, mapping overload to 503"""
+    try:
+        return await coro
+    except SchedulerOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 
 # Request/Response Models
@@ -23,9 +129,15 @@ class AllocateResourceRequest(BaseModel):
     resource_type: ResourceType
     count: int
     memory_gb: Optional[int] = None
+    accelerator_model: Optional[str] = None
     job_id: Optional[str] = None
 
 
+class RegisterNodeRequest(BaseModel):
+    pool_type: PoolType
+    node: NodeSpec
+
+
 class ReleaseResourceRequest(BaseModel):
     allocation_id: str
 
@@ -34,22 +146,50 @@ class SubmitJobRequest(BaseModel):
     name: str
     priority: JobPriority = JobPriority.NORMAL
     preemptible: bool = False
+    pool_type: Optional[PoolType] = None
+    resource_type: Optional[ResourceType] = None
+    count: int = 1
+    memory_gb: Optional[int] = None
+    accelerator_model: Optional[str] = None
+    gang_size: int = 1
+    tenant: str = DEFAULT_TENANT
+    runtime_estimate: Optional[float] = None  # Seconds; lets the job backfill
+    command: Optional[List[str]] = None  # Run by the local executor, if enabled
+    depends_on: List[str] = []  # Job IDs that must complete first
+    reservation_id: Optional[str] = None  # Run in this advance reservation
+
+
+class ReserveCapacityRequest(BaseModel):
+    pool_type: PoolType
+    resource_type: ResourceType
+    count: int
+    memory_gb: Optional[int] = None
+    accelerator_model: Optional[str] = None
+    slots: int = 1
+    start: datetime
+    duration: float  # Seconds
+    name: str = ""
+    tenant: str = DEFAULT_TENANT
 
 
 @router.post("/allocate")
-def allocate_resource(request: AllocateResourceRequest):
+async def allocate_resource(request: AllocateResourceRequest):
     """Allocate compute resources from a pool"""
     resource_spec = ResourceSpec(
         resource_type=request.resource_type,
         count=request.count,
-        memory_gb=request.memory_gb
+        memory_gb=request.memory_gb,
+        accelerator_model=request.accelerator_model
     )
     
-    allocation = resource_manager.allocate_resource(
+    allocation = await _scheduled(scheduling_loop.allocate(
         pool_type=request.pool_type,
         resource_spec=resource_spec,
         job_id=request.job_id
-    )
+    ))
+    
+    if allocation is None:
+        raise HTTPException(status_code=409, detail="Insufficient capacity in pool")
     
     return {
         "status": "success",
@@ -58,9 +198,9 @@ def allocate_resource(request: AllocateResourceRequest):
 
 
 @router.post("/release")
-def release_resource(request: ReleaseResourceRequest):
+async def release_resource(request: ReleaseResourceRequest):
     """Release allocated resources"""
-    success = resource_manager.release_resource(request.allocation_id)
+    success = await _scheduled(scheduling_loop.release(request.allocation_id))
     
     if not success:
         raise HTTPException(status_code=404, detail="Allocation not found")
@@ -71,10 +211,178 @@ def release_resource(request: ReleaseResourceRequest):
     }
 
 
+@router.post("/nodes")
+async def register_node(request: RegisterNodeRequest):
+    """Register a compute node's capacity with a pool (again to update it)"""
+    try:
+        node = await _scheduled(scheduling_loop.call(
+            lambda: resource_manager.add_node(request.pool_type, request.node)
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "status": "success",
+        "node": node.dict()
+    }
+
+
+@router.post("/nodes/{node_id}/heartbeat")
+def node_heartbeat(node_id: str):
+    """Report that a registered node is alive"""
+    health = node_registry.heartbeat(node_id)
+    if health is None:
+        raise HTTPException(status_code=404, detail="Node not registered")
+    return {
+        "status": "success",
+        "health": health,
+        "heartbeat_interval": node_registry.heartbeat_interval
+    }
+
+
+@router.get("/nodes/health")
+def get_node_health():
+    """Failure detector state of heartbeating nodes"""
+    return {
+        "status": "success",
+        "registry": node_registry.get_status()
+    }
+
+
+@router.post("/jobs")
+async def submit_job(request: SubmitJobRequest):
+    """Submit a job; it is placed with the next scheduling batch once its dependencies completed"""
+    resource_spec = None
+    if request.resource_type is not None:
+        resource_spec = ResourceSpec(
+            resource_type=request.resource_type,
+            count=request.count,
+            memory_gb=request.memory_gb,
+            accelerator_model=request.accelerator_model
+        )
+    try:
+        job = await _scheduled(scheduling_loop.submit_job(
+            name=request.name,
+            priority=request.priority,
+            preemptible=request.preemptible,
+            pool_type=request.pool_type,
+            resource_spec=resource_spec,
+            gang_size=request.gang_size,
+            tenant=request.tenant,
+            runtime_estimate=request.runtime_estimate,
+            command=request.command,
+            depends_on=request.depends_on,
+            reservation_id=request.reservation_id
+        ))
+    except (DependencyError, ReservationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "success",
+        "job": job.dict()
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a job's current status"""
+    job = await _scheduled(scheduling_loop.call(lambda: job_scheduler.get_job(job_id)))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "status": "success",
+        "job": job.dict()
+    }
+
+
+@router.post("/reservations")
+async def reserve_capacity(request: ReserveCapacityRequest):
+    """Book pool capacity for a future time window"""
+    resource_spec = ResourceSpec(
+        resource_type=request.resource_type,
+        count=request.count,
+        memory_gb=request.memory_gb,
+        accelerator_model=request.accelerator_model
+    )
+    end = request.start + timedelta(seconds=request.duration)
+    reservation = await _scheduled(scheduling_loop.call(lambda: reservation_calendar.reserve(
+        request.pool_type, resource_spec, request.start, end,
+        slots=request.slots, name=request.name, tenant=request.tenant
+    )))
+    if reservation is None:
+        earliest = await _scheduled(scheduling_loop.call(lambda: reservation_calendar.earliest_start(
+            request.pool_type, resource_spec, request.duration,
+            slots=request.slots, not_before=request.start
+        )))
+        detail = "Insufficient capacity in window"
+        if earliest is not None:
+            detail += f"; earliest feasible start {earliest.isoformat()}"
+        raise HTTPException(status_code=409, detail=detail)
+    return {
+        "status": "success",
+        "reservation": reservation.dict()
+    }
+
+
+@router.get("/reservations")
+async def list_reservations(pool_type: Optional[PoolType] = None, include_finished: bool = False):
+    """List advance reservations in start order"""
+    reservations = await _scheduled(scheduling_loop.call(
+        lambda: reservation_calendar.list(pool_type, include_finished)
+    ))
+    return {
+        "status": "success",
+        "reservations": [r.dict() for r in reservations]
+    }
+
+
+@router.delete("/reservations/{reservation_id}")
+async def cancel_reservation(reservation_id: str):
+    """Cancel a reservation; its running jobs continue as ordinary jobs"""
+    cancelled = await _scheduled(scheduling_loop.call(
+        lambda: reservation_calendar.cancel(reservation_id)
+    ))
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="Reservation not found or already over")
+    return {
+        "status": "success",
+        "reservation_id": reservation_id
+    }
+
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """Get queue and scheduling loop status"""
+    queue = await _scheduled(scheduling_loop.call(job_scheduler.get_queue_status))
+    return {
+        "status": "success",
+        "queue": queue,
+        "loop": scheduling_loop.get_status(),
+        "journal": scheduler_journal.get_status()
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Scheduler and pool metrics in Prometheus text format"""
+    return await _scheduled(scheduling_loop.call(scheduler_metrics.export_prometheus_format))
+
+
+@router.put("/tenants/{tenant}/quota")
+async def set_tenant_quota(tenant: str, quota: TenantQuota):
+    """Set a tenant's guaranteed quota and fair-share weight"""
+    await _scheduled(scheduling_loop.call(
+        lambda: job_scheduler.fair_share.set_quota(tenant, quota)
+    ))
+    return {
+        "status": "success",
+        "tenant": tenant,
+        "quota": quota.dict()
+    }
+
+
 @router.get("/pools")
-def get_pools():
+async def get_pools():
     """Get status of all resource pools"""
-    pools = resource_manager.get_all_pools()
+    pools = await _scheduled(scheduling_loop.call(resource_manager.get_all_pools))
     return {
         "status": "success",
         "pools": pools
@@ -82,9 +390,11 @@ def get_pools():
 
 
 @router.get("/pools/{pool_type}")
-def get_pool_status(pool_type: PoolType):
+async def get_pool_status(pool_type: PoolType):
     """Get status of a specific resource pool"""
-    status = resource_manager.get_pool_status(pool_type)
+    status = await _scheduled(scheduling_loop.call(
+        lambda: resource_manager.get_pool_status(pool_type)
+    ))
     return {
         "status": "success",
         "pool": status
@@ -93,8 +403,49 @@ def get_pool_status(pool_type: PoolType):
 
 @router.get("/usage")
 def get_usage():
+    """Get current host resource usage from the background sampler"""
+    return {
+        "status": "success",
+        "usage": resource_monitor.get_current_usage()
+    }
+
+
+@router.get("/costs")
+async def get_cost_report(start: datetime, end: Optional[datetime] = None):
+    """Get metered cost report for a period"""
+    report = await _scheduled(scheduling_loop.call(
+        lambda: resource_monitor.generate_cost_report(start, end or datetime.now())
+    ))
     return {
-        "gpu_util": "45%",
-        "memory_util": "60%",
-        "active_nodes": 3
+        "status": "success",
+        "report": report.dict()
+    }
+
+
+@router.get("/costs/jobs")
+async def get_top_job_costs(
+    start: datetime,
+    end: Optional[datetime] = None,
+    resource_type: ResourceType = ResourceType.GPU,
+    limit: int = 10
+):
+    """Get the jobs with the highest usage of a resource type in a period"""
+    jobs = await _scheduled(scheduling_loop.call(
+        lambda: resource_monitor.get_top_jobs(start, end or datetime.now(), resource_type, limit)
+    ))
+    return {
+        "status": "success",
+        "jobs": jobs
+    }
+
+
+@router.get("/costs/jobs/{job_id}")
+async def get_job_cost(job_id: str):
+    """Get the metered cost of a job"""
+    cost = await _scheduled(scheduling_loop.call(
+        lambda: resource_monitor.calculate_job_cost(job_id)
+    ))
+    return {
+        "status": "success",
+        "cost": cost
     }
@@ -3,20 +3,27 @@ Data Factory API Router
 Provides data collection, cleaning, annotation, and dataset management endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+import atexit
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 
 # Import data factory modules
 from ..factories.data import DataCollector, DataCleaner, DataAnnotator, DatasetManager
 from ..factories.data.collector import EventType
+from ..factories.data.event_store import InvalidCursorError
+from ..factories.data.ingest import BatchResult, IngestError, NDJSONReader
 from ..factories.data.annotator import AnnotationType
 from ..factories.data.dataset_manager import DatasetType
 
 router = APIRouter(prefix="/data", tags=["Data Factory"])
 
 # Initialize singletons  
-data_collector = DataCollector()
+data_collector = DataCollector(directory=os.path.join("Demo", "data_events"))
+atexit.register(data_collector.close)
 data_cleaner = DataCleaner()
 data_annotator = DataAnnotator()
 dataset_manager = DatasetManager()
@@ -62,23 +69,71 @@ def collect_event(request: CollectInteractionRequest):
     }
 
 
+@router.post("/events:batch")
+async def collect_event_batch(request: Request):
+    """
+    Collect interaction events from a streamed NDJSON body.
+    
+    One JSON object per line with the fields of POST /events and an
+    optional idempotency_key; send Content-Encoding: gzip for a compressed
+    body. Lines are validated and stored a chunk at a time as they arrive,
+    and invalid lines are reported by number without failing the batch.
+    """
+    encoding = request.headers.get("content-encoding", "").lower()
+    if encoding not in ("", "identity", "gzip"):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+    reader = NDJSONReader(gzip=encoding == "gzip")
+    result = BatchResult()
+    try:
+        async for chunk in request.stream():
+            lines = reader.feed(chunk)
+            if lines:
+                await run_in_threadpool(data_collector.collect_batch, lines, result)
+        await run_in_threadpool(data_collector.collect_batch, reader.close(), result)
+    except IngestError as e:
+        # Lines before the damage were stored; say how many
+        raise HTTPException(status_code=400, detail={"error": str(e), **result.dict(exclude={"max_errors"})})
+    
+    return {
+        "status": "success",
+        **result.dict(exclude={"max_errors"})
+    }
+
+
 @router.get("/events")
 def get_events(
     event_type: Optional[EventType] = None,
     agent_id: Optional[str] = None,
-    limit: int = 100
+    session_id: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    newest_first: bool = True
 ):
-    """Get collected events"""
-    events = data_collector.get_events(
-        event_type=event_type,
-        agent_id=agent_id,
-        limit=limit
-    )
+    """
+    Get collected events, one page at a time (pass next_cursor back as cursor).
+
+    Each page lists its events oldest first, as this endpoint always has;
+    by default the first page holds the latest events and later pages go
+    back in time (newest_first=false pages forward from the oldest).
+    """
+    try:
+        page = data_collector.query_events(
+            event_type=event_type,
+            agent_id=agent_id,
+            session_id=session_id,
+            limit=limit,
+            cursor=cursor,
+            newest_first=newest_first
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    events = page.events[::-1] if newest_first else page.events
     return {
         "status": "success",
         "events": [e.dict() for e in events],
-        "count": len(events)
+        "count": len(events),
+        "next_cursor": page.next_cursor
     }
 
 